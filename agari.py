@@ -0,0 +1,143 @@
+from collections.abc import Sequence
+from enum import IntFlag
+from itertools import combinations_with_replacement
+from operator import mul
+
+from hand import Hand
+from tile import Tile
+from tile_counts import SUIT_GROUPS, TERMINAL_HONOR_INDICES, TileCounts
+
+# ---
+
+MAX_MELDS = 4
+MAX_COPIES = 4
+RANKS_PER_SUIT = 9
+NUM_HONOR_KINDS = 7
+
+# a group's count pattern is read as a base-5 number, which addresses its flags directly
+KEY_BASE = MAX_COPIES + 1
+
+# flags of a complete group: all of its tiles form melds, or melds plus exactly one pair
+MELDS_ONLY = 1
+MELDS_AND_PAIR = 2
+
+class AgariForm(IntFlag):
+    NONE = 0
+    REGULAR = 1
+    SEVEN_PAIRS = 2
+    THIRTEEN_ORPHANS = 4
+
+_KEY_WEIGHTS: tuple[int, ...] = tuple(KEY_BASE ** i for i in range(RANKS_PER_SUIT))
+
+def pattern_key(counts: Sequence[int], start: int = 0, size: int = RANKS_PER_SUIT) -> int:
+    return sum(map(mul, _KEY_WEIGHTS, counts[start:start+size]))
+
+# ---
+
+class AgariIndex:
+    # completion flags of every suit and honor pattern, indexed by pattern_key; the index is
+    # collision-free and covers every pattern of up to 4 copies per tile, so lookups never search
+    _suit_flags: bytearray
+    _honor_flags: bytearray
+
+    def __init__(self):
+        self._suit_flags = bytearray()
+        self._honor_flags = bytearray()
+
+    def __len__(self) -> int:
+        # number of complete patterns
+        return len(self._suit_flags) - self._suit_flags.count(0) + len(self._honor_flags) - self._honor_flags.count(0)
+
+    @property
+    def is_built(self) -> bool:
+        return len(self._suit_flags) > 0
+
+    @property
+    def suit_flags(self) -> memoryview:
+        if not self.is_built:
+            self.build()
+        return memoryview(self._suit_flags).toreadonly()
+
+    @property
+    def honor_flags(self) -> memoryview:
+        if not self.is_built:
+            self.build()
+        return memoryview(self._honor_flags).toreadonly()
+
+    def _build_flags(self, size: int) -> bytearray:
+        melds = [(i, i, i) for i in range(size)]
+        if size == RANKS_PER_SUIT:
+            melds.extend((i, i+1, i+2) for i in range(size - 2))
+
+        ret = bytearray(KEY_BASE ** size)
+        for num_melds in range(MAX_MELDS+1):
+            for combination in combinations_with_replacement(melds, num_melds):
+                counts = [0] * size
+                for offsets in combination:
+                    for o in offsets:
+                        counts[o] += 1
+                if max(counts, default=0) > MAX_COPIES:
+                    continue
+                ret[pattern_key(counts, 0, size)] |= MELDS_ONLY
+                for o in range(size):
+                    if counts[o] + 2 <= MAX_COPIES:
+                        counts[o] += 2
+                        ret[pattern_key(counts, 0, size)] |= MELDS_AND_PAIR
+                        counts[o] -= 2
+        return ret
+
+    def build(self) -> None:
+        self._suit_flags = self._build_flags(RANKS_PER_SUIT)
+        self._honor_flags = self._build_flags(NUM_HONOR_KINDS)
+
+    def clear(self) -> None:
+        self._suit_flags = bytearray()
+        self._honor_flags = bytearray()
+
+    def group_flags(self, pattern: Sequence[int]) -> int:
+        if not self.is_built:
+            self.build()
+        flags = self._suit_flags if len(pattern) == RANKS_PER_SUIT else self._honor_flags
+        return flags[pattern_key(pattern, 0, len(pattern))]
+
+    def is_regular(self, counts: Sequence[int]) -> bool:
+        # every group is complete and exactly one of them holds the pair
+        if not self.is_built:
+            self.build()
+        num_pairs = 0
+        for start, size in SUIT_GROUPS:
+            f = (self._suit_flags if size == RANKS_PER_SUIT else self._honor_flags)[pattern_key(counts, start, size)]
+            if not f:
+                return False
+            if f & MELDS_AND_PAIR:
+                num_pairs += 1
+        return num_pairs == 1
+
+    def forms(self, counts: Sequence[int], num_open_melds: int = 0) -> AgariForm:
+        # every form the closed tiles (winning tile included) complete, given the number of open melds
+        if sum(counts) != 3*(MAX_MELDS - num_open_melds) + 2 or max(counts) > MAX_COPIES:
+            return AgariForm.NONE
+
+        ret = AgariForm.REGULAR if self.is_regular(counts) else AgariForm.NONE
+        if num_open_melds == 0:
+            if counts.count(2) == 7:
+                ret |= AgariForm.SEVEN_PAIRS
+            if all(counts[i] for i in TERMINAL_HONOR_INDICES) and sum(counts[i] for i in TERMINAL_HONOR_INDICES) == 3*MAX_MELDS + 2:
+                ret |= AgariForm.THIRTEEN_ORPHANS
+        return ret
+
+# shared by every agari check that is not given its own index
+DEFAULT_AGARI_INDEX = AgariIndex()
+
+# ---
+
+def winning_counts(hand: Hand, winning_tile: Tile) -> TileCounts:
+    ret = hand.closed_counts
+    ret.add(winning_tile)
+    return ret
+
+def agari_forms(hand: Hand, winning_tile: Tile, *, index: AgariIndex = DEFAULT_AGARI_INDEX) -> AgariForm:
+    return index.forms(winning_counts(hand, winning_tile).counts, len(hand.open_melds))
+
+def is_agari(hand: Hand, winning_tile: Tile, *, index: AgariIndex = DEFAULT_AGARI_INDEX) -> bool:
+    return agari_forms(hand, winning_tile, index=index) != AgariForm.NONE
@@ -0,0 +1,238 @@
+import os
+from collections import deque
+from collections.abc import Generator, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+
+from agari import DEFAULT_AGARI_INDEX
+from decomposition import DEFAULT_DECOMPOSITION_TABLE
+from hand import CanonicalHand, Hand
+from mahjong import MeldGenerator, RiichiMahjongScorer, RiichiState, UnderState, WinType
+from meld import Meld
+from tile import Tile
+from tile_counts import code_tile, tile_code
+from tile_enums import Wind
+
+# ---
+
+@dataclass
+class ScoringRequest:
+    _hand: Hand
+    _winning_tile: Tile
+    _round_wind: Wind
+    _seat_wind: Wind
+    _win_type: WinType
+    _riichi: RiichiState = RiichiState.NONE
+    _under: UnderState = UnderState.NONE
+    _dora: list[Tile] = field(default_factory=list)
+    _ura_dora: list[Tile] = field(default_factory=list)
+
+    @property
+    def hand(self) -> Hand:
+        return self._hand
+    @property
+    def winning_tile(self) -> Tile:
+        return self._winning_tile
+    @property
+    def round_wind(self) -> Wind:
+        return self._round_wind
+    @property
+    def seat_wind(self) -> Wind:
+        return self._seat_wind
+    @property
+    def win_type(self) -> WinType:
+        return self._win_type
+    @property
+    def riichi(self) -> RiichiState:
+        return self._riichi
+    @property
+    def under(self) -> UnderState:
+        return self._under
+    @property
+    def dora(self) -> list[Tile]:
+        return self._dora
+    @property
+    def ura_dora(self) -> list[Tile]:
+        return self._ura_dora
+
+    def score(self, scorer: RiichiMahjongScorer) -> int:
+        return scorer.get_points(
+            self._hand, self._winning_tile,
+            round_wind=self._round_wind, seat_wind=self._seat_wind,
+            win_type=self._win_type, riichi=self._riichi, under=self._under,
+            dora=self._dora, ura_dora=self._ura_dora
+        )
+
+    def canonical_key(self) -> 'RequestKey':
+        # equal for requests that always score the same; the order of tiles, melds and dora indicators does not matter
+        return (
+            self._hand.freeze(), tile_code(self._winning_tile),
+            self._round_wind, self._seat_wind, self._win_type, self._riichi, self._under,
+            bytes(sorted(map(tile_code, self._dora))), bytes(sorted(map(tile_code, self._ura_dora))),
+        )
+
+RequestKey = tuple[CanonicalHand, int, Wind, Wind, WinType, RiichiState, UnderState, bytes, bytes]
+
+def unique_requests(requests: Iterable[ScoringRequest]) -> tuple[list[ScoringRequest], list[int]]:
+    # the distinct requests in order of first appearance, and the position among them of every input request;
+    # scoring the distinct requests and indexing their points by the positions gives the points of every input
+    unique: list[ScoringRequest] = []
+    positions: list[int] = []
+    seen: dict[RequestKey, int] = {}
+    for r in requests:
+        key = r.canonical_key()
+        i = seen.get(key)
+        if i is None:
+            i = seen[key] = len(unique)
+            unique.append(r)
+        positions.append(i)
+    return unique, positions
+
+# ---
+
+# a request flattened to ints and bytes, which pickle far smaller and faster than the dataclass graph:
+# (closed tiles, open melds, kita, winning tile, round wind, seat wind, win type, riichi, under, dora, ura dora)
+EncodedRequest = tuple[bytes, bytes, int, int, int, int, int, int, int, bytes, bytes]
+
+_WINDS: list[Wind] = [*Wind]
+_WIN_TYPES: list[WinType] = [*WinType]
+_RIICHI_STATES: list[RiichiState] = [*RiichiState]
+_UNDER_STATES: list[UnderState] = [*UnderState]
+
+def _encode_tiles(tiles: Iterable[Tile]) -> bytes:
+    return bytes(tile_code(t) for t in tiles)
+
+def _decode_tiles(raw: bytes) -> list[Tile]:
+    return [code_tile(c) for c in raw]
+
+def encode_request(request: ScoringRequest) -> EncodedRequest:
+    # open melds are stored as (is open, number of tiles, tile codes...) records
+    melds = bytearray()
+    for m in request.hand.open_melds:
+        melds.append(1 if m.is_open else 0)
+        melds.append(len(m))
+        melds.extend(tile_code(t) for t in m.tiles)
+
+    return (
+        _encode_tiles(request.hand.tiles), bytes(melds), request.hand.num_kita,
+        tile_code(request.winning_tile),
+        _WINDS.index(request.round_wind), _WINDS.index(request.seat_wind),
+        _WIN_TYPES.index(request.win_type), _RIICHI_STATES.index(request.riichi), _UNDER_STATES.index(request.under),
+        _encode_tiles(request.dora), _encode_tiles(request.ura_dora),
+    )
+
+def decode_request(encoded: EncodedRequest) -> ScoringRequest:
+    tiles, raw_melds, num_kita, winning_tile, round_wind, seat_wind, win_type, riichi, under, dora, ura_dora = encoded
+
+    melds: list[Meld] = []
+    i = 0
+    while i < len(raw_melds):
+        is_open, size = raw_melds[i], raw_melds[i+1]
+        melds.append(Meld(_decode_tiles(raw_melds[i+2:i+2+size]), bool(is_open)))
+        i += 2 + size
+
+    return ScoringRequest(
+        Hand(_decode_tiles(tiles), melds, num_kita), code_tile(winning_tile),
+        _WINDS[round_wind], _WINDS[seat_wind],
+        _WIN_TYPES[win_type], _RIICHI_STATES[riichi], _UNDER_STATES[under],
+        _decode_tiles(dora), _decode_tiles(ura_dora),
+    )
+
+# ---
+
+# per-process scorer, created once by init_worker so its lookup tables stay warm between chunks
+_worker_scorer: RiichiMahjongScorer | None = None
+
+def init_worker() -> None:
+    global _worker_scorer
+    DEFAULT_DECOMPOSITION_TABLE.build()
+    DEFAULT_AGARI_INDEX.build()
+    _worker_scorer = RiichiMahjongScorer(MeldGenerator())
+
+def score_encoded(chunk: list[EncodedRequest]) -> list[int]:
+    # scores with the worker's own scorer; usable from any process or thread pool started with init_worker
+    if _worker_scorer is None:
+        init_worker()
+    assert _worker_scorer is not None
+    return [decode_request(e).score(_worker_scorer) for e in chunk]
+
+# (base points, None), or (None, error message) for a request that could not be scored
+ScoringResult = tuple[int | None, str | None]
+
+def try_score(request: ScoringRequest, scorer: RiichiMahjongScorer) -> ScoringResult:
+    try:
+        return request.score(scorer), None
+    except Exception as e:
+        return None, f'Scoring failed: {e!r}'
+
+def try_score_encoded(chunk: list[EncodedRequest]) -> list[ScoringResult]:
+    # like score_encoded, but a request that fails only fails itself, not the rest of the chunk
+    if _worker_scorer is None:
+        init_worker()
+    assert _worker_scorer is not None
+    return [try_score(decode_request(e), _worker_scorer) for e in chunk]
+
+def _score_chunk(start: int, chunk: list[EncodedRequest]) -> tuple[int, list[int]]:
+    return start, score_encoded(chunk)
+
+def _chunks(requests: Iterable[ScoringRequest], chunksize: int) -> Iterator[tuple[int, list[EncodedRequest]]]:
+    it = iter(requests)
+    start = 0
+    while chunk := [encode_request(r) for r in islice(it, chunksize)]:
+        yield start, chunk
+        start += len(chunk)
+
+def score_many(
+        requests: Iterable[ScoringRequest], *,
+        workers: int | None = None, chunksize: int = 256, ordered: bool = True,
+        scorer: RiichiMahjongScorer | None = None) -> Generator[tuple[int, int], None, None]:
+    # yields (input position, base points); with ordered=False, chunks are yielded as soon as they finish;
+    # arguments are checked before the generator is created, so misuse fails at the call
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1')
+    # a given scorer only lives in this process, so it cannot be combined with worker processes
+    if scorer is not None and workers is not None and workers > 1:
+        raise ValueError('scorer cannot be used with more than one worker')
+    if workers is None:
+        workers = 1 if scorer is not None else os.process_cpu_count() or 1
+    return _score_many(requests, workers, chunksize, ordered, scorer)
+
+def _score_many(
+        requests: Iterable[ScoringRequest], workers: int, chunksize: int, ordered: bool,
+        scorer: RiichiMahjongScorer | None) -> Generator[tuple[int, int], None, None]:
+    if workers <= 1:
+        # score in this process
+        scorer = scorer if scorer is not None else RiichiMahjongScorer(MeldGenerator())
+        for i, r in enumerate(requests):
+            yield i, r.score(scorer)
+        return
+
+    # only a bounded number of chunks are in flight, so arbitrarily long inputs stream in constant memory
+    max_in_flight = 2 * workers
+    chunks = _chunks(requests, chunksize)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        if ordered:
+            in_order: deque[Future[tuple[int, list[int]]]] = deque()
+            for start, chunk in chunks:
+                in_order.append(executor.submit(_score_chunk, start, chunk))
+                if len(in_order) >= max_in_flight:
+                    start, points = in_order.popleft().result()
+                    yield from enumerate(points, start)
+            while in_order:
+                start, points = in_order.popleft().result()
+                yield from enumerate(points, start)
+        else:
+            pending: set[Future[tuple[int, list[int]]]] = set()
+            for start, chunk in chunks:
+                pending.add(executor.submit(_score_chunk, start, chunk))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        start, points = f.result()
+                        yield from enumerate(points, start)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    start, points = f.result()
+                    yield from enumerate(points, start)
@@ -0,0 +1,116 @@
+import random
+from dataclasses import dataclass, field
+
+from hand import Hand
+from mahjong import RiichiState, UnderState, WinType
+from meld import Meld
+from tile import Tile
+from tile_counts import NUM_SUITED_KINDS, NUM_TILE_KINDS, RANKS_PER_SUIT, RED_FIVE_RANK, index_tile
+from tile_enums import Wind
+
+# ---
+
+# hands with many overlapping sequences, which have the most decompositions; the last tile is the winning tile
+WORST_CASE_HANDS: tuple[str, ...] = (
+    '22223333444455m',
+    '11122233344455m',
+    '33334444555566p',
+    '11223344556677s',
+    '12223334445556m',
+)
+
+@dataclass
+class Deal:
+    # one winning hand and the context needed to score it
+    _hand: Hand
+    _winning_tile: Tile
+    _win_type: WinType
+    _round_wind: Wind = Wind.EAST
+    _seat_wind: Wind = Wind.SOUTH
+    _riichi: RiichiState = RiichiState.NONE
+    _dora: list[Tile] = field(default_factory=list)
+
+    @property
+    def hand(self) -> Hand:
+        return self._hand
+    @property
+    def winning_tile(self) -> Tile:
+        return self._winning_tile
+    @property
+    def win_type(self) -> WinType:
+        return self._win_type
+    @property
+    def all_tiles_dict(self) -> dict[Tile, int]:
+        ret = self._hand.all_tiles_dict
+        ret[self._winning_tile] = ret.get(self._winning_tile, 0) + 1
+        return ret
+
+    def get_points_kwargs(self) -> dict:
+        return {
+            'round_wind': self._round_wind, 'seat_wind': self._seat_wind,
+            'win_type': self._win_type, 'riichi': self._riichi, 'under': UnderState.NONE,
+            'dora': self._dora, 'ura_dora': [],
+        }
+
+# ---
+
+def _random_melds(rng: random.Random, counts: list[int], num_melds: int) -> list[list[int]]:
+    # tile indices of num_melds random sequences and triplets, never using more than 4 copies of a tile
+    ret: list[list[int]] = []
+    while len(ret) < num_melds:
+        if rng.random() < 0.6:
+            start = rng.randrange(3) * RANKS_PER_SUIT + rng.randrange(RANKS_PER_SUIT - 2)
+            indices = [start, start+1, start+2]
+        else:
+            indices = [rng.randrange(NUM_TILE_KINDS)] * 3
+        if all(counts[i] + indices.count(i) <= 4 for i in indices):
+            for i in indices:
+                counts[i] += 1
+            ret.append(indices)
+    return ret
+
+def _random_pair(rng: random.Random, counts: list[int]) -> list[int]:
+    index = rng.choice([i for i in range(NUM_TILE_KINDS) if counts[i] <= 2])
+    counts[index] += 2
+    return [index, index]
+
+def _tiles(rng: random.Random, indices: list[int]) -> list[Tile]:
+    # occasionally swaps in a red five
+    ret = [index_tile(i) for i in indices]
+    for j, i in enumerate(indices):
+        if i < NUM_SUITED_KINDS and i % RANKS_PER_SUIT == RED_FIVE_RANK - 1 and rng.random() < 0.3:
+            ret[j] = index_tile(i, True)
+            break
+    return ret
+
+def random_deal(rng: random.Random, num_open_melds: int = 0) -> Deal:
+    counts = [0] * NUM_TILE_KINDS
+    melds = _random_melds(rng, counts, 4)
+    pair = _random_pair(rng, counts)
+
+    open_melds = [Meld([index_tile(i) for i in m], True) for m in melds[:num_open_melds]]
+    closed = _tiles(rng, sorted(i for m in melds[num_open_melds:] for i in m) + pair)
+    winning_tile = closed.pop(rng.randrange(len(closed)))
+    return Deal(
+        Hand(closed, open_melds), winning_tile,
+        WinType.RON if num_open_melds or rng.random() < 0.5 else WinType.TSUMO,
+        _riichi=RiichiState.NONE if num_open_melds else RiichiState.RIICHI,
+        _dora=[index_tile(rng.randrange(NUM_TILE_KINDS))],
+    )
+
+def worst_case_deals() -> list[Deal]:
+    ret: list[Deal] = []
+    for raw in WORST_CASE_HANDS:
+        indices = [int(r) - 1 + 'mps'.index(raw[-1]) * RANKS_PER_SUIT for r in raw[:-1]]
+        tiles = [index_tile(i) for i in indices]
+        ret.append(Deal(Hand(tiles[:-1], []), tiles[-1], WinType.TSUMO))
+    return ret
+
+def corpora(seed: int, size: int) -> dict[str, list[Deal]]:
+    # every corpus is rebuilt from the seed, so runs with the same seed and size score identical hands
+    rng = random.Random(seed)
+    return {
+        'worst_case': worst_case_deals(),
+        'typical': [random_deal(rng) for _ in range(size)],
+        'open': [random_deal(rng, rng.randint(1, 3)) for _ in range(size)],
+    }
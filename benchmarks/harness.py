@@ -0,0 +1,191 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from benchmarks.corpus import Deal, corpora
+from mahjong import MeldGenerator, RiichiMahjongScorer
+from simulator import Simulation, create_simulation, simulate
+from tile import Tile
+from tile_counts import tile_index
+
+# ---
+
+# a benchmark prepares its inputs from a corpus and returns a function that runs one pass over them
+Benchmark = Callable[[RiichiMahjongScorer, MeldGenerator, list[Deal]], Callable[[], None]]
+
+def _closed_tiles_dict(deal: Deal) -> dict[Tile, int]:
+    return dict(Counter([*deal.hand.tiles, deal.winning_tile]))
+
+def _bench_yield_melds_with_pair(scorer: RiichiMahjongScorer, mg: MeldGenerator, deals: list[Deal]) -> Callable[[], None]:
+    inputs = [(_closed_tiles_dict(d), d.hand.open_melds) for d in deals]
+    def run() -> None:
+        for tiles_dict, melds in inputs:
+            for _ in mg.yield_melds_with_pair(tiles_dict, melds):
+                pass
+    return run
+
+def _bench_yield_melds(scorer: RiichiMahjongScorer, mg: MeldGenerator, deals: list[Deal]) -> Callable[[], None]:
+    # the same hands with the pair of their first decomposition taken out
+    inputs: list[tuple[dict[Tile, int], list]] = []
+    for d in deals:
+        tiles = [*d.hand.tiles, d.winning_tile]
+        _, pair = next(mg.yield_melds_with_pair(dict(Counter(tiles)), d.hand.open_melds))
+        # the pair may hold a red five where the hand holds a plain one, so match by index
+        for _ in range(2):
+            tiles.remove(next(t for t in tiles if tile_index(t) == tile_index(pair[0])))
+        inputs.append((dict(Counter(tiles)), d.hand.open_melds))
+    def run() -> None:
+        for tiles_dict, melds in inputs:
+            for _ in mg.yield_melds(tiles_dict, melds):
+                pass
+    return run
+
+def _bench_get_yakuman(scorer: RiichiMahjongScorer, mg: MeldGenerator, deals: list[Deal]) -> Callable[[], None]:
+    def run() -> None:
+        for d in deals:
+            scorer.get_yakuman(d.hand, d.winning_tile, win_type=d.win_type)
+    return run
+
+def _bench_get_yaku(scorer: RiichiMahjongScorer, mg: MeldGenerator, deals: list[Deal]) -> Callable[[], None]:
+    inputs = [(d, d.get_points_kwargs()) for d in deals]
+    def run() -> None:
+        for d, kwargs in inputs:
+            scorer.get_yaku(d.hand, d.winning_tile, **kwargs)
+    return run
+
+def _bench_get_points(scorer: RiichiMahjongScorer, mg: MeldGenerator, deals: list[Deal]) -> Callable[[], None]:
+    inputs = [(d, d.get_points_kwargs()) for d in deals]
+    def run() -> None:
+        for d, kwargs in inputs:
+            scorer.get_points(d.hand, d.winning_tile, **kwargs)
+    return run
+
+def _bench_simulate(scorer: RiichiMahjongScorer, mg: MeldGenerator, deals: list[Deal]) -> Callable[[], None]:
+    # a short simulation from every tenpai hand, drawing through scorer so its cache is measured too
+    simulations: list[Simulation] = []
+    for d in deals:
+        kwargs = d.get_points_kwargs()
+        simulations.append(create_simulation(d.hand, draws_left=6, round_wind=kwargs['round_wind'], seat_wind=kwargs['seat_wind']))
+    def run() -> None:
+        for s in simulations:
+            simulate(s, samples=8, seed=0, scorer=scorer)
+    return run
+
+BENCHMARKS: dict[str, Benchmark] = {
+    'yield_melds_with_pair': _bench_yield_melds_with_pair,
+    'yield_melds': _bench_yield_melds,
+    'get_yakuman': _bench_get_yakuman,
+    'get_yaku': _bench_get_yaku,
+    'get_points': _bench_get_points,
+    'simulate': _bench_simulate,
+}
+
+# ---
+
+@dataclass
+class BenchmarkResult:
+    _name: str
+    _num_ops: int
+    _best_seconds: float
+    _peak_bytes: int
+
+    def __str__(self) -> str:
+        return f'{self._name:<36} {self.ops_per_sec:>12,.0f} ops/s {self._peak_bytes:>12,} B peak'
+
+    @property
+    def name(self) -> str:
+        return self._name
+    @property
+    def ops_per_sec(self) -> float:
+        return self._num_ops / self._best_seconds if self._best_seconds > 0 else float('inf')
+    @property
+    def peak_bytes(self) -> int:
+        return self._peak_bytes
+
+    def to_dict(self) -> dict:
+        return {'num_ops': self._num_ops, 'best_seconds': self._best_seconds, 'ops_per_sec': self.ops_per_sec, 'peak_bytes': self._peak_bytes}
+
+def measure(name: str, run: Callable[[], None], num_ops: int, repeat: int) -> BenchmarkResult:
+    # one warm-up pass fills the lookup tables, then the best of `repeat` timed passes is kept
+    run()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # allocations are traced in a separate pass, since tracing slows everything down
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(name, num_ops, best, peak - baseline)
+
+def run_all(seed: int, size: int, repeat: int, select: str = '') -> list[BenchmarkResult]:
+    ret: list[BenchmarkResult] = []
+    for corpus_name, deals in corpora(seed, size).items():
+        for bench_name, bench in BENCHMARKS.items():
+            name = f'{bench_name}/{corpus_name}'
+            if select not in name:
+                continue
+            mg = MeldGenerator()
+            run = bench(RiichiMahjongScorer(mg), mg, deals)
+            ret.append(measure(name, run, len(deals), repeat))
+            print(ret[-1], file=sys.stderr)
+    return ret
+
+# ---
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    # prints the change in ops/sec of every benchmark in both runs and returns the ones slower than threshold
+    regressions: list[str] = []
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        ratio = result['ops_per_sec'] / old['ops_per_sec']
+        flag = ''
+        if ratio < 1 - threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:<36} {old['ops_per_sec']:>12,.0f} -> {result['ops_per_sec']:>12,.0f} ops/s ({ratio - 1:+.1%}){flag}')
+    return regressions
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark decomposition and scoring on seeded corpora.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=500, help='hands in each random corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='timed passes per benchmark; the best is kept')
+    parser.add_argument('--select', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare against the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_all(args.seed, args.size, args.repeat, args.select)
+    current = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': args.seed, 'size': args.size, 'repeat': args.repeat,
+        'results': {r.name: r.to_dict() for r in results},
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if (baseline['seed'], baseline['size']) != (args.seed, args.size):
+            print('warning: baseline was run on different corpora', file=sys.stderr)
+        return 1 if compare(baseline, current, args.threshold) else 0
+    return 0
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+# ---
+
+@dataclass(frozen=True)
+class CacheInfo:
+    _hits: int
+    _misses: int
+    _maxsize: int
+    _currsize: int
+
+    def __str__(self) -> str:
+        return f'CacheInfo(hits={self._hits}, misses={self._misses}, maxsize={self._maxsize}, currsize={self._currsize})'
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+    @property
+    def misses(self) -> int:
+        return self._misses
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+    @property
+    def currsize(self) -> int:
+        return self._currsize
+    @property
+    def hit_rate(self) -> float:
+        return self._hits / (self._hits + self._misses) if self._hits + self._misses else 0.0
+
+class LRUCache[K: Hashable, V]:
+    _entries: OrderedDict[K, V]
+    _maxsize: int
+    _hits: int
+    _misses: int
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError('LRUCache maxsize must be at least 1')
+        self._entries = OrderedDict()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def get(self, key: K) -> V | None:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            # evict least recently used entry
+            self._entries.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
@@ -0,0 +1,99 @@
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+
+from encoding import RECORD_SIZE, decode_counts, decode_hand, encode_hand
+from hand import Hand
+from tile_counts import TileCounts
+
+# ---
+
+# A dataset file is a 16-byte header followed by fixed-width hand records (see encoding.py):
+#
+#   magic (4 bytes) | format version (u16) | record size (u16) | number of records (u64), little-endian
+
+MAGIC = b'MJHD'
+VERSION = 1
+_HEADER = struct.Struct('<4sHHQ')
+HEADER_SIZE = _HEADER.size
+
+def write_hands(path: str | os.PathLike[str], hands: Iterable[Hand]) -> int:
+    # streams the records to disk and returns how many were written
+    num_records = 0
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, RECORD_SIZE, 0))
+        for h in hands:
+            f.write(encode_hand(h))
+            num_records += 1
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, RECORD_SIZE, num_records))
+    return num_records
+
+# ---
+
+class HandDataset:
+    # memory-mapped view of a dataset file; records are only decoded when they are accessed
+    _file: BinaryIO
+    _mmap: mmap.mmap
+    _records: memoryview
+    _num_records: int
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self._file = open(path, 'rb')
+        try:
+            header = self._file.read(HEADER_SIZE)
+            if len(header) != HEADER_SIZE:
+                raise ValueError(f'{path} is too short to be a hand dataset.')
+            magic, version, record_size, num_records = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not a hand dataset.')
+            if version != VERSION or record_size != RECORD_SIZE:
+                raise ValueError(f'{path} has unsupported version {version} with {record_size}-byte records.')
+            if os.fstat(self._file.fileno()).st_size < HEADER_SIZE + num_records * RECORD_SIZE:
+                raise ValueError(f'{path} is truncated; expected {num_records} records.')
+
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self._records = memoryview(self._mmap)[HEADER_SIZE:HEADER_SIZE + num_records * RECORD_SIZE]
+        self._num_records = num_records
+
+    def __enter__(self) -> 'HandDataset':
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._num_records
+
+    def __getitem__(self, index: int) -> Hand:
+        return decode_hand(self.record(index))
+
+    def __iter__(self) -> Iterator[Hand]:
+        for i in range(self._num_records):
+            yield decode_hand(self._records[i * RECORD_SIZE:(i + 1) * RECORD_SIZE])
+
+    def record(self, index: int) -> memoryview:
+        # the raw bytes of one record, without copying
+        if index < 0:
+            index += self._num_records
+        if not 0 <= index < self._num_records:
+            raise IndexError(f'Record {index} is out of range for a dataset of {self._num_records} hands.')
+        return self._records[index * RECORD_SIZE:(index + 1) * RECORD_SIZE]
+
+    def counts(self, index: int) -> tuple[TileCounts, int]:
+        return decode_counts(self.record(index))
+
+    def iter_counts(self) -> Iterator[tuple[TileCounts, int]]:
+        for i in range(self._num_records):
+            yield decode_counts(self._records[i * RECORD_SIZE:(i + 1) * RECORD_SIZE])
+
+    def close(self) -> None:
+        # views must be released before the map can be closed
+        self._records.release()
+        self._mmap.close()
+        self._file.close()
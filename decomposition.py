@@ -0,0 +1,114 @@
+from collections.abc import Generator
+from itertools import combinations_with_replacement
+
+from meld_enums import ClosedMeldKind
+
+# ---
+
+RANKS_PER_SUIT = 9
+NUM_HONOR_KINDS = 7
+MAX_MELDS = 4
+
+# a meld within a single suit (or the honors): offset of its first tile in the suit, and its kind
+SuitMeld = tuple[int, ClosedMeldKind]
+SuitDecomposition = tuple[SuitMeld, ...]
+
+# a meld within the whole hand: index of its first tile, and its kind
+IndexedMeld = tuple[int, ClosedMeldKind]
+# a decomposition of a hand with a pair: index of the pair's tile, and its melds
+IndexedDecomposition = tuple[int, list[IndexedMeld]]
+
+class DecompositionTable:
+    # maps a per-suit count pattern (9 counts for a suit, 7 counts for the honors)
+    # to every way of grouping it into melds, in the order MeldGenerator yields them
+    _table: dict[tuple[int, ...], tuple[SuitDecomposition, ...]]
+    _is_built: bool
+
+    def __init__(self):
+        self._table = {}
+        self._is_built = False
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    @property
+    def is_built(self) -> bool:
+        return self._is_built
+
+    def _yield_suit_melds(self, counts: list[int], index: int, melds: list[SuitMeld], *, previous_key: int = -1) -> Generator[SuitDecomposition, None, None]:
+        # get leftmost "unmelded" tile in the suit
+        while index < len(counts) and counts[index] == 0:
+            index += 1
+
+        if index == len(counts):
+            # Base Case: yield melds if there are no more tiles to be processed
+            yield tuple(melds)
+            return
+
+        # melds are keyed by (first tile offset, sequence > triplet), matching Meld ordering;
+        # only yield melds in "increasing order" to avoid yielding redundant meld permutations
+
+        # check if first tile can be part of a sequence (never for honors)
+        if len(counts) == RANKS_PER_SUIT and index <= 6 and counts[index+1] >= 1 and counts[index+2] >= 1:
+            key = 2*index + 1
+            if previous_key <= key:
+                counts[index] -= 1
+                counts[index+1] -= 1
+                counts[index+2] -= 1
+                melds.append((index, ClosedMeldKind.SEQUENCE))
+
+                yield from self._yield_suit_melds(counts, index, melds, previous_key=key)
+
+                counts[index] += 1
+                counts[index+1] += 1
+                counts[index+2] += 1
+                melds.pop()
+
+        # check if first tile can be part of a triplet
+        if counts[index] >= 3:
+            key = 2*index
+            if previous_key <= key:
+                counts[index] -= 3
+                melds.append((index, ClosedMeldKind.TRIPLET))
+
+                yield from self._yield_suit_melds(counts, index, melds, previous_key=key)
+
+                counts[index] += 3
+                melds.pop()
+
+    def get(self, pattern: tuple[int, ...]) -> tuple[SuitDecomposition, ...]:
+        ret = self._table.get(pattern)
+        if ret is None:
+            if sum(pattern) % 3 != 0 or (self._is_built and sum(pattern) <= 3*MAX_MELDS):
+                # every decomposable pattern of up to 4 melds is already in a built table
+                return ()
+            ret = tuple(self._yield_suit_melds([*pattern], 0, []))
+            self._table[pattern] = ret
+        return ret
+
+    def build(self) -> None:
+        # enumerate every pattern that can be grouped into at most 4 melds, so that
+        # lookups of patterns missing from the table never need to search
+        for size, kinds in ((RANKS_PER_SUIT, [*((i, ClosedMeldKind.SEQUENCE) for i in range(7)), *((i, ClosedMeldKind.TRIPLET) for i in range(RANKS_PER_SUIT))]),
+                            (NUM_HONOR_KINDS, [(i, ClosedMeldKind.TRIPLET) for i in range(NUM_HONOR_KINDS)])):
+            for num_melds in range(MAX_MELDS+1):
+                for melds in combinations_with_replacement(kinds, num_melds):
+                    counts = [0] * size
+                    for offset, kind in melds:
+                        match kind:
+                            case ClosedMeldKind.SEQUENCE:
+                                counts[offset] += 1
+                                counts[offset+1] += 1
+                                counts[offset+2] += 1
+                            case ClosedMeldKind.TRIPLET:
+                                counts[offset] += 3
+                    if max(counts, default=0) <= 4:
+                        self.get(tuple(counts))
+        self._is_built = True
+
+    def clear(self) -> None:
+        self._table.clear()
+        self._is_built = False
+
+# shared by every MeldGenerator that is not given its own table
+DEFAULT_DECOMPOSITION_TABLE = DecompositionTable()
@@ -0,0 +1,126 @@
+from hand import Hand
+from meld import Meld
+from tile import Tile
+from tile_counts import NUM_SUITED_KINDS, NUM_TILE_KINDS, RANKS_PER_SUIT, RED_FIVE_RANK, SUITS, TileCounts, index_tile, tile_code, tile_index
+
+# ---
+
+# A hand is packed into a fixed-width record of RECORD_SIZE bytes:
+#
+#   bytes 0-15   little-endian bit field
+#                  bits   0-101  closed count of each of the 34 tile kinds, 3 bits each
+#                  bits 102-107  closed red fives of man/pin/sou, 2 bits each
+#                  bits 108-110  kita
+#                  bits 111-118  red fives in each of the 4 melds, 2 bits each
+#   bytes 16-19  one byte per meld slot, 0 if empty, else 1 + MELD_SHAPES * is open + shape code
+#
+# Shape codes are 0-20 for sequences (7 per suit), 21-54 for triplets and 55-88 for quads.
+# Tile order within the closed tiles and within melds is not kept; decoding sorts them with red fives first.
+
+MAX_ENCODED_MELDS = 4
+FIELD_SIZE = 16
+RECORD_SIZE = FIELD_SIZE + MAX_ENCODED_MELDS
+
+COUNT_BITS = 3
+RED_BITS = 2
+KITA_BITS = 3
+
+_RED_SHIFT = NUM_TILE_KINDS * COUNT_BITS
+_KITA_SHIFT = _RED_SHIFT + len(SUITS) * RED_BITS
+_MELD_RED_SHIFT = _KITA_SHIFT + KITA_BITS
+
+NUM_SEQUENCE_SHAPES = len(SUITS) * (RANKS_PER_SUIT - 2)
+_TRIPLET_SHAPES = NUM_SEQUENCE_SHAPES
+_QUAD_SHAPES = _TRIPLET_SHAPES + NUM_TILE_KINDS
+MELD_SHAPES = _QUAD_SHAPES + NUM_TILE_KINDS
+
+# ---
+
+def _check_fits(value: int, bits: int, what: str) -> int:
+    if not 0 <= value < 1 << bits:
+        raise ValueError(f'Cannot encode {value} {what}; at most {(1 << bits) - 1} fit in a record.')
+    return value
+
+def _meld_shape(meld: Meld) -> int:
+    indices = sorted(tile_index(t) for t in meld.tiles)
+    first = indices[0] if indices else 0
+    match len(indices):
+        case 3 if indices[0] == indices[1] == indices[2]:
+            return _TRIPLET_SHAPES + first
+        case 3 if first < NUM_SUITED_KINDS and first % RANKS_PER_SUIT < RANKS_PER_SUIT - 2 and indices == [first, first+1, first+2]:
+            return first // RANKS_PER_SUIT * (RANKS_PER_SUIT - 2) + first % RANKS_PER_SUIT
+        case 4 if indices[0] == indices[1] == indices[2] == indices[3]:
+            return _QUAD_SHAPES + first
+        case _:
+            raise ValueError(f'Cannot encode {meld}; it is not a sequence, triplet or quad.')
+
+def _shape_indices(shape: int) -> list[int]:
+    if shape < _TRIPLET_SHAPES:
+        first = shape // (RANKS_PER_SUIT - 2) * RANKS_PER_SUIT + shape % (RANKS_PER_SUIT - 2)
+        return [first, first+1, first+2]
+    if shape < _QUAD_SHAPES:
+        return [shape - _TRIPLET_SHAPES] * 3
+    return [shape - _QUAD_SHAPES] * 4
+
+def _is_red(tile: Tile) -> bool:
+    return tile_code(tile) >= NUM_TILE_KINDS
+
+def _with_red_fives(indices: list[int], num_red: int) -> list[Tile]:
+    ret: list[Tile] = []
+    for i in indices:
+        is_red = num_red > 0 and i < NUM_SUITED_KINDS and i % RANKS_PER_SUIT == RED_FIVE_RANK - 1
+        num_red -= 1 if is_red else 0
+        ret.append(index_tile(i, is_red))
+    # red fives first, as TileCounts.to_tiles orders them
+    ret.sort(key=lambda t: (tile_index(t), not _is_red(t)))
+    return ret
+
+# ---
+
+def encode_hand(hand: Hand) -> bytes:
+    if len(hand.open_melds) > MAX_ENCODED_MELDS:
+        raise ValueError(f'Cannot encode a hand with {len(hand.open_melds)} melds; at most {MAX_ENCODED_MELDS} fit in a record.')
+
+    closed = hand.closed_counts
+    field = 0
+    for i, c in enumerate(closed.counts):
+        field |= _check_fits(c, COUNT_BITS, 'copies of a tile') << (i * COUNT_BITS)
+    for s, c in enumerate(closed.red_fives):
+        field |= _check_fits(c, RED_BITS, 'red fives of a suit') << (_RED_SHIFT + s * RED_BITS)
+    field |= _check_fits(hand.num_kita, KITA_BITS, 'kita') << _KITA_SHIFT
+
+    melds = bytearray(MAX_ENCODED_MELDS)
+    for m, meld in enumerate(hand.open_melds):
+        melds[m] = 1 + MELD_SHAPES * meld.is_open + _meld_shape(meld)
+        num_red = sum(1 for t in meld.tiles if _is_red(t))
+        field |= _check_fits(num_red, RED_BITS, 'red fives in a meld') << (_MELD_RED_SHIFT + m * RED_BITS)
+
+    return field.to_bytes(FIELD_SIZE, 'little') + melds
+
+def decode_counts(record: bytes | memoryview) -> tuple[TileCounts, int]:
+    # closed tile counts and number of melds, without creating any Tile or Meld
+    field = int.from_bytes(record[:FIELD_SIZE], 'little')
+    counts = bytearray(NUM_TILE_KINDS)
+    for i in range(NUM_TILE_KINDS):
+        counts[i] = (field >> (i * COUNT_BITS)) & ((1 << COUNT_BITS) - 1)
+    red_fives = bytearray((field >> (_RED_SHIFT + s * RED_BITS)) & ((1 << RED_BITS) - 1) for s in range(len(SUITS)))
+    num_melds = sum(1 for b in record[FIELD_SIZE:RECORD_SIZE] if b)
+    return TileCounts(counts, red_fives), num_melds
+
+def decode_hand(record: bytes | memoryview) -> Hand:
+    if len(record) != RECORD_SIZE:
+        raise ValueError(f'Hand record must be {RECORD_SIZE} bytes, not {len(record)}.')
+    field = int.from_bytes(record[:FIELD_SIZE], 'little')
+    closed, _ = decode_counts(record)
+
+    melds: list[Meld] = []
+    for m, code in enumerate(record[FIELD_SIZE:RECORD_SIZE]):
+        if code == 0:
+            continue
+        if code > 2 * MELD_SHAPES:
+            raise ValueError(f'Invalid meld code {code} in hand record.')
+        is_open, shape = divmod(code - 1, MELD_SHAPES)
+        num_red = (field >> (_MELD_RED_SHIFT + m * RED_BITS)) & ((1 << RED_BITS) - 1)
+        melds.append(Meld(_with_red_fives(_shape_indices(shape), num_red), bool(is_open)))
+
+    return Hand(closed.to_tiles(), melds, (field >> _KITA_SHIFT) & ((1 << KITA_BITS) - 1))
@@ -0,0 +1,79 @@
+from shape import DRAGON_INDICES, HandShape, WaitShape, YakuContext, is_terminal_honor
+
+# ---
+
+BASE_FU = 20
+SEVEN_PAIRS_FU = 25
+CLOSED_RON_FU = 10
+TSUMO_FU = 2
+WAIT_FU = 2
+YAKUHAI_PAIR_FU = 2
+
+def meld_fu(index: int, is_concealed: bool, is_quad: bool) -> int:
+    # 2 for an open triplet of simples, doubled for terminals/honors, doubled if concealed, quadrupled for a quad
+    ret = 2
+    if is_terminal_honor(index):
+        ret *= 2
+    if is_concealed:
+        ret *= 2
+    if is_quad:
+        ret *= 4
+    return ret
+
+def pair_fu(index: int, context: YakuContext) -> int:
+    # a pair of the seat wind that is also the round wind counts twice
+    ret = 0
+    if index in DRAGON_INDICES:
+        ret += YAKUHAI_PAIR_FU
+    if index == context.seat_wind:
+        ret += YAKUHAI_PAIR_FU
+    if index == context.round_wind:
+        ret += YAKUHAI_PAIR_FU
+    return ret
+
+def round_fu(fu: int) -> int:
+    return -(-fu // 10) * 10
+
+def compute_fu(shape: HandShape, context: YakuContext) -> int:
+    if shape.is_seven_pairs:
+        return SEVEN_PAIRS_FU
+
+    fu = BASE_FU + shape.meld_fu + pair_fu(shape.pair, context)
+    if shape.wait in (WaitShape.KANCHAN, WaitShape.PENCHAN, WaitShape.TANKI):
+        fu += WAIT_FU
+
+    if fu == BASE_FU and shape.is_closed and context.is_tsumo:
+        # Pinfu Tsumo
+        return BASE_FU
+    if context.is_tsumo:
+        fu += TSUMO_FU
+    elif shape.is_closed:
+        fu += CLOSED_RON_FU
+    elif fu == BASE_FU:
+        # an open hand without fu is rounded up to 30
+        fu += CLOSED_RON_FU
+    return round_fu(fu)
+
+# ---
+
+def base_points(yakuman: int, han: int, fu: int) -> int:
+    if yakuman > 0:
+        # [multiple] yakuman
+        return 8000 * yakuman
+    elif han >= 13:
+        # kazoe yakuman
+        return 8000
+    elif han >= 11:
+        # sanbaiman
+        return 6000
+    elif han >= 8:
+        # baiman
+        return 4000
+    elif han >= 6:
+        # haneman
+        return 3000
+    elif han == 5 or (han == 4 and fu >= 40) or (han == 3 and fu >= 70):
+        # mangan
+        return 2000
+    else:
+        return min(2000, fu * 2**(2+han))
@@ -1,12 +1,16 @@
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from meld import Meld, MeldFactory
 from tile import HonorTile, SuitedTile, Tile, TileFactory
+from tile_counts import TileCounts, code_tile, tile_code
 from tile_enums import Wind
 
 # ---
 
+# (closed tile counts, closed red fives, sorted open melds as (is open, sorted tile codes), kita)
+HandKey = tuple[bytes, bytes, tuple[tuple[bool, bytes], ...], int]
+
 @dataclass
 class Hand:
     _tiles: list[Tile]
@@ -46,6 +50,18 @@ class Hand:
     def all_tiles_dict(self) -> dict[Tile, int]:
         return dict(Counter(self.all_tiles))
 
+    @property
+    def closed_counts(self) -> TileCounts:
+        return TileCounts.from_tiles(self._tiles)
+
+    @property
+    def counts(self) -> TileCounts:
+        ret = TileCounts.from_tiles(self._tiles)
+        for m in self._open_melds:
+            for t in m.tiles:
+                ret.add(t)
+        return ret
+
     @property
     def all_tiles_with_kita(self) -> list[Tile]:
         ret: list[Tile] = []
@@ -66,7 +82,68 @@ class Hand:
     @property
     def is_open(self) -> bool:
         return len(self._open_melds) > 0
-    
+
+    def canonical_key(self) -> HandKey:
+        # equal for hands with the same tiles, red fives, melds and kita, regardless of tile/meld order
+        closed = self.closed_counts
+        return (
+            closed.counts.tobytes(), closed.red_fives.tobytes(),
+            tuple(sorted((m.is_open, bytes(sorted(tile_code(t) for t in m.tiles))) for m in self._open_melds)),
+            self._num_kita,
+        )
+
+    def freeze(self) -> 'CanonicalHand':
+        return CanonicalHand(self.canonical_key())
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CanonicalHand:
+    # an immutable, hashable Hand, stored as its canonical key: hands with the same tiles, red fives,
+    # melds and kita are equal regardless of tile/meld order, so it can key dicts and deduplicate hands
+    _key: HandKey
+    _hash: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_hash', hash(self._key))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if type(other) is CanonicalHand:
+            return self._hash == other._hash and self._key == other._key
+        return NotImplemented
+
+    def __len__(self) -> int:
+        return sum(self._key[0])
+
+    def __str__(self) -> str:
+        return f'CanonicalHand({' '.join([*map(str, self.tiles), *map(str, self.open_melds)])}{f' + {self.num_kita} kita' if self.num_kita > 0 else ''})'
+
+    @property
+    def key(self) -> HandKey:
+        return self._key
+    @property
+    def closed_counts(self) -> TileCounts:
+        return TileCounts(self._key[0], self._key[1])
+    @property
+    def tiles(self) -> tuple[Tile, ...]:
+        # sorted by tile index, red fives first
+        return tuple(self.closed_counts.to_tiles())
+    @property
+    def open_melds(self) -> tuple[Meld, ...]:
+        return tuple(Meld([code_tile(c) for c in codes], is_open) for is_open, codes in self._key[2])
+    @property
+    def num_kita(self) -> int:
+        return self._key[3]
+    @property
+    def is_open(self) -> bool:
+        return len(self._key[2]) > 0
+
+    def to_hand(self) -> Hand:
+        return Hand([*self.tiles], [*self.open_melds], self.num_kita)
+
 # ---
 
 class HandFactory:
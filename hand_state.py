@@ -0,0 +1,221 @@
+from hand import Hand
+from meld import Meld
+from shanten import DEFAULT_SHANTEN_TABLE, MAX_COPIES, MAX_MELDS, Distances, ShantenTable, SpecialForms, combine_distances, combine_distances_entry
+from tile import SuitedTile, Tile
+from tile_counts import NUM_TILE_KINDS, RANKS_PER_SUIT, RED_FIVE_RANK, SUIT_GROUPS, TileCounts, group_index, index_tile, tile_index
+from waits import DEFAULT_WAIT_TABLE, WaitTable, chiitoitsu_waits, kokushi_waits
+
+# ---
+
+class HandState:
+    # a hand that is changed in place by draws, discards and calls. Every change updates the counts,
+    # the tile mask and the 7 Pairs/13 Orphans counters in O(1), and only invalidates the pattern and
+    # distance table of the one group it touched; shanten and waits are recombined on demand from the
+    # cached per-group data (and the WaitTable's per-pattern waits)
+    _closed: TileCounts
+    _open_melds: list[Meld]
+    _num_kita: int
+    # copies of every kind held in open melds and closed kans
+    _meld_counts: bytearray
+    # bit i is set if the closed tiles hold tile index i
+    _tile_mask: int
+    _special: SpecialForms
+    _shanten_table: ShantenTable
+    _wait_table: WaitTable
+
+    # derived data, None until needed again
+    _group_patterns: list[tuple[int, ...] | None]
+    _group_distances: list[Distances | None]
+    _shanten: int | None
+    _waits: list[Tile] | None
+
+    def __init__(
+            self, hand: Hand | None = None, *,
+            shanten_table: ShantenTable = DEFAULT_SHANTEN_TABLE, wait_table: WaitTable = DEFAULT_WAIT_TABLE):
+        self._closed = hand.closed_counts if hand is not None else TileCounts()
+        self._open_melds = [*hand.open_melds] if hand is not None else []
+        self._num_kita = hand.num_kita if hand is not None else 0
+        self._meld_counts = bytearray(NUM_TILE_KINDS)
+        for m in self._open_melds:
+            for t in m.tiles:
+                self._meld_counts[tile_index(t)] += 1
+
+        counts = self._closed.counts
+        self._tile_mask = sum(1 << i for i in range(NUM_TILE_KINDS) if counts[i])
+        self._special = SpecialForms(counts)
+        self._shanten_table = shanten_table
+        self._wait_table = wait_table
+
+        self._group_patterns = [None] * len(SUIT_GROUPS)
+        self._group_distances = [None] * len(SUIT_GROUPS)
+        self._shanten = None
+        self._waits = None
+
+    def __len__(self) -> int:
+        return len(self._closed)
+
+    def __repr__(self) -> str:
+        return f'HandState({self.to_hand()})'
+
+    @property
+    def counts(self) -> memoryview:
+        # per-kind counts of the closed tiles
+        return memoryview(self._closed.counts).toreadonly()
+    @property
+    def open_melds(self) -> tuple[Meld, ...]:
+        return tuple(self._open_melds)
+    @property
+    def num_kita(self) -> int:
+        return self._num_kita
+    @property
+    def tile_mask(self) -> int:
+        return self._tile_mask
+    @property
+    def is_closed(self) -> bool:
+        # closed kans keep the hand closed
+        return all(not m.is_open for m in self._open_melds)
+
+    def to_hand(self) -> Hand:
+        return Hand(self._closed.to_tiles(), [*self._open_melds], self._num_kita)
+
+    # ---
+
+    def _add(self, index: int, tile: Tile) -> None:
+        counts = self._closed.counts
+        before = counts[index]
+        self._closed.add(tile)
+        if before == 0:
+            self._tile_mask |= 1 << index
+        self._special.update(index, before, before + 1)
+        self._invalidate(index)
+
+    def _remove(self, index: int, tile: Tile) -> None:
+        counts = self._closed.counts
+        before = counts[index]
+        # a plain five cannot be taken from a hand whose only fives of that suit are red
+        if (type(tile) is SuitedTile and not tile.red_dora and index % RANKS_PER_SUIT == RED_FIVE_RANK - 1
+                and before <= self._closed.red_fives[index // RANKS_PER_SUIT]):
+            raise ValueError(f'Cannot remove {tile} from the hand; no copies left.')
+        self._closed.remove(tile)
+        if before == 1:
+            self._tile_mask &= ~(1 << index)
+        self._special.update(index, before, before - 1)
+        self._invalidate(index)
+
+    def _invalidate(self, index: int) -> None:
+        g = group_index(index)
+        self._group_patterns[g] = None
+        self._group_distances[g] = None
+        self._shanten = None
+        self._waits = None
+
+    def draw(self, tile: Tile) -> None:
+        index = tile_index(tile)
+        if self._closed.counts[index] + self._meld_counts[index] >= MAX_COPIES:
+            raise ValueError(f'Cannot draw {tile}; the hand already holds every copy.')
+        self._add(index, tile)
+
+    def discard(self, tile: Tile) -> None:
+        self._remove(tile_index(tile), tile)
+
+    def call(self, meld: Meld, called_tile: Tile | None = None) -> None:
+        # the meld's tiles come from the closed tiles, apart from the called tile (if any);
+        # an open kan that matches an open pon is an added kan, for which only the fourth tile comes from the hand
+        indices = [tile_index(t) for t in meld.tiles]
+        if len(indices) not in (3, 4):
+            raise ValueError(f'Cannot call {meld}; melds hold 3 or 4 tiles.')
+
+        from_hand = [*meld.tiles]
+        if called_tile is not None:
+            if called_tile not in from_hand:
+                raise ValueError(f'Cannot call {meld} on {called_tile}; the meld does not hold it.')
+            from_hand.remove(called_tile)
+        elif meld.is_open and len(indices) == 4:
+            for i, m in enumerate(self._open_melds):
+                if m.is_open and len(m) == 3 and all(tile_index(t) == indices[0] for t in m.tiles):
+                    # added kan
+                    from_hand = [*meld.tiles]
+                    for t in m.tiles:
+                        from_hand.remove(t)
+                    self._remove(indices[0], from_hand[0])
+                    self._meld_counts[indices[0]] += 1
+                    self._open_melds[i] = meld
+                    return
+
+        if len(self._open_melds) >= MAX_MELDS:
+            raise ValueError(f'A hand cannot hold more than {MAX_MELDS} melds.')
+        # check before removing anything, so a failed call leaves the hand unchanged
+        needed = TileCounts.from_tiles(from_hand)
+        if any(needed.counts[i] > self._closed.counts[i] for i in range(NUM_TILE_KINDS)):
+            raise ValueError(f'Cannot call {meld}; the hand does not hold {' '.join(map(str, from_hand))}.')
+        for t in from_hand:
+            self._remove(tile_index(t), t)
+        for i in indices:
+            self._meld_counts[i] += 1
+        self._open_melds.append(meld)
+
+    # ---
+
+    def _pattern(self, g: int) -> tuple[int, ...]:
+        ret = self._group_patterns[g]
+        if ret is None:
+            start, size = SUIT_GROUPS[g]
+            ret = self._group_patterns[g] = tuple(self._closed.counts[start:start+size])
+        return ret
+
+    def _distances(self, g: int) -> Distances:
+        ret = self._group_distances[g]
+        if ret is None:
+            pattern = self._pattern(g)
+            table = self._shanten_table
+            ret = self._group_distances[g] = table.suit_distances(pattern) if len(pattern) == RANKS_PER_SUIT else table.honor_distances(pattern)
+        return ret
+
+    def _is_complete(self, g: int, num_tiles: int) -> bool:
+        # the group splits into melds, plus a pair if it holds 3n+2 tiles
+        if num_tiles % 3 == 1:
+            return False
+        return self._distances(g)[(1 if num_tiles % 3 == 2 else 0)*(MAX_MELDS+1) + num_tiles // 3] == 0
+
+    @property
+    def shanten(self) -> int:
+        if self._shanten is None:
+            num_open_melds = len(self._open_melds)
+            if len(self._closed) + 3*num_open_melds not in (3*MAX_MELDS + 1, 3*MAX_MELDS + 2):
+                raise ValueError(f'Hand with {len(self._closed)} closed tiles and {num_open_melds} open melds is not a 13- or 14-tile hand.')
+            man, pin, sou, honors = (self._distances(g) for g in range(len(SUIT_GROUPS)))
+            ret = combine_distances_entry(combine_distances(combine_distances(man, pin), sou), honors, MAX_MELDS - num_open_melds) - 1
+            if num_open_melds == 0:
+                # 7 Pairs and 13 Orphans can only be formed with a closed hand
+                ret = min(ret, self._special.shanten())
+            self._shanten = ret
+        return self._shanten
+
+    @property
+    def waits(self) -> list[Tile]:
+        if self._waits is None:
+            num_open_melds = len(self._open_melds)
+            if len(self._closed) + 3*num_open_melds != 3*MAX_MELDS + 1:
+                raise ValueError(f'Hand with {len(self._closed)} closed tiles and {num_open_melds} open melds is not a 13-tile hand.')
+            # as in waits.regular_waits: the winning tile goes into group g, so every other group must already
+            # be complete and, together with group g, hold exactly one pair
+            patterns = [self._pattern(g) for g in range(len(SUIT_GROUPS))]
+            sizes = [sum(p) for p in patterns]
+            indices: set[int] = set()
+            for g, (start, _) in enumerate(SUIT_GROUPS):
+                if sizes[g] % 3 == 0:
+                    continue
+                num_pairs = 1 if sizes[g] % 3 == 1 else 0
+                if all(self._is_complete(h, sizes[h]) for h in range(len(SUIT_GROUPS)) if h != g):
+                    num_pairs += sum(1 for h in range(len(SUIT_GROUPS)) if h != g and sizes[h] % 3 == 2)
+                    if num_pairs == 1:
+                        indices.update(start + offset for offset in self._wait_table.group_waits(patterns[g]))
+
+            counts = self._closed.counts
+            if num_open_melds == 0 and self._special.shanten() == 0:
+                # 7 Pairs and 13 Orphans can only be formed with a closed hand
+                indices.update(chiitoitsu_waits(counts))
+                indices.update(kokushi_waits(counts))
+            # tiles that the hand (including its open melds) already holds every copy of cannot be won on
+            self._waits = [index_tile(i) for i in sorted(indices) if counts[i] + self._meld_counts[i] < MAX_COPIES]
+        return [*self._waits]
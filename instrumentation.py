@@ -0,0 +1,97 @@
+import heapq
+import time
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+from hand import Hand
+from tile import Tile
+
+# ---
+
+class Phase(StrEnum):
+    # the phases of RiichiMahjongScorer.get_points, in order
+    AGARI = 'agari'
+    YAKUMAN = 'yakuman'
+    YAKU = 'yaku'
+    BASE_POINTS = 'base_points'
+
+@dataclass
+class ScoringStats:
+    # filled in by a MeldGenerator and a RiichiMahjongScorer while enabled on them; see RiichiMahjongScorer.instrumented
+    _max_slowest: int = 10
+    _num_calls: int = 0
+    # suit/honor patterns looked up in the decomposition table
+    _num_lookups: int = 0
+    # tiles tried as the pair of a winning hand
+    _num_pair_candidates: int = 0
+    _num_decompositions: int = 0
+    _phase_ns: dict[Phase, int] = field(default_factory=lambda: dict.fromkeys(Phase, 0))
+    # (nanoseconds, hand) of the slowest get_points calls, as a min-heap
+    _slowest: list[tuple[int, str]] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        lines = [
+            f'{self._num_calls} calls, {self._num_lookups} lookups, {self._num_pair_candidates} pair candidates, {self._num_decompositions} decompositions',
+            *(f'  {phase:<12} {ns / 1e6:>10.3f} ms' for phase, ns in self._phase_ns.items()),
+            *(f'  {seconds * 1e6:>10.1f} us  {hand}' for seconds, hand in self.slowest),
+        ]
+        return '\n'.join(lines)
+
+    @property
+    def num_calls(self) -> int:
+        return self._num_calls
+    @property
+    def num_lookups(self) -> int:
+        return self._num_lookups
+    @property
+    def num_pair_candidates(self) -> int:
+        return self._num_pair_candidates
+    @property
+    def num_decompositions(self) -> int:
+        return self._num_decompositions
+    @property
+    def phase_seconds(self) -> dict[Phase, float]:
+        return {phase: ns / 1e9 for phase, ns in self._phase_ns.items()}
+    @property
+    def total_seconds(self) -> float:
+        return sum(self._phase_ns.values()) / 1e9
+    @property
+    def slowest(self) -> list[tuple[float, str]]:
+        # slowest calls first
+        return [(ns / 1e9, hand) for ns, hand in sorted(self._slowest, reverse=True)]
+
+    def count_lookups(self, num_lookups: int) -> None:
+        self._num_lookups += num_lookups
+
+    def count_pair_candidate(self) -> None:
+        self._num_pair_candidates += 1
+
+    def count_decomposition(self) -> None:
+        self._num_decompositions += 1
+
+    def add_phase(self, phase: Phase, ns: int) -> None:
+        self._phase_ns[phase] += ns
+
+    def lap(self, phase: Phase, start_ns: int) -> int:
+        # adds the time since start_ns to the phase, and returns the time the next phase starts
+        now = time.perf_counter_ns()
+        self._phase_ns[phase] += now - start_ns
+        return now
+
+    def add_call(self, ns: int, hand: Hand, winning_tile: Tile) -> None:
+        self._num_calls += 1
+        if self._max_slowest <= 0:
+            return
+        # the hand is only formatted if the call is slow enough to be kept
+        if len(self._slowest) < self._max_slowest:
+            heapq.heappush(self._slowest, (ns, f'{hand} + {winning_tile}'))
+        elif ns > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (ns, f'{hand} + {winning_tile}'))
+
+    def reset(self) -> None:
+        self._num_calls = 0
+        self._num_lookups = 0
+        self._num_pair_candidates = 0
+        self._num_decompositions = 0
+        self._phase_ns = dict.fromkeys(Phase, 0)
+        self._slowest = []
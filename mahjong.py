@@ -1,17 +1,35 @@
-from collections import Counter
+import time
+from array import array
+from contextlib import contextmanager
 from enum import StrEnum
-from collections.abc import Generator
-from sortedcontainers import SortedDict
+from collections.abc import Generator, Hashable
+from itertools import product
+
+from agari import DEFAULT_AGARI_INDEX, MAX_MELDS, AgariForm, AgariIndex, agari_forms
+from cache import CacheInfo, LRUCache
+from decomposition import DEFAULT_DECOMPOSITION_TABLE, DecompositionTable, IndexedDecomposition, IndexedMeld, SuitDecomposition
 
 from hand import Hand, HandFactory
+from instrumentation import Phase, ScoringStats
 from meld import Meld, MeldFactory
+from meld_enums import ClosedMeldKind
 from tile import HonorTile, SuitedTile, Tile, TileFactory
+from tile_counts import NUM_SUITED_KINDS, NUM_TILE_KINDS, RANKS_PER_SUIT, RED_FIVE_RANK, SUIT_GROUPS, SUITS, TileCounts, group_index, index_tile, tile_code, tile_index
 from tile_enums import Dragon, TileSuit, Wind
+from payment import DEFAULT_PAYMENT_TABLE, Payment, PaymentTable
+from shape import DRAGON_MASK, GREEN_MASK, HONOR_MASK, SUIT_MASKS, TERMINAL_MASK, WIND_MASK, HandShape, WaitShape, YakuContext
+from yaku import DEFAULT_YAKU_ENGINE, Yaku, YakuEngine
 
 # ---
 
 TILES_PER_HAND = 13
 
+# per-rank counts of 1112345678999, which every Nine Gates hand holds plus one tile
+NINE_GATES: tuple[int, ...] = (3, 1, 1, 1, 1, 1, 1, 1, 3)
+
+# tile index of the five of every suit
+_FIVE_INDICES: tuple[int, ...] = tuple(s * RANKS_PER_SUIT + RED_FIVE_RANK - 1 for s in range(len(SUITS)))
+
 class DoubleYakuman(StrEnum):
     THIRTEEN_WAIT_THIRTEEN_ORPHANS = '13-wait 13 Orphans'
     FOUR_CONCEALED_TRIPLETS_TANKI = 'Four Concealed Triplets - Tanki Wait'
@@ -25,7 +43,7 @@ class SingleYakuman(StrEnum):
     NINE_GATES = 'Nine Gates'
     FOUR_LITTLE_WINDS = 'Four Little Winds'
     ALL_HONORS = 'All Honors'
-    ALL_TRIPLETS = 'All Triplets'
+    ALL_TERMINALS = 'All Terminals'
     ALL_GREEN = 'All Green'
     FOUR_KANS = 'Four Kans'
 
@@ -48,93 +66,190 @@ class UnderState(StrEnum):
     UNDER_THE_RIVER = 'Under the River'
 
 class MeldGenerator:
-    def _yield_melds(self, tiles_sorteddict: SortedDict[Tile, int], melds: list[Meld], *, previous_meld: Meld | None = None) -> Generator[list[Meld], None, None]:
-        if sum(tiles_sorteddict.values()) % 3 != 0:
-            # check if tile count can be grouped into 3s
+    _decomposition_table: DecompositionTable
+    _stats: ScoringStats | None
+
+    def __init__(self, decomposition_table: DecompositionTable = DEFAULT_DECOMPOSITION_TABLE):
+        self._decomposition_table = decomposition_table
+        self._stats = None
+
+    @property
+    def stats(self) -> ScoringStats | None:
+        return self._stats
+
+    def enable_stats(self, stats: ScoringStats | None = None) -> ScoringStats:
+        self._stats = stats if stats is not None else ScoringStats()
+        return self._stats
+
+    def disable_stats(self) -> None:
+        self._stats = None
+
+    def _suit_decompositions(self, counts: array) -> list[tuple[SuitDecomposition, ...]]:
+        # split the hand into man/pin/sou/honors and look each pattern up in the table
+        if self._stats is not None:
+            self._stats.count_lookups(len(SUIT_GROUPS))
+        return [self._decomposition_table.get(tuple(counts[start:start+size])) for start, size in SUIT_GROUPS]
+
+    def _yield_indexed_melds(self, suit_decompositions: list[tuple[SuitDecomposition, ...]]) -> Generator[list[IndexedMeld], None, None]:
+        # every combination of per-suit decompositions is a decomposition of the whole hand;
+        # suits are combined in tile order, so this matches a search over the whole hand
+        stats = self._stats
+        for combination in product(*suit_decompositions):
+            if stats is not None:
+                stats.count_decomposition()
+            yield [(start + offset, kind) for (start, _), suit_melds in zip(SUIT_GROUPS, combination) for offset, kind in suit_melds]
+
+    def _to_meld(self, indexed_meld: IndexedMeld) -> Meld:
+        index, kind = indexed_meld
+        match kind:
+            case ClosedMeldKind.SEQUENCE:
+                return Meld([index_tile(index), index_tile(index+1), index_tile(index+2)])
+            case ClosedMeldKind.TRIPLET:
+                tile = index_tile(index)
+                return Meld([tile, tile, tile])
+
+    def _with_red_fives(self, tiles: list[Tile], red_fives_left: list[int]) -> list[Tile]:
+        # swaps plain fives for red ones while their suit has red fives left, so every red five goes
+        # back to the first meld (then the pair) holding a five of its suit
+        ret = tiles
+        for j, t in enumerate(tiles):
+            i = tile_index(t)
+            if i in _FIVE_INDICES and red_fives_left[i // RANKS_PER_SUIT]:
+                red_fives_left[i // RANKS_PER_SUIT] -= 1
+                if ret is tiles:
+                    ret = [*tiles]
+                ret[j] = index_tile(i, True)
+        return ret
+
+    def _to_melds(self, indexed_melds: list[IndexedMeld], red_fives_left: list[int]) -> list[Meld]:
+        ret = [*map(self._to_meld, indexed_melds)]
+        if any(red_fives_left):
+            ret = [Meld(self._with_red_fives(m.tiles, red_fives_left)) for m in ret]
+        return ret
+
+    def _yield_melds(self, suit_decompositions: list[tuple[SuitDecomposition, ...]], melds: list[Meld], red_fives: array) -> Generator[list[Meld], None, None]:
+        for indexed_melds in self._yield_indexed_melds(suit_decompositions):
+            yield [*melds, *self._to_melds(indexed_melds, [*red_fives])]
+
+    def _check_meldable(self, num_tiles: int) -> None:
+        # check if tile count can be grouped into 3s
+        if num_tiles % 3 != 0:
             raise ValueError('Total number of tiles not divisible by 3; cannot group into melds')
-        elif sum(tiles_sorteddict.values()) == 0:
-            # Base Case: yield melds if there are no more tiles to be processed
-            yield melds
-        else:
-            # get leftmost "unmelded" tile in dictionary (hence the SortedDict use)
-            first_tile, first_tile_freq = tiles_sorteddict.peekitem(index=0)
-
-            # check if first_tile can be part of a sequence
-            match first_tile:
-                case SuitedTile(rank=rank, suit=suit):
-                    next1_tile = SuitedTile(rank+1, suit)
-                    next2_tile = SuitedTile(rank+2, suit)
-                    new_meld_list: list[Tile] = [first_tile, next1_tile, next2_tile]
-
-                    if rank <= 7 and tiles_sorteddict.get(next1_tile, 0) >= 1 and tiles_sorteddict.get(next2_tile, 0) >= 1:
-                        # remove sequence starting with first_tile
-                        for t in new_meld_list:
-                            tiles_sorteddict[t] -= 1
-                            if tiles_sorteddict[t] == 0:
-                                del tiles_sorteddict[t]
-
-                        new_meld = Meld(new_meld_list)
-                        melds.append(new_meld)
-                        # only yield melds in "increasing order" to avoid yielding redundant meld permutations
-                        if previous_meld is None or previous_meld <= new_meld:
-                            yield from self._yield_melds(tiles_sorteddict, melds, previous_meld=new_meld)
-
-                        # undo updates
-                        for t in new_meld_list:
-                            tiles_sorteddict[t] = tiles_sorteddict.get(t, 0) + 1
-                        melds.pop()
-                case _:
-                    pass
-
-            # check if first_tile can be part of a triplet
-            if first_tile_freq >= 3:
-                # remove triplet of first_tile
-                tiles_sorteddict[first_tile] -= 3
-                if tiles_sorteddict[first_tile] == 0:
-                    del tiles_sorteddict[first_tile]
 
-                new_meld = Meld([first_tile for _ in range(3)])
-                melds.append(new_meld)
-                # only yield melds in "increasing order" to avoid yielding redundant meld permutations
-                if previous_meld is None or previous_meld <= new_meld:
-                    yield from self._yield_melds(tiles_sorteddict, melds, previous_meld=new_meld)
+    def yield_melds_from_counts(self, tile_counts: TileCounts, melds: list[Meld]) -> Generator[list[Meld], None, None]:
+        counts = tile_counts.counts
+        self._check_meldable(sum(counts))
+        yield from self._yield_melds(self._suit_decompositions(counts), melds, tile_counts.red_fives)
 
-                # undo updates
-                tiles_sorteddict[first_tile] = tiles_sorteddict.get(first_tile, 0) + 3
-                melds.pop()
-        
-    def yield_melds(self, tiles_dict: dict[Tile, int], melds: list[Meld]) -> Generator[list[Meld], None, None]:
-        tiles_sorteddict: SortedDict[Tile, int] = SortedDict()
-        for k, v in tiles_dict.items():
-            tiles_sorteddict[k] = v
-        yield from self._yield_melds(tiles_sorteddict, melds)
+    def yield_decompositions_from_counts(self, tile_counts: TileCounts) -> Generator[IndexedDecomposition, None, None]:
+        # (pair tile index, melds as (first tile index, kind)) without creating any Tile or Meld
+        counts = tile_counts.counts[:]
+        suit_decompositions = self._suit_decompositions(counts)
+        for i in range(NUM_TILE_KINDS):
+            # check if pair can be retrieved from current tile
+            if counts[i] >= 2:
+                self._check_meldable(sum(counts) - 2)
+                if self._stats is not None:
+                    self._stats.count_pair_candidate()
 
-    def yield_melds_with_pair(self, tiles_dict: dict[Tile, int], melds: list[Meld]) -> Generator[tuple[list[Meld], tuple[Tile, Tile]], None, None]:
-        tiles_sorteddict: SortedDict[Tile, int] = SortedDict()
-        for k, v in tiles_dict.items():
-            tiles_sorteddict[k] = v
+                # only the suit holding the pair changes; every other suit must already be decomposable
+                group = group_index(i)
+                if not all(suit_decompositions[g] for g in range(len(SUIT_GROUPS)) if g != group):
+                    continue
 
-        TILES: list[Tile] = [*tiles_sorteddict.keys()]
-        for t in TILES:
-            # check if pair can be retrieved from current tile
-            if tiles_sorteddict[t] >= 2:
                 # remove pair of current tile
-                pair: tuple[Tile, Tile] = (t, t)
-                tiles_sorteddict[t] -= 2
-                if tiles_sorteddict[t] == 0:
-                    del tiles_sorteddict[t]
+                counts[i] -= 2
+                start, size = SUIT_GROUPS[group]
+                pair_decompositions = [*suit_decompositions]
+                if self._stats is not None:
+                    self._stats.count_lookups(1)
+                pair_decompositions[group] = self._decomposition_table.get(tuple(counts[start:start+size]))
 
-                for melds in self._yield_melds(tiles_sorteddict, []):
-                    yield melds, pair
+                for indexed_melds in self._yield_indexed_melds(pair_decompositions):
+                    yield i, indexed_melds
 
                 # undo updates
-                tiles_sorteddict[t] = tiles_sorteddict.get(t, 0) + 2
+                counts[i] += 2
+
+    def yield_melds_with_pair_from_counts(self, tile_counts: TileCounts, melds: list[Meld]) -> Generator[tuple[list[Meld], tuple[Tile, Tile]], None, None]:
+        for pair_index, indexed_melds in self.yield_decompositions_from_counts(tile_counts):
+            red_fives_left = [*tile_counts.red_fives]
+            closed_melds = self._to_melds(indexed_melds, red_fives_left)
+            tile = index_tile(pair_index)
+            pair = self._with_red_fives([tile, tile], red_fives_left)
+            yield [*melds, *closed_melds], (pair[0], pair[1])
+
+    # red fives stay on the melds (or pair) they are decomposed into
+    def yield_melds(self, tiles_dict: dict[Tile, int], melds: list[Meld]) -> Generator[list[Meld], None, None]:
+        yield from self.yield_melds_from_counts(self._to_counts(tiles_dict), melds)
+
+    def yield_melds_with_pair(self, tiles_dict: dict[Tile, int], melds: list[Meld]) -> Generator[tuple[list[Meld], tuple[Tile, Tile]], None, None]:
+        yield from self.yield_melds_with_pair_from_counts(self._to_counts(tiles_dict), melds)
+
+    def _to_counts(self, tiles_dict: dict[Tile, int]) -> TileCounts:
+        ret = TileCounts()
+        for k, v in tiles_dict.items():
+            ret.counts[tile_index(k)] += v
+            if type(k) is SuitedTile and k.red_dora:
+                ret.red_fives[k.suit.value // RANKS_PER_SUIT] += v
+        return ret
 
 class RiichiMahjongScorer:
     _meld_generator: MeldGenerator
-
-    def __init__(self, meld_generator: MeldGenerator):
+    _agari_index: AgariIndex
+    _yaku_engine: YakuEngine
+    _payment_table: PaymentTable
+    _cache: LRUCache[Hashable, dict] | None
+    _stats: ScoringStats | None
+
+    def __init__(
+            self, meld_generator: MeldGenerator, *, cache_size: int | None = None,
+            agari_index: AgariIndex = DEFAULT_AGARI_INDEX, yaku_engine: YakuEngine = DEFAULT_YAKU_ENGINE,
+            payment_table: PaymentTable = DEFAULT_PAYMENT_TABLE):
         self._meld_generator = meld_generator
+        self._agari_index = agari_index
+        self._yaku_engine = yaku_engine
+        self._payment_table = payment_table
+        self._cache = LRUCache(cache_size) if cache_size is not None else None
+        self._stats = None
+
+    def enable_cache(self, cache_size: int) -> None:
+        self._cache = LRUCache(cache_size)
+
+    def disable_cache(self) -> None:
+        self._cache = None
+
+    def cache_info(self) -> CacheInfo | None:
+        return self._cache.info() if self._cache is not None else None
+
+    def cache_clear(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
+
+    @property
+    def stats(self) -> ScoringStats | None:
+        return self._stats
+
+    def enable_stats(self, stats: ScoringStats | None = None) -> ScoringStats:
+        # the meld generator reports into the same stats
+        self._stats = self._meld_generator.enable_stats(stats)
+        return self._stats
+
+    def disable_stats(self) -> None:
+        self._stats = None
+        self._meld_generator.disable_stats()
+
+    @contextmanager
+    def instrumented(self, stats: ScoringStats | None = None) -> Generator[ScoringStats, None, None]:
+        # collects stats for the duration of a with block, or of every call to a decorated function
+        previous = self._stats
+        try:
+            yield self.enable_stats(stats)
+        finally:
+            if previous is None:
+                self.disable_stats()
+            else:
+                self.enable_stats(previous)
 
     def count_yakuman(self, yakuman: dict[Yakuman, int]) -> int:
         return sum(yakuman.values())
@@ -146,26 +261,74 @@ class RiichiMahjongScorer:
             fu += y[1]
         return han, fu
 
-    def get_yakuman(self, hand: Hand, winning_tile: Tile, *, win_type: WinType) -> dict[Yakuman, int]:
+    def get_yakuman(self, hand: Hand, winning_tile: Tile, *, win_type: WinType, forms: AgariForm | None = None) -> dict[Yakuman, int]:
+        # forms are the hand's agari forms, for callers that already checked them
+        if self._cache is None:
+            return self._get_yakuman(hand, winning_tile, win_type=win_type, forms=forms)
+
+        key = ('yakuman', hand.canonical_key(), tile_code(winning_tile), win_type)
+        ret = self._cache.get(key)
+        if ret is None:
+            ret = self._get_yakuman(hand, winning_tile, win_type=win_type, forms=forms)
+            self._cache.put(key, ret)
+        # hand out copies so callers cannot modify cached results
+        return dict(ret)
+
+    def _get_yakuman(self, hand: Hand, winning_tile: Tile, *, win_type: WinType, forms: AgariForm | None) -> dict[Yakuman, int]:
         yakuman: dict[Yakuman, int] = {}
-        TILES: list[Tile] = sorted([*hand.all_tiles, winning_tile])
-        TILES_DICT: dict[Tile, int] = dict(Counter(TILES))
-        assert len(TILES) == TILES_PER_HAND+1
+        closed_counts = hand.closed_counts
+        closed_counts.add(winning_tile)
+        counts = closed_counts.counts
+        winning_index = tile_index(winning_tile)
+
+        # every check below relies on the hand being complete: honors with 3 or more copies are then
+        # always triplets, and the closed tiles hold exactly one pair
+        if forms is None:
+            forms = self._agari_index.forms(counts, len(hand.open_melds))
+        if forms == AgariForm.NONE:
+            return yakuman
+
+        # kinds held anywhere in the hand, and honor kinds held as a triplet/quad or as the pair
+        tile_mask = 0
+        honor_triplet_mask = 0
+        honor_pair_mask = 0
+        for i, c in enumerate(counts):
+            if c:
+                tile_mask |= 1 << i
+        for i in range(NUM_SUITED_KINDS, NUM_TILE_KINDS):
+            if counts[i] >= 3:
+                honor_triplet_mask |= 1 << i
+            elif counts[i] == 2:
+                honor_pair_mask |= 1 << i
+
+        # open melds, and closed kans declared from the hand
+        is_closed = True
+        num_quads = 0
+        num_closed_kans = 0
+        for m in hand.open_melds:
+            indices = [tile_index(t) for t in m.tiles]
+            for i in indices:
+                tile_mask |= 1 << i
+            if indices[0] == indices[-1]:
+                honor_triplet_mask |= (1 << indices[0]) & HONOR_MASK
+            if len(indices) == 4:
+                num_quads += 1
+                num_closed_kans += 0 if m.is_open else 1
+            is_closed = is_closed and not m.is_open
 
         # 13o
-        set_13o: set[Tile] = {*(SuitedTile(i, s) for i in (1, 9) for s in TileSuit), *(HonorTile(w) for w in Wind), *(HonorTile(d) for d in Dragon)}
-        if set(TILES) == set_13o:
-            if set(hand.all_tiles) == set_13o:
-                # 13-wait (Double Yakuman)
+        if forms & AgariForm.THIRTEEN_ORPHANS:
+            if counts[winning_index] == 2:
+                # 13-wait: the winning tile completed the pair (Double Yakuman)
                 yakuman[DoubleYakuman.THIRTEEN_WAIT_THIRTEEN_ORPHANS] = 2
             else:
                 # regular (Single Yakuman)
                 yakuman[SingleYakuman.THIRTEEN_ORPHANS] = 1
 
         # 4CT
-        # TODO: consider closed kans for 4CT
-        if set(TILES_DICT.values()) == {2,3,3,3,3}:
-            match set(hand.all_tiles_dict.values()) == {1,3,3,3,3}, win_type:
+        # the closed tiles are one pair plus a triplet for every meld that is not a closed kan
+        if is_closed and counts.count(2) == 1 and counts.count(3) == MAX_MELDS - num_closed_kans:
+            match counts[winning_index] == 2, win_type:
                 case True, _:
                     # Suuankou Tanki / Four Concealed Triplets - Tanki Wait
                     # Tanki wait (Double Yakuman)
@@ -179,17 +342,47 @@ class RiichiMahjongScorer:
                     # only counts as 3CT (no Yakuman)
                     pass
 
-        # TODO: Daisangen / Big Three Dragons
-        # TODO: Suushiihou / Four Winds
-            # TODO: Daisuushii / Four Big Winds
-            # TODO: Shousuushii / Four Little Winds
-        # TODO: / All Terminals 
-        # TODO: / All Honors
-        # TODO: / Nine Gates
-            # TODO: / True Nine Gates
-            # TODO: / Nine Gates
-        # TODO: / All Green
-        # TODO: / Four Kans
+        # Daisangen / Big Three Dragons
+        if honor_triplet_mask & DRAGON_MASK == DRAGON_MASK:
+            yakuman[SingleYakuman.BIG_THREE_DRAGONS] = 1
+
+        # Suushiihou / Four Winds
+        match (honor_triplet_mask & WIND_MASK).bit_count(), honor_pair_mask & WIND_MASK != 0:
+            case 4, _:
+                # Daisuushii / Four Big Winds (Double Yakuman)
+                yakuman[DoubleYakuman.FOUR_BIG_WINDS] = 2
+            case 3, True:
+                # Shousuushii / Four Little Winds
+                yakuman[SingleYakuman.FOUR_LITTLE_WINDS] = 1
+            case _:
+                pass
+
+        # Tsuuiisou / All Honors
+        if tile_mask & ~HONOR_MASK == 0:
+            yakuman[SingleYakuman.ALL_HONORS] = 1
+
+        # Chinroutou / All Terminals
+        if tile_mask & ~TERMINAL_MASK == 0:
+            yakuman[SingleYakuman.ALL_TERMINALS] = 1
+
+        # Chuuren Poutou / Nine Gates
+        # 1112345678999 of one suit plus any tile of that suit, with no calls (not even closed kans)
+        if not hand.open_melds and any(tile_mask & ~m == 0 for m in SUIT_MASKS):
+            start = winning_index - winning_index % RANKS_PER_SUIT
+            if all(c >= g for c, g in zip(counts[start:start+RANKS_PER_SUIT], NINE_GATES)):
+                if counts[winning_index] == NINE_GATES[winning_index - start] + 1:
+                    # 9-wait: the tiles before the winning tile were exactly 1112345678999 (Double Yakuman)
+                    yakuman[DoubleYakuman.TRUE_NINE_GATES] = 2
+                else:
+                    yakuman[SingleYakuman.NINE_GATES] = 1
+
+        # Ryuuiisou / All Green
+        if tile_mask & ~GREEN_MASK == 0:
+            yakuman[SingleYakuman.ALL_GREEN] = 1
+
+        # Suukantsu / Four Kans
+        if num_quads == MAX_MELDS:
+            yakuman[SingleYakuman.FOUR_KANS] = 1
 
         return yakuman
 
@@ -197,28 +390,61 @@ class RiichiMahjongScorer:
             self, hand: Hand, winning_tile: Tile, *,
             round_wind: Wind, seat_wind: Wind,
             win_type: WinType, riichi: RiichiState, under: UnderState,
-            dora: list[Tile], ura_dora: list[Tile]) -> dict[str, tuple[int, int]]:
+            dora: list[Tile], ura_dora: list[Tile], forms: AgariForm | None = None) -> dict[str, tuple[int, int]]:
+        # forms are the hand's agari forms, for callers that already checked them
+        if self._cache is None:
+            return self._get_yaku(
+                hand, winning_tile,
+                round_wind=round_wind, seat_wind=seat_wind,
+                win_type=win_type, riichi=riichi, under=under,
+                dora=dora, ura_dora=ura_dora, forms=forms
+            )
+
+        key = (
+            'yaku', hand.canonical_key(), tile_code(winning_tile),
+            round_wind, seat_wind, win_type, riichi, under,
+            bytes(sorted(tile_code(d) for d in dora)), bytes(sorted(tile_code(ud) for ud in ura_dora)),
+        )
+        ret = self._cache.get(key)
+        if ret is None:
+            ret = self._get_yaku(
+                hand, winning_tile,
+                round_wind=round_wind, seat_wind=seat_wind,
+                win_type=win_type, riichi=riichi, under=under,
+                dora=dora, ura_dora=ura_dora, forms=forms
+            )
+            self._cache.put(key, ret)
+        # hand out copies so callers cannot modify cached results
+        return dict(ret)
+
+    def _get_yaku(
+            self, hand: Hand, winning_tile: Tile, *,
+            round_wind: Wind, seat_wind: Wind,
+            win_type: WinType, riichi: RiichiState, under: UnderState,
+            dora: list[Tile], ura_dora: list[Tile], forms: AgariForm | None) -> dict[str, tuple[int, int]]:
         yaku: dict[str, tuple[int, int]] = {}
-        han, _ = 0, 0
+        # han from yaku; dora, red dora, ura dora and kita are kept apart, as they only count once the hand has a yaku
+        han = 0
+        dora_han = 0
+
+        COUNTS: TileCounts = hand.counts
+        COUNTS.add(winning_tile)
+        is_closed = all(not m.is_open for m in hand.open_melds)
 
-        #HAND_DICT: dict[Tile, int] = dict(Counter(hand.tiles))
-        TILES: list[Tile] = sorted([*hand.all_tiles, winning_tile])
-        #TILES_DICT: dict[Tile, int] = dict(Counter(TILES))
+        # add han from Tsumo if closed
+        tsumo_han: int = 1 if win_type == WinType.TSUMO and is_closed else 0
+        han += tsumo_han
+        if tsumo_han:
+            yaku[WinType.TSUMO] = (tsumo_han, 0)
 
         # add han from Riichi/Ippatsu
         match riichi:
             case RiichiState.NONE:
                 pass
             case _:
-                # add han from Tsumo if Riichi
-                tsumo_han: int = 1 if win_type == WinType.TSUMO else 0
-                han += tsumo_han
-                if tsumo_han:
-                    yaku[WinType.TSUMO] = (tsumo_han, 0)
-
                 # add han from Ura Dora
-                ura_dora_count = sum((1 for ud in ura_dora for t in TILES if ud == t))
-                han += ura_dora_count
+                ura_dora_count = sum((COUNTS[tile_index(ud)] for ud in ura_dora))
+                dora_han += ura_dora_count
                 if ura_dora_count:
                     yaku[f'{ura_dora_count} Ura Dora'] = (ura_dora_count, 0)
 
@@ -244,105 +470,171 @@ class RiichiMahjongScorer:
                 han += ippatsu_han
 
         # add han from Kita
-        han += hand.num_kita
+        dora_han += hand.num_kita
         if hand.num_kita:
             yaku[f'{hand.num_kita} Kita'] = (hand.num_kita, 0)
 
         # add han from Red Dora
-        red_dora_count = 0
-        for tile in TILES:
-            match tile:
-                case SuitedTile(red_dora=red_dora):
-                    if red_dora:
-                        red_dora_count += 1
-                case _:
-                    pass
-        han += red_dora_count
+        red_dora_count = COUNTS.num_red_fives
+        dora_han += red_dora_count
         if red_dora_count:
             yaku[f'{red_dora_count} Red Dora'] = (red_dora_count, 0)
 
         # add han from Dora
-        dora_count = sum((1 for d in dora for t in TILES if d == t))
-        han += dora_count
+        dora_count = sum((COUNTS[tile_index(d)] for d in dora))
+        dora_han += dora_count
         if dora_count:
             yaku[f'{dora_count} Dora'] = (dora_count, 0)
 
+        # add han from Under the Sea/River
+        match under, win_type:
+            case (UnderState.UNDER_THE_SEA, WinType.TSUMO) | (UnderState.UNDER_THE_RIVER, WinType.RON):
+                han += 1
+                yaku[under] = (1, 0)
+            case _:
+                pass
+
         # ---
 
-        # TODO: implement actual yaku check using meld generator
+        # add han and fu from the best interpretation of the hand's structure
+        _, structure_yaku, fu = self._yaku_engine.best(
+            self._hand_shapes(hand, winning_tile, win_type, forms), YakuContext(seat_wind, round_wind, win_type == WinType.TSUMO),
+            han + dora_han, has_yaku=han > 0)
+        for y, y_han in structure_yaku.items():
+            han += y_han
+            yaku[y] = (y_han, 0)
+        if fu:
+            yaku[f'{fu} Fu'] = (0, fu)
 
         # ---
 
-        # clear yaku if 0 han
+        # a hand without yaku cannot win, however much dora it holds
         if han == 0:
             yaku.clear()
-            han, _ = 0, 0
 
         return yaku
 
+    def _hand_shapes(self, hand: Hand, winning_tile: Tile, win_type: WinType, forms: AgariForm | None) -> list[HandShape]:
+        # every interpretation of the closed tiles plus the winning tile, if they complete the hand
+        closed_counts = hand.closed_counts
+        closed_counts.add(winning_tile)
+        if forms is None:
+            forms = self._agari_index.forms(closed_counts.counts, len(hand.open_melds))
+
+        ret: list[HandShape] = []
+        if forms & AgariForm.REGULAR:
+            ret.extend(self._yaku_engine.shapes(
+                self._meld_generator.yield_decompositions_from_counts(closed_counts),
+                hand.open_melds, tile_index(winning_tile), win_type == WinType.TSUMO
+            ))
+        if forms & AgariForm.SEVEN_PAIRS:
+            shape = self._yaku_engine.seven_pairs_shape(closed_counts.counts)
+            if shape is not None:
+                ret.append(shape)
+        return ret
+
     def compute_base_points(self, yakuman: int, han: int, fu: int) -> int:
-        if yakuman > 0:
-            # [multiple] yakuman
-            return 8000 * yakuman
-        elif han >= 13:
-            # kazoe yakuman
-            return 8000
-        elif han >= 11:
-            # sanbaiman
-            return 6000
-        elif han >= 8:
-            # baiman
-            return 4000
-        elif han >= 6:
-            # haneman
-            return 3000
-        elif han == 5 or (han == 4 and fu >= 40) or (han == 3 and fu >= 70):
-            # mangan
-            return 2000
-        else:
-            return min(2000, fu * 2**(2+han))
+        return self._payment_table.lookup(yakuman, han, fu).base_points
 
     def get_points(
             self, hand: Hand, winning_tile: Tile, *,
             round_wind: Wind, seat_wind: Wind,
             win_type: WinType, riichi: RiichiState, under: UnderState,
             dora: list[Tile], ura_dora: list[Tile]) -> int:
+        return self.get_payment(
+            hand, winning_tile,
+            round_wind=round_wind, seat_wind=seat_wind,
+            win_type=win_type, riichi=riichi, under=under,
+            dora=dora, ura_dora=ura_dora
+        ).base_points
+
+    def get_payment(
+            self, hand: Hand, winning_tile: Tile, *,
+            round_wind: Wind, seat_wind: Wind,
+            win_type: WinType, riichi: RiichiState, under: UnderState,
+            dora: list[Tile], ura_dora: list[Tile]) -> Payment:
+        # see Payment.settle for what every seat pays
+        stats = self._stats
+        if stats is None:
+            return self._get_payment(
+                hand, winning_tile,
+                round_wind=round_wind, seat_wind=seat_wind,
+                win_type=win_type, riichi=riichi, under=under,
+                dora=dora, ura_dora=ura_dora, stats=None
+            )
+
+        start = time.perf_counter_ns()
+        ret = self._get_payment(
+            hand, winning_tile,
+            round_wind=round_wind, seat_wind=seat_wind,
+            win_type=win_type, riichi=riichi, under=under,
+            dora=dora, ura_dora=ura_dora, stats=stats
+        )
+        stats.add_call(time.perf_counter_ns() - start, hand, winning_tile)
+        return ret
+
+    def _get_payment(
+            self, hand: Hand, winning_tile: Tile, *,
+            round_wind: Wind, seat_wind: Wind,
+            win_type: WinType, riichi: RiichiState, under: UnderState,
+            dora: list[Tile], ura_dora: list[Tile], stats: ScoringStats | None) -> Payment:
         num_yakuman, han, fu = 0, 0, 0
+        lap = time.perf_counter_ns() if stats is not None else 0
 
         if len(hand.tiles) + 3*len(hand.open_melds) == TILES_PER_HAND:
-            yakuman = self.get_yakuman(hand, winning_tile, win_type=win_type)
+            # hands that the winning tile does not complete score nothing, and are never decomposed
+            forms = agari_forms(hand, winning_tile, index=self._agari_index)
+            if stats is not None:
+                lap = stats.lap(Phase.AGARI, lap)
+            if forms == AgariForm.NONE:
+                return self._payment_table.lookup(0, 0, 0)
+
+            yakuman = self.get_yakuman(hand, winning_tile, win_type=win_type, forms=forms)
             num_yakuman = sum(yakuman.values())
+            if stats is not None:
+                lap = stats.lap(Phase.YAKUMAN, lap)
 
             if num_yakuman == 0:
                 yaku = self.get_yaku(
                     hand, winning_tile,
                     round_wind=round_wind, seat_wind=seat_wind,
                     win_type=win_type, riichi=riichi, under=under,
-                    dora=dora, ura_dora=ura_dora
+                    dora=dora, ura_dora=ura_dora, forms=forms
                 )
 
                 for y in yaku.values():
                     han += y[0]
                     fu += y[1]
+                if stats is not None:
+                    lap = stats.lap(Phase.YAKU, lap)
 
-        return self.compute_base_points(num_yakuman, han, fu)
+        ret = self._payment_table.lookup(num_yakuman, han, fu)
+        if stats is not None:
+            stats.lap(Phase.BASE_POINTS, lap)
+        return ret
 
 # ---
 
-tf = TileFactory()
-mf = MeldFactory(tf)
-hf = HandFactory(tf, mf)
-mg = MeldGenerator()
-scorer = RiichiMahjongScorer(mg)
-
-str1 = '22223333444455m'
-hand1 = hf.create_hand(str1, 1)
-print(str1)
-for melds, pair in mg.yield_melds_with_pair(hand1.all_tiles_dict, []):
-    print(*[str(meld) for meld in melds], *pair)
-
-str2 = '222233334444m'
-hand2 = hf.create_hand(str2, 1)
-print(str2)
-for melds in mg.yield_melds(hand2.all_tiles_dict, []):
-    print(*[str(meld) for meld in melds])
\ No newline at end of file
+def main(argv: list[str] | None = None) -> None:
+    # prints every decomposition of each hand, with a pair for 3n+2 tiles and without for 3n
+    import argparse  # only needed when run as a script, so kept out of the import path
+
+    parser = argparse.ArgumentParser(description='Print the meld decompositions of hands.')
+    parser.add_argument('hands', nargs='*', default=['22223333444455m', '222233334444m'])
+    args = parser.parse_args(argv)
+
+    tf = TileFactory()
+    hf = HandFactory(tf, MeldFactory(tf))
+    mg = MeldGenerator()
+    for raw in args.hands:
+        hand = hf.create_hand(raw, 1)
+        print(raw)
+        if len(hand.all_tiles) % 3 == 2:
+            for melds, pair in mg.yield_melds_with_pair(hand.all_tiles_dict, []):
+                print(*[str(meld) for meld in melds], *pair)
+        else:
+            for melds in mg.yield_melds(hand.all_tiles_dict, []):
+                print(*[str(meld) for meld in melds])
+
+if __name__ == '__main__':
+    main()
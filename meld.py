@@ -32,6 +32,10 @@ class Meld:
     def tiles(self) -> list[Tile]:
         return self._tiles
 
+    @property
+    def is_open(self) -> bool:
+        return self._is_open
+
     @property
     def meld_kind(self) -> MeldKind | None:
         match len(self._tiles):
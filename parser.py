@@ -0,0 +1,191 @@
+from collections.abc import Generator, Iterable
+
+from hand import Hand
+from meld import Meld
+from tile import INTERNED_TILES, Tile
+from tile_counts import NUM_TILE_CODES, TileCounts, code_tile, tile_code
+
+# ---
+
+# Hand strings use the same notation as HandFactory.create_hand: groups of ranks followed by a suit
+# letter, separated by whitespace, with open melds joined by '-' in the last group.
+#
+#   "123m 456p 11z 789s-555m"
+
+class HandParseError(ValueError):
+    _message: str
+    _line_number: int
+    _column: int
+
+    def __init__(self, message: str, line_number: int, column: int):
+        super().__init__(f'line {line_number}, column {column}: {message}')
+        self._message = message
+        self._line_number = line_number
+        self._column = column
+
+    @property
+    def message(self) -> str:
+        return self._message
+    @property
+    def line_number(self) -> int:
+        return self._line_number
+    @property
+    def column(self) -> int:
+        return self._column
+
+# (closed tile codes, open melds as tile codes)
+ParsedCodes = tuple[bytearray, list[bytearray]]
+
+# tile code of every (rank character, suit letter) pair, e.g. '0m' -> red 5m
+_TILE_CODES: dict[str, int] = {raw: tile_code(t) for raw, t in INTERNED_TILES.items()}
+_CODE_TILES: tuple[Tile, ...] = tuple(code_tile(c) for c in range(NUM_TILE_CODES))
+
+_RANK_CHARS = frozenset('0123456789')
+_SUIT_CHARS = frozenset(raw[-1] for raw in INTERNED_TILES)
+_SPACE_CHARS = frozenset(' \t\r\n')
+
+# ---
+
+class HandParser:
+    # tile codes of every whitespace-separated group seen so far, e.g. '406m' -> b'\x03\x22\x05'
+    _group_codes: dict[str, bytes]
+    _max_groups: int
+
+    def __init__(self, max_groups: int = 1 << 16):
+        self._group_codes = {}
+        self._max_groups = max_groups
+
+    def _codes(self, group: str) -> bytes | None:
+        ret = self._group_codes.get(group)
+        if ret is None:
+            codes = bytearray()
+            pending = 0
+            for i, ch in enumerate(group):
+                if ch in _RANK_CHARS:
+                    pending += 1
+                elif ch in _SUIT_CHARS and pending:
+                    for r in group[i-pending:i]:
+                        code = _TILE_CODES.get(r + ch)
+                        if code is None:
+                            return None
+                        codes.append(code)
+                    pending = 0
+                else:
+                    return None
+            if pending:
+                return None
+            ret = bytes(codes)
+            if len(self._group_codes) < self._max_groups:
+                self._group_codes[group] = ret
+        return ret
+
+    def _parse_fast(self, line: str) -> ParsedCodes | None:
+        # None if the line is malformed anywhere; the scanner below then finds and reports the error
+        groups = line.split()
+        meld_groups: list[str] = []
+        if groups and '-' in groups[-1]:
+            meld_groups = groups.pop().split('-')
+
+        closed = bytearray()
+        for g in groups:
+            codes = self._codes(g)
+            if codes is None:
+                return None
+            closed += codes
+        melds: list[bytearray] = []
+        for g in meld_groups:
+            codes = self._codes(g)
+            if not codes:
+                return None
+            melds.append(bytearray(codes))
+        return closed, melds
+
+    def parse_codes(self, line: str, line_number: int = 1) -> ParsedCodes:
+        ret = self._parse_fast(line)
+        if ret is None:
+            ret = self._scan(line, line_number)
+        return ret
+
+    def _scan(self, line: str, line_number: int) -> ParsedCodes:
+        # character by character, so that errors carry their exact column
+        closed = bytearray()
+        melds: list[bytearray] = []
+        target = closed
+        # columns (1-based) of ranks still waiting for their suit letter
+        pending: list[int] = []
+        # where the current whitespace-separated group starts in closed, in case it turns out to be a meld
+        group_start = 0
+        is_group_empty = True
+        is_after_melds = False
+
+        for column, ch in enumerate(line, 1):
+            if ch in _SPACE_CHARS:
+                if pending:
+                    raise HandParseError('ranks have no suit', line_number, pending[0])
+                if melds and not is_after_melds:
+                    if not target:
+                        raise HandParseError('open meld has no tiles', line_number, column)
+                    is_after_melds = True
+                group_start = len(closed)
+                is_group_empty = True
+                continue
+            if is_after_melds:
+                raise HandParseError('open melds must be the last group', line_number, column)
+
+            if ch in _RANK_CHARS:
+                pending.append(column)
+                is_group_empty = False
+            elif ch in _SUIT_CHARS:
+                if not pending:
+                    raise HandParseError(f'suit "{ch}" has no ranks', line_number, column)
+                for c in pending:
+                    code = _TILE_CODES.get(line[c-1] + ch)
+                    if code is None:
+                        raise HandParseError(f'invalid tile "{line[c-1]}{ch}"', line_number, c)
+                    target.append(code)
+                pending.clear()
+            elif ch == '-':
+                if pending:
+                    raise HandParseError('ranks have no suit', line_number, pending[0])
+                if not melds:
+                    if is_group_empty:
+                        raise HandParseError('open meld has no tiles', line_number, column)
+                    # the group before the first '-' is itself an open meld
+                    melds.append(closed[group_start:])
+                    del closed[group_start:]
+                elif not target:
+                    raise HandParseError('open meld has no tiles', line_number, column)
+                target = bytearray()
+                melds.append(target)
+            else:
+                raise HandParseError(f'unexpected character "{ch}"', line_number, column)
+
+        if pending:
+            raise HandParseError('ranks have no suit', line_number, pending[0])
+        if melds and not melds[-1]:
+            raise HandParseError('open meld has no tiles', line_number, len(line) + 1)
+        return closed, melds
+
+    def parse_hand(self, line: str, line_number: int = 1, num_kita: int = 0) -> Hand:
+        closed, melds = self.parse_codes(line, line_number)
+        return Hand(
+            [_CODE_TILES[c] for c in closed],
+            [Meld([_CODE_TILES[c] for c in m], True) for m in melds],
+            num_kita,
+        )
+
+    def parse_counts(self, line: str, line_number: int = 1) -> tuple[TileCounts, int]:
+        # closed tile counts and the number of open melds, without building any Tile or Meld
+        closed, melds = self.parse_codes(line, line_number)
+        return TileCounts.from_codes(closed), len(melds)
+
+    def parse_hands(self, lines: Iterable[str]) -> Generator[Hand, None, None]:
+        # lines may be any iterable of strings, including an open file; blank lines are skipped
+        for line_number, line in enumerate(lines, 1):
+            if line.strip():
+                yield self.parse_hand(line, line_number)
+
+    def parse_all_counts(self, lines: Iterable[str]) -> Generator[tuple[TileCounts, int], None, None]:
+        for line_number, line in enumerate(lines, 1):
+            if line.strip():
+                yield self.parse_counts(line, line_number)
@@ -0,0 +1,142 @@
+from dataclasses import dataclass
+
+from fu import base_points
+from tile_enums import Wind
+
+# ---
+
+# the largest key of the table; anything beyond it is computed on the fly
+MAX_YAKUMAN = 6
+MAX_FU = 140
+# han from 13 up all score kazoe yakuman
+MAX_HAN = 13
+# fu are multiples of 10, apart from 25 for 7 Pairs
+FU_STEP = 5
+NUM_FU = MAX_FU // FU_STEP + 1
+
+# honba are paid in full by the discarder, or by each payer of a tsumo
+RON_HONBA = 300
+TSUMO_HONBA = 100
+RIICHI_STICK = 1000
+
+# the dealer is always the seat with the East seat wind; 3-player games have no North seat
+DEALER = Wind.EAST
+SEATS: dict[int, tuple[Wind, ...]] = {
+    4: (Wind.EAST, Wind.SOUTH, Wind.WEST, Wind.NORTH),
+    3: (Wind.EAST, Wind.SOUTH, Wind.WEST),
+}
+
+def round_up(points: int) -> int:
+    # payments are rounded up to the next 100
+    return -(-points // 100) * 100
+
+# ---
+
+@dataclass(frozen=True)
+class Payment:
+    _base_points: int
+    _ron: int
+    _dealer_ron: int
+    # what the dealer and each other non-dealer pay on a non-dealer's tsumo
+    _tsumo_dealer: int
+    _tsumo_non_dealer: int
+    # what everyone pays on the dealer's tsumo
+    _dealer_tsumo: int
+
+    @classmethod
+    def of(cls, yakuman: int, han: int, fu: int) -> 'Payment':
+        base = base_points(yakuman, han, fu)
+        return cls(base, round_up(4*base), round_up(6*base), round_up(2*base), round_up(base), round_up(2*base))
+
+    @property
+    def base_points(self) -> int:
+        return self._base_points
+    @property
+    def ron(self) -> int:
+        return self._ron
+    @property
+    def dealer_ron(self) -> int:
+        return self._dealer_ron
+    @property
+    def tsumo_dealer(self) -> int:
+        return self._tsumo_dealer
+    @property
+    def tsumo_non_dealer(self) -> int:
+        return self._tsumo_non_dealer
+    @property
+    def dealer_tsumo(self) -> int:
+        return self._dealer_tsumo
+
+    def settle(
+            self, winner: Wind, discarder: Wind | None = None, *,
+            num_players: int = 4, honba: int = 0, riichi_sticks: int = 0) -> dict[Wind, int]:
+        # the change in points of every seat; a discarder of None is a tsumo. In 3-player games a tsumo
+        # is paid by the two other seats only, so the winner receives less than from a ron (tsumo loss)
+        if num_players not in SEATS:
+            raise ValueError(f'Expected 3 or 4 players, got {num_players}.')
+        seats = SEATS[num_players]
+        if winner not in seats or (discarder is not None and discarder not in seats):
+            raise ValueError(f'A {num_players}-player game has no {winner if winner not in seats else discarder} seat.')
+        if discarder == winner:
+            raise ValueError('The winner cannot pay for their own win.')
+        if honba < 0 or riichi_sticks < 0:
+            raise ValueError('honba and riichi_sticks must not be negative')
+
+        ret = dict.fromkeys(seats, 0)
+        if discarder is not None:
+            ret[discarder] = -((self._dealer_ron if winner == DEALER else self._ron) + RON_HONBA*honba)
+        else:
+            for seat in seats:
+                if seat == winner:
+                    continue
+                if winner == DEALER:
+                    ret[seat] = -(self._dealer_tsumo + TSUMO_HONBA*honba)
+                else:
+                    ret[seat] = -((self._tsumo_dealer if seat == DEALER else self._tsumo_non_dealer) + TSUMO_HONBA*honba)
+        ret[winner] = -sum(ret.values()) + RIICHI_STICK*riichi_sticks
+        return ret
+
+class PaymentTable:
+    # the Payment of every (yakuman, han, fu) up to MAX_YAKUMAN, MAX_HAN and MAX_FU, addressed by key
+    _payments: list[Payment]
+
+    def __init__(self):
+        self._payments = []
+
+    def __len__(self) -> int:
+        return len(self._payments)
+
+    @property
+    def is_built(self) -> bool:
+        return len(self._payments) > 0
+
+    @staticmethod
+    def key(yakuman: int, han: int, fu: int) -> int:
+        return (yakuman*(MAX_HAN+1) + min(han, MAX_HAN))*NUM_FU + fu//FU_STEP
+
+    def build(self) -> None:
+        # payments repeat heavily (every yakuman entry is the same, and so is every entry from mangan up),
+        # so equal payments share one object
+        payments: dict[Payment, Payment] = {}
+        self._payments = [
+            payments.setdefault(p, p)
+            for yakuman in range(MAX_YAKUMAN+1)
+            for han in range(MAX_HAN+1)
+            for fu in range(0, MAX_FU+1, FU_STEP)
+            for p in [Payment.of(yakuman, han, fu)]
+        ]
+
+    def clear(self) -> None:
+        self._payments = []
+
+    def lookup(self, yakuman: int, han: int, fu: int) -> Payment:
+        if yakuman < 0 or han < 0 or fu < 0:
+            raise ValueError('yakuman, han and fu must not be negative')
+        if yakuman > MAX_YAKUMAN or fu > MAX_FU or fu % FU_STEP:
+            return Payment.of(yakuman, han, fu)
+        if not self.is_built:
+            self.build()
+        return self._payments[self.key(yakuman, han, fu)]
+
+# shared by every scorer that is not given its own table
+DEFAULT_PAYMENT_TABLE = PaymentTable()
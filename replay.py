@@ -0,0 +1,231 @@
+import argparse
+import json
+import sys
+from collections import deque
+from collections.abc import Generator, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TextIO
+
+from batch import ScoringRequest, ScoringResult, encode_request, init_worker, try_score, try_score_encoded
+from hand import HandFactory
+from mahjong import MeldGenerator, RiichiMahjongScorer, RiichiState, UnderState, WinType
+from meld import MeldFactory
+from tile import TileFactory
+from tile_enums import Wind
+
+# ---
+
+# Game records are JSON objects, one per line. Blank lines are skipped. Enum fields use member names.
+#
+#   {"hand": "234m 567p 2345s 111z", "winning_tile": "5s", "round_wind": "EAST", "seat_wind": "SOUTH",
+#    "win_type": "TSUMO", "riichi": "RIICHI", "under": "NONE", "dora": ["1z"], "ura_dora": ["2m"], "kita": 0}
+#
+# "hand", "winning_tile", "round_wind", "seat_wind" and "win_type" are required; "riichi" and "under"
+# default to NONE, "dora" and "ura_dora" to [] and "kita" to 0.
+
+@dataclass
+class ReplayResult:
+    _line_number: int
+    _points: int | None
+    _error: str | None = None
+
+    def __str__(self) -> str:
+        return f'{self._line_number}: {self._points if self._error is None else f'error: {self._error}'}'
+
+    @property
+    def line_number(self) -> int:
+        return self._line_number
+    @property
+    def points(self) -> int | None:
+        return self._points
+    @property
+    def error(self) -> str | None:
+        return self._error
+
+@dataclass
+class ReplaySummary:
+    _num_records: int = 0
+    _num_errors: int = 0
+    _total_points: int = 0
+    _max_points: int = 0
+
+    def __str__(self) -> str:
+        return f'{self._num_records} records, {self.num_scored} scored, {self._num_errors} errors, {self._total_points} total base points, {self._max_points} max'
+
+    @property
+    def num_records(self) -> int:
+        return self._num_records
+    @property
+    def num_scored(self) -> int:
+        return self._num_records - self._num_errors
+    @property
+    def num_errors(self) -> int:
+        return self._num_errors
+    @property
+    def total_points(self) -> int:
+        return self._total_points
+    @property
+    def max_points(self) -> int:
+        return self._max_points
+
+    def add(self, result: ReplayResult) -> None:
+        self._num_records += 1
+        if result.points is None:
+            self._num_errors += 1
+        else:
+            self._total_points += result.points
+            self._max_points = max(self._max_points, result.points)
+
+# ---
+
+def read_chunks(stream: Iterable[str], chunk_size: int = 1024) -> Generator[list[tuple[int, str]], None, None]:
+    # yields lists of (1-based line number, line) without ever holding more than one chunk
+    chunk: list[tuple[int, str]] = []
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        chunk.append((line_number, line))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class RecordParser:
+    _tile_factory: TileFactory
+    _hand_factory: HandFactory
+
+    def __init__(self, tile_factory: TileFactory, hand_factory: HandFactory):
+        self._tile_factory = tile_factory
+        self._hand_factory = hand_factory
+
+    def parse(self, line: str) -> ScoringRequest:
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f'Invalid game record: {e!r}') from e
+        return self.parse_record(record)
+
+    def parse_record(self, record: dict) -> ScoringRequest:
+        try:
+            num_kita = record.get('kita', 0)
+            # bool is a subclass of int
+            if type(num_kita) is not int or num_kita < 0:
+                raise ValueError(f'kita must be a non-negative integer, got {num_kita!r}')
+            return ScoringRequest(
+                self._hand_factory.create_hand(record['hand'], num_kita),
+                self._tile_factory.create_tile(record['winning_tile']),
+                Wind[record['round_wind']], Wind[record['seat_wind']],
+                WinType[record['win_type']],
+                RiichiState[record.get('riichi', 'NONE')], UnderState[record.get('under', 'NONE')],
+                [self._tile_factory.create_tile(t) for t in record.get('dora', [])],
+                [self._tile_factory.create_tile(t) for t in record.get('ura_dora', [])],
+            )
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f'Invalid game record: {e!r}') from e
+
+class Replay:
+    _stream: Iterable[str]
+    _parser: RecordParser
+    _workers: int
+    _chunk_size: int
+    _ordered: bool
+    _summary: ReplaySummary
+
+    def __init__(self, stream: Iterable[str], *, workers: int = 1, chunk_size: int = 1024, ordered: bool = True):
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be at least 1')
+        tf = TileFactory()
+        self._stream = stream
+        self._parser = RecordParser(tf, HandFactory(tf, MeldFactory(tf)))
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._ordered = ordered
+        self._summary = ReplaySummary()
+
+    @property
+    def summary(self) -> ReplaySummary:
+        return self._summary
+
+    def __iter__(self) -> Iterator[ReplayResult]:
+        # every chunk of lines is scored as one unit that also holds its unparsable records, so errors count
+        # against the in-flight limit like any other line and are reported together with their chunk;
+        # a record that fails to score is reported as an error of its own line
+        chunks = map(self._parse_chunk, read_chunks(self._stream, self._chunk_size))
+        if self._workers <= 1:
+            scorer = RiichiMahjongScorer(MeldGenerator())
+            for lines, requests in chunks:
+                yield from self._merge(lines, [try_score(r, scorer) for r in requests])
+            return
+
+        # as in batch.score_many, only a bounded number of chunks are in flight
+        max_in_flight = 2 * self._workers
+        with ProcessPoolExecutor(max_workers=self._workers, initializer=init_worker) as executor:
+            if self._ordered:
+                in_order: deque[tuple[list[tuple[int, str | None]], Future[list[ScoringResult]]]] = deque()
+                for lines, requests in chunks:
+                    in_order.append((lines, executor.submit(try_score_encoded, [*map(encode_request, requests)])))
+                    if len(in_order) >= max_in_flight:
+                        lines, future = in_order.popleft()
+                        yield from self._merge(lines, future.result())
+                while in_order:
+                    lines, future = in_order.popleft()
+                    yield from self._merge(lines, future.result())
+            else:
+                pending: dict[Future[list[ScoringResult]], list[tuple[int, str | None]]] = {}
+                for lines, requests in chunks:
+                    pending[executor.submit(try_score_encoded, [*map(encode_request, requests)])] = lines
+                    if len(pending) >= max_in_flight:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for f in done:
+                            yield from self._merge(pending.pop(f), f.result())
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        yield from self._merge(pending.pop(f), f.result())
+
+    def _parse_chunk(self, chunk: list[tuple[int, str]]) -> tuple[list[tuple[int, str | None]], list[ScoringRequest]]:
+        # (line number, parse error or None) of every line, and the requests of the lines that parsed
+        lines: list[tuple[int, str | None]] = []
+        requests: list[ScoringRequest] = []
+        for line_number, line in chunk:
+            try:
+                requests.append(self._parser.parse(line))
+            except ValueError as e:
+                lines.append((line_number, str(e)))
+                continue
+            lines.append((line_number, None))
+        return lines, requests
+
+    def _merge(self, lines: list[tuple[int, str | None]], scored: list[ScoringResult]) -> Iterator[ReplayResult]:
+        it = iter(scored)
+        for line_number, error in lines:
+            yield self._record(ReplayResult(line_number, None, error) if error is not None else ReplayResult(line_number, *next(it)))
+
+    def _record(self, result: ReplayResult) -> ReplayResult:
+        self._summary.add(result)
+        return result
+
+# ---
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Score every win in a JSON-lines game log.')
+    parser.add_argument('path', nargs='?', default='-', help='game log to read; "-" reads stdin')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=1024)
+    parser.add_argument('--unordered', action='store_true', help='emit results as soon as they are scored')
+    args = parser.parse_args(argv)
+
+    stream: TextIO = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8')
+    try:
+        replay = Replay(stream, workers=args.workers, chunk_size=args.chunk_size, ordered=not args.unordered)
+        for result in replay:
+            print(json.dumps({'line': result.line_number, 'points': result.points, 'error': result.error}))
+        print(replay.summary, file=sys.stderr)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from batch import EncodedRequest, ScoringResult, encode_request, init_worker, try_score_encoded
+from hand import HandFactory
+from meld import MeldFactory
+from replay import RecordParser
+from tile import TileFactory
+
+# ---
+
+# Requests are game records in the replay format (see replay.py), one per line, with an optional "id"
+# of any JSON type. Every non-blank line gets exactly one response, in the order the lines were sent:
+#
+#   {"id": 7, "points": 2000, "error": null}
+#   {"id": 8, "points": null, "error": "timed out"}
+#
+# Lines are parsed on the event loop, then queued for a batcher that hands the scoring to a pool in
+# batches. Every queue is bounded: once they fill up, connections stop being read, and the kernel's
+# socket buffers push back on the clients.
+
+DEFAULT_PORT = 8765
+# longest request line accepted, in bytes
+MAX_LINE_LENGTH = 1 << 16
+
+@dataclass
+class _Pending:
+    # a request that is waiting to be answered; requests that failed to parse have no future
+    _id: Any
+    _future: asyncio.Future[ScoringResult] | None
+    _error: str | None
+    # event loop time after which the request times out
+    _deadline: float
+
+    @property
+    def id(self) -> Any:
+        return self._id
+    @property
+    def future(self) -> asyncio.Future[ScoringResult] | None:
+        return self._future
+    @property
+    def error(self) -> str | None:
+        return self._error
+    @property
+    def deadline(self) -> float:
+        return self._deadline
+
+class ScoringServer:
+    _workers: int
+    _use_threads: bool
+    _batch_size: int
+    _batch_delay: float
+    _max_queued: int
+    _max_pipelined: int
+    _timeout: float
+    _parser: RecordParser
+
+    # created by start, on the running event loop
+    _queue: asyncio.Queue[tuple[EncodedRequest, asyncio.Future[ScoringResult]]] | None
+    _batches: asyncio.Semaphore | None
+    _batcher: asyncio.Task[None] | None
+    _executor: Executor | None
+    _servers: list[asyncio.Server]
+
+    def __init__(
+            self, *,
+            workers: int | None = None, use_threads: bool = False,
+            batch_size: int = 64, batch_delay: float = 0.002,
+            max_queued: int = 1024, max_pipelined: int = 256, timeout: float = 5.0):
+        # batch_delay: seconds the batcher waits for a batch to fill up before sending it off anyway
+        # max_queued: requests waiting for the batcher, over all connections
+        # max_pipelined: requests a single connection may have sent but not yet been answered
+        # timeout: seconds a request may take from being read to being scored
+        if workers is None:
+            workers = os.process_cpu_count() or 1
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        if max_queued < 1 or max_pipelined < 1:
+            raise ValueError('max_queued and max_pipelined must be at least 1')
+        if timeout <= 0:
+            raise ValueError('timeout must be positive')
+
+        tf = TileFactory()
+        self._workers = workers
+        self._use_threads = use_threads
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+        self._max_queued = max_queued
+        self._max_pipelined = max_pipelined
+        self._timeout = timeout
+        self._parser = RecordParser(tf, HandFactory(tf, MeldFactory(tf)))
+
+        self._queue = None
+        self._batches = None
+        self._batcher = None
+        self._executor = None
+        self._servers = []
+
+    async def __aenter__(self) -> 'ScoringServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def is_running(self) -> bool:
+        return self._batcher is not None
+
+    @property
+    def sockets(self) -> list[Any]:
+        return [s for server in self._servers for s in server.sockets]
+
+    # ---
+
+    async def start(self) -> None:
+        if self.is_running:
+            raise ValueError('The server is already running.')
+        if self._use_threads:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, initializer=init_worker)
+        else:
+            # forked workers would inherit, and so keep open, every client socket accepted before them
+            context = multiprocessing.get_context('forkserver')
+            self._executor = ProcessPoolExecutor(max_workers=self._workers, mp_context=context, initializer=init_worker)
+        self._queue = asyncio.Queue(self._max_queued)
+        # two batches per worker keep every worker busy while the next batch is collected
+        self._batches = asyncio.Semaphore(2 * self._workers)
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+    async def listen_tcp(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> asyncio.Server:
+        # port 0 picks a free port; see sockets
+        if not self.is_running:
+            await self.start()
+        server = await asyncio.start_server(self._handle_client, host, port, limit=MAX_LINE_LENGTH)
+        self._servers.append(server)
+        return server
+
+    async def listen_unix(self, path: str) -> asyncio.Server:
+        if not self.is_running:
+            await self.start()
+        server = await asyncio.start_unix_server(self._handle_client, path, limit=MAX_LINE_LENGTH)
+        self._servers.append(server)
+        return server
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+            server.close_clients()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, cancel_futures=True)
+        self._queue = None
+        self._batches = None
+        self._batcher = None
+        self._executor = None
+
+    # ---
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        responses: asyncio.Queue[_Pending | None] = asyncio.Queue(self._max_pipelined)
+        sender = asyncio.create_task(self._send_responses(responses, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # the line is longer than the stream's limit, and the rest of the stream can't be framed
+                    loop = asyncio.get_running_loop()
+                    await responses.put(_Pending(None, None, f'Request longer than {MAX_LINE_LENGTH} bytes', loop.time()))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await responses.put(await self._submit(line))
+        except ConnectionError:
+            pass
+        finally:
+            await responses.put(None)
+            await sender
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _submit(self, line: bytes) -> _Pending:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout
+
+        request_id = None
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            return _Pending(None, None, f'Invalid game record: {e!r}', deadline)
+        if isinstance(record, dict):
+            request_id = record.get('id')
+        try:
+            encoded = encode_request(self._parser.parse_record(record))
+        except ValueError as e:
+            return _Pending(request_id, None, str(e), deadline)
+
+        future: asyncio.Future[ScoringResult] = loop.create_future()
+        try:
+            await asyncio.wait_for(self._queue.put((encoded, future)), self._timeout)
+        except TimeoutError:
+            return _Pending(request_id, None, 'timed out', deadline)
+        return _Pending(request_id, future, None, deadline)
+
+    async def _send_responses(self, responses: asyncio.Queue[_Pending | None], writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        # once the client is gone, requests are still drained so the reader never blocks on a full queue
+        is_connected = True
+        while (pending := await responses.get()) is not None:
+            points, error = None, pending.error
+            if pending.future is not None:
+                try:
+                    points, error = await asyncio.wait_for(pending.future, max(0.0, pending.deadline - loop.time()))
+                except TimeoutError:
+                    error = 'timed out'
+                except Exception as e:
+                    error = f'Scoring failed: {e!r}'
+            if not is_connected:
+                continue
+            try:
+                writer.write(json.dumps({'id': pending.id, 'points': points, 'error': error}).encode() + b'\n')
+                await writer.drain()
+            except ConnectionError:
+                is_connected = False
+
+    # ---
+
+    async def _next_batch(self) -> list[tuple[EncodedRequest, asyncio.Future[ScoringResult]]]:
+        # waits for one request, then for up to batch_delay seconds for the batch to fill up
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self._batch_delay
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _run_batcher(self) -> None:
+        assert self._batches is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            # waiting for a free slot here is what lets the queue fill up
+            await self._batches.acquire()
+            # requests that timed out while waiting are not scored
+            batch = [(e, f) for e, f in batch if not f.done()]
+            if not batch:
+                self._batches.release()
+                continue
+            # every request gets its own points or error, so one bad request does not fail the batch
+            scored = loop.run_in_executor(self._executor, try_score_encoded, [e for e, _ in batch])
+            scored.add_done_callback(partial(self._finish_batch, [f for _, f in batch]))
+
+    def _finish_batch(self, futures: list[asyncio.Future[ScoringResult]], scored: asyncio.Future[list[ScoringResult]]) -> None:
+        assert self._batches is not None
+        self._batches.release()
+        if scored.cancelled():
+            e = RuntimeError('The server is shutting down.')
+        else:
+            e = scored.exception()
+        if e is not None:
+            for f in futures:
+                if not f.done():
+                    f.set_exception(e)
+            return
+        for f, result in zip(futures, scored.result()):
+            if not f.done():
+                f.set_result(result)
+
+# ---
+
+async def serve(server: ScoringServer, *, host: str, port: int, unix: str | None) -> None:
+    async with server:
+        listener = await (server.listen_unix(unix) if unix is not None else server.listen_tcp(host, port))
+        names = [s.getsockname() for s in listener.sockets]
+        print(f'Listening on {', '.join(map(str, names))}', file=sys.stderr)
+        await listener.serve_forever()
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Serve JSON-lines scoring requests over TCP or a Unix socket.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--threads', action='store_true', help='score in a thread pool instead of a process pool')
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--batch-delay', type=float, default=0.002, help='seconds to wait for a batch to fill up')
+    parser.add_argument('--max-queued', type=int, default=1024)
+    parser.add_argument('--max-pipelined', type=int, default=256, help='unanswered requests per connection')
+    parser.add_argument('--timeout', type=float, default=5.0, help='seconds per request')
+    args = parser.parse_args(argv)
+
+    server = ScoringServer(
+        workers=args.workers, use_threads=args.threads,
+        batch_size=args.batch_size, batch_delay=args.batch_delay,
+        max_queued=args.max_queued, max_pipelined=args.max_pipelined, timeout=args.timeout
+    )
+    try:
+        asyncio.run(serve(server, host=args.host, port=args.port, unix=args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
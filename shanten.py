@@ -0,0 +1,193 @@
+from array import array
+from collections.abc import Sequence
+
+from hand import Hand
+from symmetry import suit_pattern_key
+from tile_counts import NUM_TILE_KINDS, TERMINAL_HONOR_INDICES
+
+# ---
+
+MAX_MELDS = 4
+MAX_COPIES = 4
+INFINITY = 99
+
+# a distance table holds, for j pairs (0-1) and i melds (0-4), the fewest tiles that must be
+# drawn into a group of tiles for it to contain i melds and j pairs; entry j*5 + i
+Distances = tuple[int, ...]
+
+_EMPTY_DISTANCES: Distances = (0, *(INFINITY,) * (2*(MAX_MELDS+1) - 1))
+
+# (index into a, index into b, index into the combination) for every pair of entries that can be combined
+_COMBINATIONS: tuple[tuple[int, int, int], ...] = tuple(
+    (j1*(MAX_MELDS+1) + i1, j2*(MAX_MELDS+1) + i2, (j1+j2)*(MAX_MELDS+1) + i1 + i2)
+    for j1 in range(2) for j2 in range(2 - j1)
+    for i1 in range(MAX_MELDS+1) for i2 in range(MAX_MELDS+1 - i1)
+)
+
+def combine_distances(a: Distances, b: Distances) -> Distances:
+    ret = [INFINITY] * (2*(MAX_MELDS+1))
+    for ka, kb, k in _COMBINATIONS:
+        d = a[ka] + b[kb]
+        if d < ret[k]:
+            ret[k] = d
+    return tuple(ret)
+
+def combine_distances_entry(a: Distances, b: Distances, num_melds: int) -> int:
+    # only the entry for exactly num_melds melds and one pair of the combination of a and b
+    ret = INFINITY
+    for j1 in range(2):
+        for i1 in range(num_melds+1):
+            d = a[j1*(MAX_MELDS+1) + i1] + b[(1-j1)*(MAX_MELDS+1) + num_melds - i1]
+            if d < ret:
+                ret = d
+    return ret
+
+class ShantenTable:
+    # per-suit distance tables, filled lazily the first time a count pattern is seen
+    _suit_table: dict[tuple[int, ...], Distances]
+    _honor_table: dict[tuple[int, ...], Distances]
+
+    def __init__(self):
+        self._suit_table = {}
+        self._honor_table = {}
+
+    def __len__(self) -> int:
+        return len(self._suit_table) + len(self._honor_table)
+
+    def _compute_suit_distances(self, pattern: tuple[int, ...]) -> Distances:
+        # dynamic programming over ranks; state is (sequences started on the previous rank,
+        # sequences started two ranks ago), both of which still need a tile on the current rank
+        states: dict[tuple[int, int], list[int]] = {(0, 0): [*_EMPTY_DISTANCES]}
+        for rank, have in enumerate(pattern):
+            new_states: dict[tuple[int, int], list[int]] = {}
+            for (p1, p2), table in states.items():
+                for num_sequences in range(MAX_MELDS+1 if rank <= 6 else 1):
+                    for num_triplets in range(2):
+                        for num_pairs in range(2):
+                            need = p1 + p2 + num_sequences + 3*num_triplets + 2*num_pairs
+                            if need > MAX_COPIES:
+                                continue
+                            cost = need - have if need > have else 0
+                            new_table = new_states.setdefault((num_sequences, p1), [INFINITY] * len(table))
+                            new_melds = num_sequences + num_triplets
+                            for j in range(2 - num_pairs):
+                                for i in range(MAX_MELDS+1 - new_melds):
+                                    d = table[j*(MAX_MELDS+1) + i]
+                                    if d >= INFINITY:
+                                        continue
+                                    k = (j+num_pairs)*(MAX_MELDS+1) + i + new_melds
+                                    if d + cost < new_table[k]:
+                                        new_table[k] = d + cost
+            states = new_states
+        return tuple(states[(0, 0)])
+
+    def _compute_honor_distances(self, pattern: tuple[int, ...]) -> Distances:
+        # honor tiles never form sequences, so every tile is its own group
+        ret = _EMPTY_DISTANCES
+        for have in pattern:
+            single = [*_EMPTY_DISTANCES]
+            single[1] = max(0, 3 - have)
+            single[MAX_MELDS+1] = max(0, 2 - have)
+            ret = combine_distances(ret, tuple(single))
+        return ret
+
+    def suit_distances(self, pattern: tuple[int, ...]) -> Distances:
+        # a pattern and its mirror image are the same distance from every number of melds and pairs,
+        # so only the smaller of the two is stored
+        key, _ = suit_pattern_key(pattern)
+        ret = self._suit_table.get(key)
+        if ret is None:
+            ret = self._suit_table[key] = self._compute_suit_distances(key)
+        return ret
+
+    def honor_distances(self, pattern: tuple[int, ...]) -> Distances:
+        # honors are interchangeable here, so only the sorted pattern is stored
+        key = tuple(sorted(pattern))
+        ret = self._honor_table.get(key)
+        if ret is None:
+            ret = self._honor_table[key] = self._compute_honor_distances(key)
+        return ret
+
+    def group_distances(self, counts: Sequence[int]) -> list[Distances]:
+        return [
+            self.suit_distances(tuple(counts[0:9])),
+            self.suit_distances(tuple(counts[9:18])),
+            self.suit_distances(tuple(counts[18:27])),
+            self.honor_distances(tuple(counts[27:34])),
+        ]
+
+    def clear(self) -> None:
+        self._suit_table.clear()
+        self._honor_table.clear()
+
+# shared by every shanten computation that is not given its own table
+DEFAULT_SHANTEN_TABLE = ShantenTable()
+
+# ---
+
+def regular_shanten(counts: Sequence[int], num_melds: int = MAX_MELDS, *, table: ShantenTable = DEFAULT_SHANTEN_TABLE) -> int:
+    man, pin, sou, honors = table.group_distances(counts)
+    return combine_distances_entry(combine_distances(combine_distances(man, pin), sou), honors, num_melds) - 1
+
+def chiitoitsu_shanten(counts: Sequence[int]) -> int:
+    num_pairs, num_kinds = 0, 0
+    for c in counts:
+        if c >= 1:
+            num_kinds += 1
+            if c >= 2:
+                num_pairs += 1
+    return 6 - num_pairs + max(0, 7 - num_kinds)
+
+def kokushi_shanten(counts: Sequence[int]) -> int:
+    num_kinds, has_pair = 0, False
+    for i in TERMINAL_HONOR_INDICES:
+        if counts[i] >= 1:
+            num_kinds += 1
+            if counts[i] >= 2:
+                has_pair = True
+    return 13 - num_kinds - (1 if has_pair else 0)
+
+_IS_TERMINAL_HONOR: tuple[bool, ...] = tuple(i in TERMINAL_HONOR_INDICES for i in range(NUM_TILE_KINDS))
+
+class SpecialForms:
+    # pair/kind counters for 7 Pairs and 13 Orphans, updated in O(1) per drawn or discarded tile
+    num_pairs: int
+    num_kinds: int
+    num_orphans: int
+    num_orphan_pairs: int
+
+    def __init__(self, counts: Sequence[int]):
+        self.num_pairs = sum(1 for c in counts if c >= 2)
+        self.num_kinds = sum(1 for c in counts if c >= 1)
+        self.num_orphans = sum(1 for i in TERMINAL_HONOR_INDICES if counts[i] >= 1)
+        self.num_orphan_pairs = sum(1 for i in TERMINAL_HONOR_INDICES if counts[i] >= 2)
+
+    def update(self, index: int, before: int, after: int) -> None:
+        # before/after are the counts of the tile at index around a single draw or discard
+        pair_delta = (after >= 2) - (before >= 2)
+        kind_delta = (after >= 1) - (before >= 1)
+        self.num_pairs += pair_delta
+        self.num_kinds += kind_delta
+        if _IS_TERMINAL_HONOR[index]:
+            self.num_orphans += kind_delta
+            self.num_orphan_pairs += pair_delta
+
+    def shanten(self) -> int:
+        chiitoitsu = 6 - self.num_pairs + max(0, 7 - self.num_kinds)
+        kokushi = 13 - self.num_orphans - (1 if self.num_orphan_pairs > 0 else 0)
+        return min(chiitoitsu, kokushi)
+
+def counts_shanten(counts: Sequence[int], num_open_melds: int = 0, *, table: ShantenTable = DEFAULT_SHANTEN_TABLE) -> int:
+    ret = regular_shanten(counts, MAX_MELDS - num_open_melds, table=table)
+    if num_open_melds == 0:
+        # 7 Pairs and 13 Orphans can only be formed with a closed hand
+        ret = min(ret, chiitoitsu_shanten(counts), kokushi_shanten(counts))
+    return ret
+
+def shanten(hand: Hand, *, table: ShantenTable = DEFAULT_SHANTEN_TABLE) -> int:
+    num_open_melds = len(hand.open_melds)
+    if len(hand.tiles) + 3*num_open_melds not in (3*MAX_MELDS + 1, 3*MAX_MELDS + 2):
+        raise ValueError(f'Hand with {len(hand.tiles)} closed tiles and {num_open_melds} open melds is not a 13- or 14-tile hand.')
+
+    counts: array = hand.closed_counts.counts
+    return counts_shanten(counts, num_open_melds, table=table)
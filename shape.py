@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+from tile_counts import NUM_SUITED_KINDS, NUM_TILE_KINDS, RANKS_PER_SUIT, TERMINAL_HONOR_INDICES
+from tile_enums import Dragon, TileSuit, Wind
+
+# ---
+
+class WaitShape(StrEnum):
+    RYANMEN = 'Two-sided'
+    KANCHAN = 'Closed'
+    PENCHAN = 'Edge'
+    SHANPON = 'Dual Pon'
+    TANKI = 'Single'
+
+# bitmasks over the 34 tile indices
+TERMINAL_HONOR_MASK = sum(1 << i for i in TERMINAL_HONOR_INDICES)
+HONOR_MASK = sum(1 << i for i in range(NUM_SUITED_KINDS, NUM_TILE_KINDS))
+SUIT_MASKS: tuple[int, ...] = tuple(((1 << RANKS_PER_SUIT) - 1) << s for s in range(0, NUM_SUITED_KINDS, RANKS_PER_SUIT))
+
+DRAGON_INDICES: tuple[int, ...] = tuple(NUM_SUITED_KINDS - 1 + d.value for d in Dragon)
+
+def honor_index(symbol: Wind | Dragon) -> int:
+    return NUM_SUITED_KINDS - 1 + symbol.value
+
+TERMINAL_MASK = TERMINAL_HONOR_MASK & ~HONOR_MASK
+WIND_MASK = sum(1 << honor_index(w) for w in Wind)
+DRAGON_MASK = sum(1 << i for i in DRAGON_INDICES)
+# 2, 3, 4, 6 and 8 of sou and the green dragon
+GREEN_MASK = sum(1 << (TileSuit.SOU.value + rank - 1) for rank in (2, 3, 4, 6, 8)) | 1 << honor_index(Dragon.GREEN)
+
+def is_terminal_honor(index: int) -> bool:
+    return (TERMINAL_HONOR_MASK >> index) & 1 == 1
+
+def sequence_mask(start: int) -> int:
+    return 0b111 << start
+
+# ---
+
+@dataclass(frozen=True, slots=True)
+class HandShape:
+    # one interpretation of a winning hand: a decomposition plus the group the winning tile completed
+    _is_closed: bool
+    _wait: WaitShape
+    # bit i is set if the hand holds tile index i
+    _tile_mask: int
+    # first tile index of every sequence, sorted
+    _sequences: tuple[int, ...] = ()
+    # tile index of every triplet and quad
+    _triplets: frozenset[int] = frozenset()
+    _num_concealed_triplets: int = 0
+    _num_quads: int = 0
+    _pair: int = -1
+    # every meld and the pair hold a terminal or honor
+    _is_outside: bool = False
+    _is_seven_pairs: bool = False
+    # fu of every triplet and quad
+    _meld_fu: int = 0
+
+    @property
+    def is_closed(self) -> bool:
+        return self._is_closed
+    @property
+    def wait(self) -> WaitShape:
+        return self._wait
+    @property
+    def tile_mask(self) -> int:
+        return self._tile_mask
+    @property
+    def sequences(self) -> tuple[int, ...]:
+        return self._sequences
+    @property
+    def triplets(self) -> frozenset[int]:
+        return self._triplets
+    @property
+    def num_concealed_triplets(self) -> int:
+        return self._num_concealed_triplets
+    @property
+    def num_quads(self) -> int:
+        return self._num_quads
+    @property
+    def pair(self) -> int:
+        return self._pair
+    @property
+    def is_outside(self) -> bool:
+        return self._is_outside
+    @property
+    def is_seven_pairs(self) -> bool:
+        return self._is_seven_pairs
+    @property
+    def meld_fu(self) -> int:
+        return self._meld_fu
+
+@dataclass(frozen=True, slots=True)
+class YakuContext:
+    _seat_wind: Wind
+    _round_wind: Wind
+    _is_tsumo: bool
+    _seat_wind_index: int = field(init=False, repr=False)
+    _round_wind_index: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_seat_wind_index', honor_index(self._seat_wind))
+        object.__setattr__(self, '_round_wind_index', honor_index(self._round_wind))
+
+    @property
+    def seat_wind(self) -> int:
+        return self._seat_wind_index
+    @property
+    def round_wind(self) -> int:
+        return self._round_wind_index
+    @property
+    def is_tsumo(self) -> bool:
+        return self._is_tsumo
@@ -0,0 +1,291 @@
+import os
+import random
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+
+from agari import DEFAULT_AGARI_INDEX
+from decomposition import DEFAULT_DECOMPOSITION_TABLE
+from hand import Hand
+from mahjong import MeldGenerator, RiichiMahjongScorer, RiichiState, UnderState, WinType
+from meld import Meld
+from shanten import DEFAULT_SHANTEN_TABLE, MAX_COPIES, MAX_MELDS, Distances, ShantenTable, chiitoitsu_shanten, combine_distances, combine_distances_entry, counts_shanten, kokushi_shanten
+from tile import Tile
+from tile_counts import NUM_SUITED_KINDS, NUM_TILE_CODES, NUM_TILE_KINDS, RANKS_PER_SUIT, RED_FIVE_RANK, SUIT_GROUPS, SUITS, TileCounts, code_tile, group_index, tile_code, tile_index
+from tile_enums import Wind
+
+# ---
+
+@dataclass
+class SimulationResult:
+    _num_samples: int = 0
+    _num_tenpai: int = 0
+    _num_wins: int = 0
+    _total_points: int = 0
+
+    def __str__(self) -> str:
+        return f'{self._num_samples} samples: {self.tenpai_probability:.1%} tenpai, {self.win_probability:.1%} win, {self.expected_points:.0f} expected base points'
+
+    @property
+    def num_samples(self) -> int:
+        return self._num_samples
+    @property
+    def num_tenpai(self) -> int:
+        # samples that won or were tenpai after the last draw
+        return self._num_tenpai
+    @property
+    def num_wins(self) -> int:
+        return self._num_wins
+    @property
+    def total_points(self) -> int:
+        return self._total_points
+    @property
+    def tenpai_probability(self) -> float:
+        return self._num_tenpai / self._num_samples if self._num_samples else 0.0
+    @property
+    def win_probability(self) -> float:
+        return self._num_wins / self._num_samples if self._num_samples else 0.0
+    @property
+    def expected_points(self) -> float:
+        # base points per sample, counting samples that did not win as 0
+        return self._total_points / self._num_samples if self._num_samples else 0.0
+
+    def add(self, other: 'SimulationResult') -> None:
+        self._num_samples += other._num_samples
+        self._num_tenpai += other._num_tenpai
+        self._num_wins += other._num_wins
+        self._total_points += other._total_points
+
+# ---
+
+# tile index of every tile code, so red fives are counted under their plain rank
+_CODE_INDEX: tuple[int, ...] = tuple(tile_index(code_tile(c)) for c in range(NUM_TILE_CODES))
+_FIVE_INDICES: tuple[int, ...] = tuple(s * RANKS_PER_SUIT + RED_FIVE_RANK - 1 for s in range(len(SUITS)))
+
+def dora_index(indicator_index: int) -> int:
+    # the tile after the indicator, wrapping within its suit, the winds or the dragons
+    if indicator_index < NUM_SUITED_KINDS:
+        start, size = indicator_index - indicator_index % RANKS_PER_SUIT, RANKS_PER_SUIT
+    elif indicator_index < NUM_SUITED_KINDS + len(Wind):
+        start, size = NUM_SUITED_KINDS, len(Wind)
+    else:
+        start, size = NUM_SUITED_KINDS + len(Wind), NUM_TILE_KINDS - NUM_SUITED_KINDS - len(Wind)
+    return start + (indicator_index - start + 1) % size
+
+def _discard_order(counts: bytearray) -> list[int]:
+    # held tiles from the least connected to the most: honors count only their own copies, suited
+    # tiles every copy within two ranks, so isolated tiles are tried first when looking for a discard
+    def connectivity(i: int) -> int:
+        if i >= NUM_SUITED_KINDS:
+            return counts[i]
+        start = i - i % RANKS_PER_SUIT
+        return sum(counts[max(start, i-2):min(start + RANKS_PER_SUIT, i+3)])
+    return sorted((i for i in range(NUM_TILE_KINDS) if counts[i]), key=connectivity)
+
+@dataclass
+class Simulation:
+    # a starting position flattened to counts and tile codes, which pickle cheaply to worker processes
+    _counts: bytes
+    _red_fives: bytes
+    _open_melds: list[Meld]
+    _num_kita: int
+    # tile code of every unseen tile
+    _wall: bytes
+    _draws_left: int
+    _round_wind: Wind
+    _seat_wind: Wind
+    _riichi: RiichiState
+    _dora: list[Tile]
+
+    @property
+    def wall(self) -> bytes:
+        return self._wall
+    @property
+    def draws_left(self) -> int:
+        return self._draws_left
+
+    def _score(self, counts: bytearray, red_fives: bytearray, code: int, scorer: RiichiMahjongScorer, ura_dora: list[Tile]) -> int:
+        closed = TileCounts(counts, red_fives)
+        winning_tile = code_tile(code)
+        closed.remove(winning_tile)
+        return scorer.get_points(
+            Hand(closed.to_tiles(), self._open_melds, self._num_kita), winning_tile,
+            round_wind=self._round_wind, seat_wind=self._seat_wind,
+            win_type=WinType.TSUMO, riichi=self._riichi, under=UnderState.NONE,
+            dora=self._dora, ura_dora=ura_dora
+        )
+
+    def run_batch(self, seed: int, num_samples: int, scorer: RiichiMahjongScorer, *, table: ShantenTable = DEFAULT_SHANTEN_TABLE) -> SimulationResult:
+        rng = random.Random(seed)
+        num_open_melds = len(self._open_melds)
+        num_melds = MAX_MELDS - num_open_melds
+        is_closed = num_open_melds == 0
+        is_riichi = self._riichi != RiichiState.NONE
+        # a riichi win turns over one ura dora indicator per dora indicator, from the tiles left in the wall
+        num_ura = min(len(self._dora), len(self._wall) - self._draws_left) if is_riichi else 0
+        forms = DEFAULT_AGARI_INDEX.forms
+
+        def distances(counts: bytearray, g: int) -> Distances:
+            start, size = SUIT_GROUPS[g]
+            pattern = tuple(counts[start:start+size])
+            return table.suit_distances(pattern) if size == RANKS_PER_SUIT else table.honor_distances(pattern)
+
+        # samples start from the same hand and draw from the same wall, so hands recur often
+        others_cache: dict[tuple[Distances, ...], list[Distances]] = {}
+
+        def others(groups: list[Distances]) -> list[Distances]:
+            # the combined distances of every group but one; a draw or discard only changes its own group
+            key = tuple(groups)
+            ret = others_cache.get(key)
+            if ret is None:
+                man, pin, sou, honors = groups
+                suited, rest = combine_distances(man, pin), combine_distances(sou, honors)
+                ret = others_cache[key] = [combine_distances(pin, rest), combine_distances(man, rest), combine_distances(suited, honors), combine_distances(suited, sou)]
+            return ret
+
+        def closed_shanten(counts: bytearray, other: Distances, g: int) -> int:
+            ret = combine_distances_entry(other, distances(counts, g), num_melds) - 1
+            return min(ret, chiitoitsu_shanten(counts), kokushi_shanten(counts)) if is_closed else ret
+
+        start_groups = table.group_distances(self._counts)
+        start_others = others(start_groups)
+        start_shanten = counts_shanten(self._counts, num_open_melds, table=table)
+
+        ret = SimulationResult()
+        for _ in range(num_samples):
+            counts = bytearray(self._counts)
+            red_fives = bytearray(self._red_fives)
+            groups, other_groups = start_groups, start_others
+            current_shanten = start_shanten
+            points = 0
+
+            sample = rng.sample(self._wall, self._draws_left + num_ura)
+            for code in sample[:self._draws_left]:
+                index = _CODE_INDEX[code]
+                counts[index] += 1
+                if code >= NUM_TILE_KINDS:
+                    red_fives[code - NUM_TILE_KINDS] += 1
+
+                # only self-drawn wins are simulated; a hand without yaku keeps drawing
+                if current_shanten == 0 and forms(counts, num_open_melds):
+                    ura_dora = [code_tile(dora_index(_CODE_INDEX[c])) for c in sample[self._draws_left:]]
+                    points = self._score(counts, red_fives, code, scorer, ura_dora)
+                    if points:
+                        break
+
+                # keep the drawn tile only if it lowers shanten, and then discard the least connected
+                # tile that keeps the lower shanten; a riichi hand always discards the drawn tile
+                discard = index
+                if not is_riichi:
+                    g = group_index(index)
+                    drawn_shanten = closed_shanten(counts, other_groups[g], g)
+                    if drawn_shanten < current_shanten:
+                        drawn_groups = [*groups]
+                        drawn_groups[g] = distances(counts, g)
+                        drawn_others = others(drawn_groups)
+                        for i in _discard_order(counts):
+                            counts[i] -= 1
+                            is_kept = closed_shanten(counts, drawn_others[group_index(i)], group_index(i)) == drawn_shanten
+                            counts[i] += 1
+                            if is_kept:
+                                discard = i
+                                current_shanten = drawn_shanten
+                                break
+
+                counts[discard] -= 1
+                if is_riichi and code >= NUM_TILE_KINDS:
+                    red_fives[code - NUM_TILE_KINDS] -= 1
+                elif discard in _FIVE_INDICES:
+                    # keep red fives for as long as a plain five can be discarded instead
+                    suit = _FIVE_INDICES.index(discard)
+                    red_fives[suit] = min(red_fives[suit], counts[discard])
+                if discard != index:
+                    groups = drawn_groups
+                    groups[group_index(discard)] = distances(counts, group_index(discard))
+                    other_groups = others(groups)
+
+            ret._num_samples += 1
+            if points:
+                ret._num_wins += 1
+                ret._total_points += points
+                ret._num_tenpai += 1
+            elif current_shanten <= 0:
+                ret._num_tenpai += 1
+        return ret
+
+def create_simulation(
+        hand: Hand, *,
+        draws_left: int, round_wind: Wind, seat_wind: Wind, riichi: RiichiState = RiichiState.NONE,
+        discards: Iterable[Tile] = (), dora_indicators: Iterable[Tile] = (), melds: Iterable[Meld] = (),
+        red_fives_per_suit: int = 1) -> Simulation:
+    num_open_melds = len(hand.open_melds)
+    if len(hand.tiles) + 3*num_open_melds != 3*MAX_MELDS + 1:
+        raise ValueError(f'Hand with {len(hand.tiles)} closed tiles and {num_open_melds} open melds is not a 13-tile hand.')
+    dora_indicators = [*dora_indicators]
+
+    # the full set, less this hand (open melds included), the discards, dora indicators and other called melds
+    wall = [MAX_COPIES] * NUM_TILE_KINDS + [red_fives_per_suit] * len(SUITS)
+    for i in _FIVE_INDICES:
+        wall[i] -= red_fives_per_suit
+    for t in chain(hand.tiles, *(m.tiles for m in hand.open_melds), discards, dora_indicators, *(m.tiles for m in melds)):
+        code = tile_code(t)
+        if wall[code] == 0 and _CODE_INDEX[code] in _FIVE_INDICES:
+            # more fives of one kind are visible than the set holds; take the other kind instead
+            code = _CODE_INDEX[code] if code >= NUM_TILE_KINDS else NUM_TILE_KINDS + _FIVE_INDICES.index(code)
+        wall[code] = max(0, wall[code] - 1)
+
+    wall_codes = bytes(c for c, n in enumerate(wall) for _ in range(n))
+    if not 0 <= draws_left <= len(wall_codes):
+        raise ValueError(f'Cannot draw {draws_left} tiles from a wall of {len(wall_codes)} unseen tiles.')
+
+    closed = TileCounts.from_tiles(hand.tiles)
+    return Simulation(
+        bytes(closed.counts), bytes(closed.red_fives), hand.open_melds, hand.num_kita,
+        wall_codes, draws_left, round_wind, seat_wind, riichi,
+        [code_tile(dora_index(tile_index(t))) for t in dora_indicators],
+    )
+
+# ---
+
+# per-process scorer, created once by _init_worker; its cache is shared by every batch the worker runs
+_worker_scorer: RiichiMahjongScorer | None = None
+
+def _init_worker(cache_size: int) -> None:
+    global _worker_scorer
+    DEFAULT_DECOMPOSITION_TABLE.build()
+    DEFAULT_AGARI_INDEX.build()
+    _worker_scorer = RiichiMahjongScorer(MeldGenerator(), cache_size=cache_size)
+
+def _run_batch(simulation: Simulation, seed: int, num_samples: int) -> SimulationResult:
+    assert _worker_scorer is not None
+    return simulation.run_batch(seed, num_samples, _worker_scorer)
+
+def simulate(
+        simulation: Simulation, *,
+        samples: int = 1000, seed: int | None = None, batch_size: int = 250, workers: int | None = 1,
+        scorer: RiichiMahjongScorer | None = None, cache_size: int = 4096) -> SimulationResult:
+    # batches draw from their own seeds, taken in order from the top-level seed, so a seeded result
+    # does not depend on the number of workers
+    if samples < 0:
+        raise ValueError('samples must not be negative')
+    if batch_size < 1:
+        raise ValueError('batch_size must be at least 1')
+    if workers is None:
+        workers = os.process_cpu_count() or 1
+
+    seeds = random.Random(seed)
+    batches = [(seeds.getrandbits(64), min(batch_size, samples - start)) for start in range(0, samples, batch_size)]
+
+    ret = SimulationResult()
+    if workers <= 1 or len(batches) <= 1:
+        scorer = scorer if scorer is not None else RiichiMahjongScorer(MeldGenerator(), cache_size=cache_size)
+        for batch_seed, num_samples in batches:
+            ret.add(simulation.run_batch(batch_seed, num_samples, scorer))
+        return ret
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_size,)) as executor:
+        futures = [executor.submit(_run_batch, simulation, batch_seed, num_samples) for batch_seed, num_samples in batches]
+        for f in futures:
+            ret.add(f.result())
+    return ret
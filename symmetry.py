@@ -0,0 +1,128 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from itertools import permutations
+
+from hand import CanonicalHand, Hand, HandKey
+from meld import Meld
+from tile import SuitedTile, Tile
+from tile_counts import NUM_SUITED_KINDS, NUM_TILE_KINDS, RANKS_PER_SUIT, SUITS, index_tile, tile_index
+
+# ---
+
+# Shapes (decompositions, shanten, waits, fu) and most yaku do not change when the three suits are swapped
+# or the ranks of every suit are mirrored (1 <-> 9, 2 <-> 8, ...); honors are left alone. All Green only
+# holds sou, so it is not preserved by suit swaps or mirroring, and dora must be found from the original
+# indicators (the tile after 9 is 1, which mirroring does not preserve): score the original hand for both
+
+# count patterns of a suit and its mirror image share one entry in per-suit tables
+def suit_pattern_key(pattern: tuple[int, ...]) -> tuple[tuple[int, ...], bool]:
+    # the smaller of the pattern and its mirror image, and whether it is the mirror image
+    mirrored = pattern[::-1]
+    return (mirrored, True) if mirrored < pattern else (pattern, False)
+
+def mirror_offsets(offsets: Sequence[int]) -> tuple[int, ...]:
+    # sorted offsets within a suit, mapped through the mirror and kept sorted
+    return tuple(RANKS_PER_SUIT - 1 - o for o in reversed(offsets))
+
+# ---
+
+@dataclass(frozen=True, slots=True)
+class Transform:
+    # suit s (0-2 for man/pin/sou) becomes suit _suits[s]; then ranks are mirrored if _mirror is set
+    _suits: tuple[int, ...] = (0, 1, 2)
+    _mirror: bool = False
+    # image of every tile index
+    _indices: tuple[int, ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if sorted(self._suits) != [*range(len(SUITS))]:
+            raise ValueError(f'Expected a permutation of the {len(SUITS)} suits, got {self._suits}.')
+        indices = [*range(NUM_TILE_KINDS)]
+        for s, t in enumerate(self._suits):
+            for r in range(RANKS_PER_SUIT):
+                indices[s*RANKS_PER_SUIT + r] = t*RANKS_PER_SUIT + (RANKS_PER_SUIT - 1 - r if self._mirror else r)
+        object.__setattr__(self, '_indices', tuple(indices))
+
+    @property
+    def suits(self) -> tuple[int, ...]:
+        return self._suits
+    @property
+    def mirror(self) -> bool:
+        return self._mirror
+    @property
+    def is_identity(self) -> bool:
+        return self == IDENTITY
+
+    def inverse(self) -> 'Transform':
+        suits = [0] * len(SUITS)
+        for s, t in enumerate(self._suits):
+            suits[t] = s
+        return Transform(tuple(suits), self._mirror)
+
+    def index(self, index: int) -> int:
+        return self._indices[index]
+
+    def code(self, code: int) -> int:
+        # red fives stay fives under the mirror, so only their suit changes
+        if code >= NUM_TILE_KINDS:
+            return NUM_TILE_KINDS + self._suits[code - NUM_TILE_KINDS]
+        return self._indices[code]
+
+    def tile(self, tile: Tile) -> Tile:
+        return index_tile(self._indices[tile_index(tile)], type(tile) is SuitedTile and tile.red_dora)
+
+    def counts(self, counts: Sequence[int]) -> bytes:
+        ret = bytearray(NUM_TILE_KINDS)
+        for i, c in enumerate(counts):
+            ret[self._indices[i]] = c
+        return bytes(ret)
+
+    def meld(self, meld: Meld) -> Meld:
+        # mirrored sequences are kept in ascending order
+        return Meld(sorted(map(self.tile, meld.tiles)), meld.is_open)
+
+    def hand(self, hand: Hand) -> Hand:
+        return Hand(sorted(map(self.tile, hand.tiles)), [*map(self.meld, hand.open_melds)], hand.num_kita)
+
+    def key(self, key: HandKey) -> HandKey:
+        counts, red_fives, melds, num_kita = key
+        new_red_fives = bytearray(len(SUITS))
+        for s, c in enumerate(red_fives):
+            new_red_fives[self._suits[s]] = c
+        return (
+            self.counts(counts), bytes(new_red_fives),
+            tuple(sorted((is_open, bytes(sorted(map(self.code, codes)))) for is_open, codes in melds)),
+            num_kita,
+        )
+
+IDENTITY = Transform()
+# every suit permutation, with and without the mirror
+TRANSFORMS: tuple[Transform, ...] = tuple(Transform(p, m) for m in (False, True) for p in permutations(range(len(SUITS))))
+
+# ---
+
+def canonical_counts(counts: Sequence[int]) -> tuple[bytes, Transform]:
+    # the smallest image of the 34 counts under every transform, and the transform that gives it;
+    # the suits are sorted by their (possibly mirrored) patterns instead of trying all 12 transforms
+    honors = bytes(counts[NUM_SUITED_KINDS:NUM_TILE_KINDS])
+    best: tuple[bytes, Transform] | None = None
+    for mirror in (False, True):
+        patterns = [bytes(counts[s*RANKS_PER_SUIT:(s+1)*RANKS_PER_SUIT]) for s in range(len(SUITS))]
+        if mirror:
+            patterns = [p[::-1] for p in patterns]
+        order = sorted(range(len(SUITS)), key=patterns.__getitem__)
+        image = b''.join(patterns[s] for s in order) + honors
+        if best is None or image < best[0]:
+            suits = [0] * len(SUITS)
+            for t, s in enumerate(order):
+                suits[s] = t
+            best = image, Transform(tuple(suits), mirror)
+    assert best is not None
+    return best
+
+def canonical_hand(hand: Hand | CanonicalHand) -> tuple[CanonicalHand, Transform]:
+    # the representative of the hand's class, and the transform that maps the hand to it;
+    # results computed for the representative are mapped back with the transform's inverse
+    key = hand.key if type(hand) is CanonicalHand else hand.canonical_key()
+    best, transform = min(((t.key(key), t) for t in TRANSFORMS), key=lambda e: e[0])
+    return CanonicalHand(best), transform
@@ -0,0 +1,80 @@
+import random
+from collections.abc import Sequence
+
+import pytest
+
+from agari import AgariForm, AgariIndex, agari_forms, is_agari
+from mahjong import *
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+scorer = RiichiMahjongScorer(MeldGenerator())
+
+# MARK: Forms
+@pytest.mark.parametrize('h, t, forms', [
+    ('123m 456p 789s 111z 2z', '2z', AgariForm.REGULAR),
+    ('2222333344445m', '5m', AgariForm.REGULAR),
+    ('11m 22p 33s 44z 55z 66z 7z', '7z', AgariForm.SEVEN_PAIRS),
+    ('112233m 445566p 7s', '7s', AgariForm.REGULAR | AgariForm.SEVEN_PAIRS),
+    ('19m 19p 19s 1234567z', '1m', AgariForm.THIRTEEN_ORPHANS),
+    ('456p 111z 2z 123m-789s', '2z', AgariForm.REGULAR),
+    ('123m 456p 789s 111z 2z', '3z', AgariForm.NONE),
+    ('11m 22p 33s 44z 55z 66z 7z', '6z', AgariForm.NONE),
+    ('11z 22z 123m-456p-789s', '3z', AgariForm.NONE),
+])
+def test_agari_forms(h: str, t: str, forms: AgariForm):
+    assert agari_forms(hf.create_hand(h), tf.create_tile(t)) == forms
+
+def test_agari_open_hand_no_special_forms():
+    # 7 pairs can only be formed closed
+    assert not is_agari(hf.create_hand('11m 22p 33s 44z-555z'), tf.create_tile('4z'))
+
+# MARK: Index
+def test_agari_index_lazy():
+    index = AgariIndex()
+    assert not index.is_built
+    assert index.group_flags((0, 0, 0, 0, 0, 0, 0)) != 0
+    assert index.is_built and len(index) > 0
+    index.clear()
+    assert not index.is_built
+
+def test_agari_index_matches_decompositions():
+    # a suit pattern is complete exactly when MeldGenerator finds a decomposition of it
+    index = AgariIndex()
+    table = DecompositionTable()
+    rng = random.Random(0)
+    for _ in range(20000):
+        pattern = tuple(min(4, max(0, rng.randint(-3, 4))) for _ in range(9))
+        num_tiles = sum(pattern)
+        if num_tiles > 14 or num_tiles % 3 == 1:
+            continue
+        flags = index.group_flags(pattern)
+        if num_tiles % 3 == 0:
+            assert bool(flags) == bool(table.get(pattern))
+        elif flags:
+            assert any(table.get(tuple(c - 2*(i == j) for j, c in enumerate(pattern))) or (c == 2 and num_tiles == 2) for i, c in enumerate(pattern) if c >= 2)
+
+# MARK: Scorer
+def test_get_points_not_agari():
+    assert scorer.get_points(
+        hf.create_hand('123m 456p 789s 111z 2z'), tf.create_tile('3z'),
+        round_wind=Wind.EAST, seat_wind=Wind.EAST, win_type=WinType.TSUMO,
+        riichi=RiichiState.RIICHI, under=UnderState.NONE, dora=[tf.create_tile('2m')], ura_dora=[]
+    ) == 0
+
+def test_get_points_checks_forms_once():
+    class CountingIndex(AgariIndex):
+        num_calls = 0
+        def forms(self, counts: Sequence[int], num_open_melds: int = 0) -> AgariForm:
+            self.num_calls += 1
+            return super().forms(counts, num_open_melds)
+
+    index = CountingIndex()
+    counting_scorer = RiichiMahjongScorer(MeldGenerator(), agari_index=index)
+    assert counting_scorer.get_points(
+        hf.create_hand('123m 456p 789s 111z 2z'), tf.create_tile('2z'),
+        round_wind=Wind.EAST, seat_wind=Wind.EAST, win_type=WinType.TSUMO,
+        riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[]
+    ) > 0
+    assert index.num_calls == 1
@@ -0,0 +1,67 @@
+import pytest
+
+from mahjong import *
+from batch import ScoringRequest, decode_request, encode_request, score_many, unique_requests
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+mg = MeldGenerator()
+scorer = RiichiMahjongScorer(mg)
+
+REQUESTS: list[ScoringRequest] = [
+    ScoringRequest(hf.create_hand('19m 19p 19s 1234567z'), tf.create_tile('1m'), Wind.EAST, Wind.EAST, WinType.RON),
+    ScoringRequest(hf.create_hand('222444m 444s 2233z'), tf.create_tile('2z'), Wind.EAST, Wind.SOUTH, WinType.TSUMO),
+    ScoringRequest(
+        hf.create_hand('234m 067p 5s 123m-789s', 1), tf.create_tile('5s'), Wind.SOUTH, Wind.WEST, WinType.RON,
+        RiichiState.NONE, UnderState.NONE, [tf.create_tile('5p')], []
+    ),
+    ScoringRequest(
+        hf.create_hand('234m 567p 2345s 111z'), tf.create_tile('5s'), Wind.EAST, Wind.NORTH, WinType.TSUMO,
+        RiichiState.RIICHI, UnderState.UNDER_THE_SEA, [tf.create_tile('1z')], [tf.create_tile('2m')]
+    ),
+] * 5
+
+# MARK: Encoding
+@pytest.mark.parametrize('request_', REQUESTS[:4])
+def test_encode_roundtrip(request_: ScoringRequest):
+    assert decode_request(encode_request(request_)) == request_
+
+def test_unique_requests():
+    # the third request with its tiles and melds in a different order
+    hand = Hand(hf.create_hand('5s 760p 432m').tiles, hf.create_hand('5s 789s-123m').open_melds, 1)
+    reordered = ScoringRequest(
+        hand, tf.create_tile('5s'), Wind.SOUTH, Wind.WEST, WinType.RON,
+        RiichiState.NONE, UnderState.NONE, [tf.create_tile('5p')], []
+    )
+    unique, positions = unique_requests([*REQUESTS, reordered])
+    assert unique == REQUESTS[:4]
+    assert positions == [0, 1, 2, 3] * 5 + [2]
+    points = [r.score(scorer) for r in unique]
+    assert [points[i] for i in positions] == [r.score(scorer) for r in [*REQUESTS, reordered]]
+
+# ---
+
+# MARK: Scoring
+def test_score_many_inline():
+    expected = [r.score(scorer) for r in REQUESTS]
+    assert [*score_many(REQUESTS, workers=1)] == [*enumerate(expected)]
+
+def test_score_many_ordered():
+    expected = [r.score(scorer) for r in REQUESTS]
+    assert [*score_many(iter(REQUESTS), workers=2, chunksize=3)] == [*enumerate(expected)]
+
+def test_score_many_unordered():
+    expected = [r.score(scorer) for r in REQUESTS]
+    assert sorted(score_many(REQUESTS, workers=2, chunksize=3, ordered=False)) == [*enumerate(expected)]
+
+def test_score_many_invalid_chunksize():
+    with pytest.raises(ValueError):
+        score_many(REQUESTS, chunksize=0)
+
+def test_score_many_scorer():
+    expected = [r.score(scorer) for r in REQUESTS]
+    assert [*score_many(REQUESTS, scorer=scorer)] == [*enumerate(expected)]
+    # misuse fails at the call, not at the first iteration
+    with pytest.raises(ValueError):
+        score_many(REQUESTS, workers=2, scorer=scorer)
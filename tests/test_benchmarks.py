@@ -0,0 +1,35 @@
+import json
+
+from benchmarks.corpus import WORST_CASE_HANDS, corpora
+from benchmarks import harness
+from mahjong import *
+
+# MARK: Corpus
+def test_corpora_seeded():
+    first, second = corpora(7, 20), corpora(7, 20)
+    assert [d.hand.canonical_key() for d in first['typical']] == [d.hand.canonical_key() for d in second['typical']]
+    assert len(first['worst_case']) == len(WORST_CASE_HANDS)
+    assert all(d.hand.open_melds for d in first['open'])
+
+def test_corpora_complete():
+    # every generated hand is a winning hand
+    mg = MeldGenerator()
+    for deals in corpora(3, 20).values():
+        for d in deals:
+            assert len(d.hand.tiles) + 3*len(d.hand.open_melds) == 13
+            assert next(mg.yield_melds_with_pair(d.all_tiles_dict, []), None) is not None
+
+# MARK: Harness
+def test_harness_output_and_compare(tmp_path):
+    path = tmp_path / 'results.json'
+    assert harness.main(['--size', '5', '--repeat', '1', '--output', str(path)]) == 0
+
+    results = json.loads(path.read_text())
+    assert len(results['results']) == 3 * len(harness.BENCHMARKS)
+    assert all(r['ops_per_sec'] > 0 for r in results['results'].values())
+
+    slower = json.loads(path.read_text())
+    for r in slower['results'].values():
+        r['ops_per_sec'] /= 2
+    assert harness.compare(results, slower, 0.1) == list(results['results'])
+    assert harness.compare(results, results, 0.1) == []
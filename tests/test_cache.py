@@ -0,0 +1,127 @@
+import pytest
+
+from mahjong import *
+from cache import LRUCache
+from hand import CanonicalHand
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+mg = MeldGenerator()
+scorer = RiichiMahjongScorer(mg)
+
+# MARK: LRUCache
+def test_lru_eviction():
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1      # 'b' is now least recently used
+    cache.put('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (3, 1, 2, 2)
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info().hits == 0
+
+def test_lru_invalid_size():
+    with pytest.raises(ValueError):
+        _ = LRUCache(0)
+
+# ---
+
+# MARK: Hand key
+def test_canonical_key():
+    assert hf.create_hand('123m 456p').canonical_key() == hf.create_hand('456p 321m').canonical_key()
+    assert hf.create_hand('5m-123p-456p').canonical_key() == hf.create_hand('5m-456p-312p').canonical_key()
+    assert hf.create_hand('405m').canonical_key() != hf.create_hand('455m').canonical_key()
+    assert hf.create_hand('5m-405p').canonical_key() != hf.create_hand('5m-455p').canonical_key()
+    assert hf.create_hand('123m', 1).canonical_key() != hf.create_hand('123m').canonical_key()
+
+def test_canonical_hand():
+    a, b = hf.create_hand('321m 406p 5p 789s-1111z').freeze(), hf.create_hand('450p 6p 123m 1111z-978s').freeze()
+    assert a == b and hash(a) == hash(b)
+    assert len({a, b, hf.create_hand('321m 456p 5p 789s-1111z').freeze()}) == 2
+    assert a.tiles == tuple(tf.create_tile(t) for t in ['1m', '2m', '3m', '4p', '0p', '5p', '6p'])
+    assert a.open_melds == (mf.create_meld('789s', True), mf.create_meld('1111z', True))
+    assert len(a) == 7 and a.is_open
+    # converting back gives an equal hand
+    assert a.to_hand().freeze() == a
+    assert a.to_hand().canonical_key() == hf.create_hand('321m 406p 5p 789s-1111z').canonical_key()
+    assert CanonicalHand(a.key) == a
+
+def test_canonical_hand_is_frozen():
+    h = hf.create_hand('123m').freeze()
+    with pytest.raises(AttributeError):
+        h._key = hf.create_hand('456m').canonical_key()  # type: ignore[misc]
+    assert h != hf.create_hand('123m', 1).freeze()
+    assert h != hf.create_hand('123m')
+
+# ---
+
+# MARK: Scorer
+@pytest.mark.parametrize('h, t, num_kita, dora', [
+    ('19m 19p 19s 1234567z', '1m', 0, []),
+    ('222444m 444s 2233z', '2z', 0, []),
+    ('234m 067p 5s 123m-789s', '5s', 1, ['5p']),
+    ('234m 567p 5s 123m-789s', '5s', 1, ['5p']),
+    ('234m 567p 5s 123m-789s', '0s', 0, ['5s']),
+    ('234m 567p 5s 123m-789s', '5s', 0, ['5s']),
+])
+def test_cached_scorer_matches(h: str, t: str, num_kita: int, dora: list[str]):
+    cached_scorer = RiichiMahjongScorer(mg, cache_size=4)
+    hand, tile = hf.create_hand(h, num_kita), tf.create_tile(t)
+    kwargs = dict(
+        round_wind=Wind.EAST, seat_wind=Wind.SOUTH, win_type=WinType.TSUMO,
+        riichi=RiichiState.RIICHI, under=UnderState.NONE, dora=[tf.create_tile(d) for d in dora], ura_dora=[]
+    )
+
+    for _ in range(2):
+        assert cached_scorer.get_yakuman(hand, tile, win_type=WinType.TSUMO) == scorer.get_yakuman(hand, tile, win_type=WinType.TSUMO)
+        assert cached_scorer.get_yaku(hand, tile, **kwargs) == scorer.get_yaku(hand, tile, **kwargs)
+        assert cached_scorer.get_points(hand, tile, **kwargs) == scorer.get_points(hand, tile, **kwargs)
+
+    info = cached_scorer.cache_info()
+    assert info is not None and info.misses == 2 and info.currsize == 2 and info.hits >= 3
+
+def test_cache_distinguishes_red_fives():
+    cached_scorer = RiichiMahjongScorer(mg, cache_size=16)
+    kwargs = dict(
+        round_wind=Wind.EAST, seat_wind=Wind.SOUTH, win_type=WinType.RON,
+        riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[]
+    )
+
+    plain = cached_scorer.get_yaku(hf.create_hand('234m 567p 5s 123m-789s'), tf.create_tile('5s'), **kwargs)
+    red_tile = cached_scorer.get_yaku(hf.create_hand('234m 567p 5s 123m-789s'), tf.create_tile('0s'), **kwargs)
+    red_hand = cached_scorer.get_yaku(hf.create_hand('234m 067p 5s 123m-789s'), tf.create_tile('5s'), **kwargs)
+    red_meld = cached_scorer.get_yaku(hf.create_hand('234m 567p 5s 123m-406s'), tf.create_tile('5s'), **kwargs)
+
+    assert plain == {}
+    assert red_tile == red_hand == red_meld == {}
+
+def test_cache_results_are_copies():
+    cached_scorer = RiichiMahjongScorer(mg, cache_size=16)
+    hand, tile = hf.create_hand('19m 19p 19s 1234567z'), tf.create_tile('1m')
+    cached_scorer.get_yakuman(hand, tile, win_type=WinType.RON).clear()
+    assert cached_scorer.get_yakuman(hand, tile, win_type=WinType.RON) == {DoubleYakuman.THIRTEEN_WAIT_THIRTEEN_ORPHANS: 2}
+
+def test_cache_toggle():
+    cached_scorer = RiichiMahjongScorer(mg)
+    assert cached_scorer.cache_info() is None
+
+    cached_scorer.enable_cache(8)
+    cached_scorer.get_yakuman(hf.create_hand('19m 19p 19s 1234567z'), tf.create_tile('1m'), win_type=WinType.RON)
+    info = cached_scorer.cache_info()
+    assert info is not None and info.currsize == 1
+
+    cached_scorer.cache_clear()
+    info = cached_scorer.cache_info()
+    assert info is not None and info.currsize == 0
+
+    cached_scorer.disable_cache()
+    assert cached_scorer.cache_info() is None
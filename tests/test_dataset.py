@@ -0,0 +1,66 @@
+import pytest
+
+from dataset import HEADER_SIZE, HandDataset, write_hands
+from encoding import RECORD_SIZE, decode_counts, decode_hand, encode_hand
+from mahjong import *
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+HANDS = [
+    hf.create_hand('123m 456p 789s 11z 222z'),
+    hf.create_hand('50p 55z 444m-666z-777z', 2),
+    hf.create_hand('1z 123m-406p-789s-777z'),
+    hf.create_hand('19m 19p 19s 1234567z'),
+]
+
+# MARK: Encoding
+@pytest.mark.parametrize('hand', HANDS)
+def test_encode_roundtrip(hand: Hand):
+    record = encode_hand(hand)
+    assert len(record) == RECORD_SIZE
+    assert decode_hand(record).canonical_key() == hand.canonical_key()
+
+def test_encode_closed_kan():
+    hand = Hand([tf.create_tile('1m')], [Meld([tf.create_tile('0s'), *[tf.create_tile('5s')] * 3], False)])
+    decoded = decode_hand(encode_hand(hand))
+    assert decoded.canonical_key() == hand.canonical_key()
+    assert not decoded.open_melds[0].is_open
+
+def test_decode_counts():
+    counts, num_melds = decode_counts(encode_hand(HANDS[1]))
+    assert counts == HANDS[1].closed_counts
+    assert num_melds == 3
+
+def test_encode_invalid():
+    with pytest.raises(ValueError):
+        _ = encode_hand(Hand([tf.create_tile('1m')], [Meld([tf.create_tile('1m'), tf.create_tile('3m'), tf.create_tile('5m')], True)]))
+    with pytest.raises(ValueError):
+        _ = encode_hand(hf.create_hand('11z', 8))
+
+# MARK: Dataset
+def test_dataset_roundtrip(tmp_path):
+    path = tmp_path / 'hands.bin'
+    assert write_hands(path, HANDS) == len(HANDS)
+    assert path.stat().st_size == HEADER_SIZE + len(HANDS) * RECORD_SIZE
+
+    with HandDataset(path) as ds:
+        assert len(ds) == len(HANDS)
+        assert [h.canonical_key() for h in ds] == [h.canonical_key() for h in HANDS]
+        assert ds[-1].canonical_key() == HANDS[-1].canonical_key()
+        assert bytes(ds.record(2)) == encode_hand(HANDS[2])
+        assert [c for c, _ in ds.iter_counts()] == [h.closed_counts for h in HANDS]
+        with pytest.raises(IndexError):
+            _ = ds[len(HANDS)]
+
+def test_dataset_invalid(tmp_path):
+    path = tmp_path / 'hands.bin'
+    path.write_bytes(b'not a dataset at all')
+    with pytest.raises(ValueError):
+        _ = HandDataset(path)
+
+    write_hands(path, HANDS)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        _ = HandDataset(path)
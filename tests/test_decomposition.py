@@ -0,0 +1,61 @@
+import pytest
+
+from mahjong import *
+from decomposition import DecompositionTable
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+# MARK: Table
+@pytest.mark.parametrize('pattern, decompositions', [
+    ((0, 0, 0, 0, 0, 0, 0, 0, 0), ((),)),
+    ((1, 1, 1, 0, 0, 0, 0, 0, 0), (((0, ClosedMeldKind.SEQUENCE),),)),
+    ((3, 3, 3, 0, 0, 0, 0, 0, 0), (
+        ((0, ClosedMeldKind.SEQUENCE), (0, ClosedMeldKind.SEQUENCE), (0, ClosedMeldKind.SEQUENCE)),
+        ((0, ClosedMeldKind.TRIPLET), (1, ClosedMeldKind.TRIPLET), (2, ClosedMeldKind.TRIPLET)),
+    )),
+    ((1, 1, 0, 0, 0, 0, 0, 0, 0), ()),
+    ((0, 0, 0, 0, 0, 0, 0, 1, 1), ()),
+    ((0, 0, 3, 0, 0, 0, 0), (((2, ClosedMeldKind.TRIPLET),),)),
+    ((1, 1, 1, 0, 0, 0, 0), ()),
+])
+def test_suit_decompositions(pattern: tuple[int, ...], decompositions: tuple):
+    lazy_table = DecompositionTable()
+    built_table = DecompositionTable()
+    built_table.build()
+
+    assert lazy_table.get(pattern) == decompositions
+    assert built_table.get(pattern) == decompositions
+
+def test_table_clear():
+    table = DecompositionTable()
+    table.build()
+    assert table.is_built and len(table) > 0
+
+    table.clear()
+    assert not table.is_built and len(table) == 0
+
+# ---
+
+# MARK: MeldGenerator
+@pytest.mark.parametrize('h, num_decompositions', [
+    ('22223333444455m', 3),
+    ('111222333m 789p 11z', 2),
+    ('123m 456p 789s 11222z', 1),
+    ('123m 456p 789s 11223z', 0),
+])
+def test_yield_melds_with_pair_table(h: str, num_decompositions: int):
+    hand = hf.create_hand(h)
+    table = DecompositionTable()
+    table.build()
+
+    lazy = [*MeldGenerator(DecompositionTable()).yield_melds_with_pair(hand.all_tiles_dict, [])]
+    built = [*MeldGenerator(table).yield_melds_with_pair(hand.all_tiles_dict, [])]
+
+    assert lazy == built
+    assert len(built) == num_decompositions
+
+def test_yield_melds_not_divisible():
+    with pytest.raises(ValueError):
+        _ = [*MeldGenerator().yield_melds(hf.create_hand('1234m').all_tiles_dict, [])]
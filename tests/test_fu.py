@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from fu import base_points, compute_fu, meld_fu, pair_fu
+from mahjong import *
+from shape import YakuContext
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+mg = MeldGenerator()
+scorer = RiichiMahjongScorer(mg)
+
+def get_fu(h: str, t: str, win_type: WinType = WinType.RON, *, seat_wind: Wind = Wind.SOUTH, round_wind: Wind = Wind.EAST) -> int:
+    yaku = scorer.get_yaku(
+        hf.create_hand(h), tf.create_tile(t),
+        round_wind=round_wind, seat_wind=seat_wind,
+        win_type=win_type, riichi=RiichiState.NONE, under=UnderState.NONE,
+        dora=[], ura_dora=[]
+    )
+    return scorer.count_han_fu(yaku)[1]
+
+def get_points(h: str, t: str, win_type: WinType = WinType.RON, *, seat_wind: Wind = Wind.SOUTH, round_wind: Wind = Wind.EAST) -> int:
+    return scorer.get_points(
+        hf.create_hand(h), tf.create_tile(t),
+        round_wind=round_wind, seat_wind=seat_wind,
+        win_type=win_type, riichi=RiichiState.NONE, under=UnderState.NONE,
+        dora=[], ura_dora=[]
+    )
+
+# MARK: Melds
+@pytest.mark.parametrize('index, is_concealed, is_quad, fu', [
+    (1, False, False, 2),
+    (1, True, False, 4),
+    (0, False, False, 4),
+    (27, True, False, 8),
+    (1, False, True, 8),
+    (33, True, True, 32),
+])
+def test_meld_fu(index: int, is_concealed: bool, is_quad: bool, fu: int):
+    assert meld_fu(index, is_concealed, is_quad) == fu
+
+# MARK: Fu
+@pytest.mark.parametrize('h, t, win_type, fu', [
+    # Pinfu
+    ('234m 456p 67s 22s 678s', '8s', WinType.RON, 30),
+    ('234m 456p 67s 22s 678s', '8s', WinType.TSUMO, 20),
+    # waits
+    ('234m 456p 68s 22s 678s', '7s', WinType.RON, 40),
+    ('123456789m 12s 22s', '3s', WinType.RON, 40),
+    # Seven Pairs
+    ('11m 22p 33s 44z 55z 66z 7z', '7z', WinType.RON, 25),
+    ('11m 22p 33s 44z 55z 66z 7z', '7z', WinType.TSUMO, 25),
+    # the triplet completed by ron counts as open
+    ('111m 999p 11s 555z 66z', '6z', WinType.RON, 60),
+    # open hands are at least 30 fu
+    ('234m 66s 22s 456p-567s', '2s', WinType.TSUMO, 30),
+    ('456m 22z 55z 123m-789m', '5z', WinType.RON, 30),
+])
+def test_fu(h: str, t: str, win_type: WinType, fu: int):
+    assert get_fu(h, t, win_type) == fu
+
+@pytest.mark.parametrize('index, seat_wind, round_wind, fu', [
+    (27, Wind.EAST, Wind.EAST, 4),
+    (27, Wind.SOUTH, Wind.EAST, 2),
+    (28, Wind.SOUTH, Wind.EAST, 2),
+    (30, Wind.SOUTH, Wind.EAST, 0),
+    (31, Wind.SOUTH, Wind.EAST, 2),
+    (1, Wind.SOUTH, Wind.EAST, 0),
+])
+def test_pair_fu(index: int, seat_wind: Wind, round_wind: Wind, fu: int):
+    # a pair of the seat wind that is also the round wind counts twice
+    assert pair_fu(index, YakuContext(seat_wind, round_wind, False)) == fu
+
+@pytest.mark.parametrize('is_open, fu', [
+    (False, 60),
+    (True, 40),
+])
+def test_fu_quads(is_open: bool, fu: int):
+    hand = Hand(hf.create_hand('234m 456p 1s 678s').tiles, [mf.create_meld('1111z', is_open)])
+    assert scorer.count_han_fu(scorer.get_yaku(
+        hand, tf.create_tile('1s'),
+        round_wind=Wind.EAST, seat_wind=Wind.SOUTH,
+        win_type=WinType.TSUMO, riichi=RiichiState.NONE, under=UnderState.NONE,
+        dora=[], ura_dora=[]
+    ))[1] == fu
+
+# MARK: Best interpretation
+def test_fu_breaks_han_ties():
+    # 4s completes 345s (closed wait) or 456s (two-sided wait), both for Half Flush
+    assert get_fu('34556678s 999s 22z', '4s') == 50
+    assert get_points('34556678s 999s 22z', '4s') == base_points(0, 3, 50)
+
+def test_best_matches_exhaustive():
+    rng = random.Random(16)
+    engine = YakuEngine()
+    for _ in range(300):
+        # four random melds and a pair
+        counts = [0] * NUM_TILE_KINDS
+        for _ in range(4):
+            if rng.random() < 0.6:
+                start = rng.randrange(3) * 9 + rng.randrange(7)
+                indices = [start, start + 1, start + 2]
+            else:
+                indices = [rng.randrange(NUM_TILE_KINDS)] * 3
+            for i in indices:
+                counts[i] += 1
+        counts[rng.randrange(NUM_TILE_KINDS)] += 2
+        if max(counts) > 4:
+            continue
+
+        tile_counts = TileCounts.from_tiles([index_tile(i) for i, c in enumerate(counts) for _ in range(c)])
+        winning_index = rng.choice([i for i, c in enumerate(counts) if c])
+        context = YakuContext(rng.choice(list(Wind)), rng.choice(list(Wind)), rng.random() < 0.5)
+        shapes = engine.shapes(mg.yield_decompositions_from_counts(tile_counts), [], winning_index, context.is_tsumo)
+        extra_han = rng.randrange(4)
+        has_yaku = rng.random() < 0.5
+
+        def points(shape: HandShape) -> tuple[int, int, int]:
+            han = extra_han + sum(engine.evaluate(shape, context).values())
+            fu = compute_fu(shape, context)
+            return base_points(0, han, fu), han, fu
+
+        # shapes without a yaku of their own only win if extra_han holds one
+        winning = [s for s in shapes if has_yaku or engine.evaluate(s, context)]
+        best_shape, _, _ = engine.best(shapes, context, extra_han, has_yaku=has_yaku)
+        if winning:
+            assert best_shape is not None and points(best_shape) == max(points(s) for s in winning)
+        else:
+            assert best_shape is None
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from mahjong import *
+from hand_state import HandState
+from shanten import shanten
+from waits import waits
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+# MARK: Derived data
+@pytest.mark.parametrize('h', [
+    '123m 456p 789s 1122z',
+    '19m 19p 19s 1234567z',
+    '1122m 3344p 5566s 7z',
+    '1112345678999m',
+    '234m 067p 5s 123m-789s',
+])
+def test_matches_hand(h: str):
+    hand = hf.create_hand(h)
+    state = HandState(hand)
+    assert state.shanten == shanten(hand)
+    assert state.waits == waits(hand)
+    assert state.to_hand().canonical_key() == hand.canonical_key()
+
+def test_draw_discard_loop():
+    rng = random.Random(23)
+    wall = [tf.create_tile(f'{r}{s}') for s in 'mps' for r in range(1, 10) for _ in range(4)]
+    wall += [tf.create_tile(f'{r}z') for r in range(1, 8) for _ in range(4)]
+    rng.shuffle(wall)
+
+    state = HandState(Hand(wall[:13], []))
+    for tile in wall[13:80]:
+        state.draw(tile)
+        hand = state.to_hand()
+        assert state.shanten == shanten(hand)
+        discard = rng.choice(hand.tiles)
+        state.discard(discard)
+        hand = state.to_hand()
+        assert state.shanten == shanten(hand)
+        assert state.waits == waits(hand)
+        assert state.tile_mask == sum(1 << i for i, c in enumerate(hand.closed_counts.counts) if c)
+
+def test_invalidation():
+    state = HandState(hf.create_hand('123m 456p 789s 1122z'))
+    assert (state.shanten, state.waits) == (0, [tf.create_tile('1z'), tf.create_tile('2z')])
+    state.draw(tf.create_tile('3z'))
+    assert state.shanten == 0
+    state.discard(tf.create_tile('1z'))
+    assert (state.shanten, state.waits) == (1, [])
+
+def test_waits_reuse_groups():
+    state = HandState(hf.create_hand('11m 1199p 5599s 1z 5z 6z'))
+    assert (state.shanten, state.waits) == (1, [])
+    state.draw(tf.create_tile('5z'))
+    state.discard(tf.create_tile('6z'))
+    # only the honors were touched, so the suits keep their cached tables
+    assert [d is None for d in state._group_distances] == [False, False, False, True]
+    assert state.waits == waits(state.to_hand()) == [tf.create_tile('1z')]
+
+# ---
+
+# MARK: Calls
+def test_pon():
+    state = HandState(hf.create_hand('123m 456p 78s 1122z 5m'))
+    state.call(mf.create_meld('111z', True), tf.create_tile('1z'))
+    assert len(state) == 11
+    assert not state.is_closed
+    state.discard(tf.create_tile('5m'))
+    assert state.shanten == shanten(state.to_hand()) == 0
+    assert state.waits == [tf.create_tile('6s'), tf.create_tile('9s')]
+
+def test_closed_kan():
+    state = HandState(hf.create_hand('1111m 456p 789s 1222z'))
+    state.call(mf.create_meld('1111m'))
+    assert state.is_closed
+    assert state.open_melds == (mf.create_meld('1111m'),)
+    assert state.waits == [tf.create_tile('1z')]
+    # the replacement tile completes the hand
+    state.draw(tf.create_tile('1z'))
+    assert state.shanten == shanten(state.to_hand()) == -1
+
+def test_added_kan():
+    state = HandState(hf.create_hand('123m 456p 789s 1123z'))
+    state.call(mf.create_meld('111z', True), tf.create_tile('1z'))
+    state.discard(tf.create_tile('3z'))
+    state.draw(tf.create_tile('1z'))
+    state.call(mf.create_meld('1111z', True))
+    assert state.open_melds == (mf.create_meld('1111z', True),)
+    assert len(state) == 10
+    # every copy of 1z is in the kan
+    with pytest.raises(ValueError):
+        state.draw(tf.create_tile('1z'))
+
+# ---
+
+# MARK: Errors
+def test_invalid_changes():
+    state = HandState(hf.create_hand('123m 406p 789s 1122z'))
+    with pytest.raises(ValueError):
+        state.discard(tf.create_tile('3z'))
+    # the only 5p is red
+    with pytest.raises(ValueError):
+        state.discard(tf.create_tile('5p'))
+    with pytest.raises(ValueError):
+        state.call(mf.create_meld('333z', True), tf.create_tile('3z'))
+    with pytest.raises(ValueError):
+        state.call(mf.create_meld('123m', True), tf.create_tile('4m'))
+    # failed calls leave the hand unchanged
+    assert state.to_hand().canonical_key() == hf.create_hand('123m 406p 789s 1122z').canonical_key()
+
+    for _ in range(2):
+        state.draw(tf.create_tile('1z'))
+    with pytest.raises(ValueError):
+        state.draw(tf.create_tile('1z'))
+    with pytest.raises(ValueError):
+        state.shanten
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+# generous enough for slow CI machines; a cold import takes around 20ms on a laptop
+IMPORT_BUDGET_US = 150_000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _run(code: str, *args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run([sys.executable, *args, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+# MARK: Import
+def test_import_no_output():
+    result = _run('import mahjong')
+    assert result.stdout == ''
+    assert result.stderr == ''
+
+def test_import_lazy():
+    # script-only modules and lookup tables are not loaded until they are needed
+    result = _run('import sys, mahjong; print(sorted({"argparse"} & sys.modules.keys()), len(mahjong.DEFAULT_DECOMPOSITION_TABLE), mahjong.DEFAULT_AGARI_INDEX.is_built)')
+    assert result.stdout.split() == ['[]', '0', 'False']
+
+def test_import_budget():
+    # -X importtime reports the cumulative import time of every module in microseconds on stderr
+    result = _run('import mahjong', '-X', 'importtime')
+    times = {line.split('|')[2].strip(): int(line.split('|')[1]) for line in result.stderr.splitlines() if line.count('|') == 2 and 'cumulative' not in line}
+    assert times['mahjong'] < IMPORT_BUDGET_US
@@ -0,0 +1,89 @@
+import pytest
+
+from instrumentation import Phase, ScoringStats
+from mahjong import *
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+kwargs = dict(
+    round_wind=Wind.EAST, seat_wind=Wind.SOUTH, win_type=WinType.TSUMO,
+    riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[]
+)
+
+def get_points(scorer: RiichiMahjongScorer, h: str, t: str) -> int:
+    return scorer.get_points(hf.create_hand(h), tf.create_tile(t), **kwargs)
+
+# MARK: Counters
+def test_meld_generator_counts():
+    mg = MeldGenerator()
+    stats = mg.enable_stats()
+    decompositions = [*mg.yield_decompositions_from_counts(hf.create_hand('22223333444455m').closed_counts)]
+
+    assert stats.num_decompositions == len(decompositions)
+    # 2m, 3m, 4m and 5m can each be tried as the pair
+    assert stats.num_pair_candidates == 4
+    assert stats.num_lookups == 4 + 4
+
+    mg.disable_stats()
+    [*mg.yield_decompositions_from_counts(hf.create_hand('22223333444455m').closed_counts)]
+    assert stats.num_decompositions == len(decompositions)
+
+def test_scorer_phases():
+    mg = MeldGenerator()
+    scorer = RiichiMahjongScorer(mg)
+    with scorer.instrumented() as stats:
+        get_points(scorer, '222333444m 678p 5s', '5s')
+        get_points(scorer, '19m 19p 19s 1234567z', '1m')
+        get_points(scorer, '222333444m 678p 5s', '6s')
+
+    assert stats.num_calls == 3
+    assert all(seconds > 0 for seconds in stats.phase_seconds.values())
+    assert stats.total_seconds == pytest.approx(sum(stats.phase_seconds.values()))
+    # the yakuman hand is never decomposed, and the hand that 6s does not complete is never scored
+    assert stats.num_pair_candidates == 4
+    assert scorer.stats is None
+    assert mg.stats is None
+
+def test_slowest_calls():
+    scorer = RiichiMahjongScorer(MeldGenerator())
+    stats = ScoringStats(_max_slowest=2)
+    with scorer.instrumented(stats):
+        for h, t in [('123m 456p 789s 11z 22z', '2z'), ('222333444m 678p 5s', '5s'), ('2222333344445m', '5m')]:
+            get_points(scorer, h, t)
+
+    slowest = stats.slowest
+    assert len(slowest) == 2
+    assert slowest[0][0] >= slowest[1][0]
+    assert all(hand.startswith('Hand(') for _, hand in slowest)
+
+def test_instrumented_decorator():
+    scorer = RiichiMahjongScorer(MeldGenerator())
+    stats = ScoringStats()
+
+    @scorer.instrumented(stats)
+    def score() -> int:
+        return get_points(scorer, '222333444m 678p 5s', '5s')
+
+    score()
+    score()
+    assert stats.num_calls == 2
+    assert scorer.stats is None
+
+def test_instrumented_nested():
+    scorer = RiichiMahjongScorer(MeldGenerator())
+    with scorer.instrumented() as outer:
+        with scorer.instrumented() as inner:
+            get_points(scorer, '222333444m 678p 5s', '5s')
+        get_points(scorer, '222333444m 678p 5s', '5s')
+        assert scorer.stats is outer
+
+    assert (outer.num_calls, inner.num_calls) == (1, 1)
+
+def test_reset():
+    stats = ScoringStats()
+    stats.add_phase(Phase.YAKU, 10)
+    stats.count_decomposition()
+    stats.reset()
+    assert stats == ScoringStats()
@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+from mahjong import *
+from parser import HandParseError, HandParser
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+hp = HandParser()
+
+# MARK: Hands
+@pytest.mark.parametrize('raw', [
+    '123m 456p 789s 11z 222z',
+    '50p 55z 444m-666z-777z',
+    '1z 123m-456p-789s-777z',
+    '1133m 557p 9s 123m-456p',
+    '19m 19p 19s 1234567z',
+])
+def test_parse_hand_matches_factory(raw: str):
+    assert hp.parse_hand(raw) == hf.create_hand(raw)
+
+def test_parse_hand_compact():
+    # suits may follow each other without spaces, and extra whitespace is ignored
+    assert hp.parse_hand('123m456p  789s\t11z222z\n') == hf.create_hand('123m 456p 789s 11z 222z')
+
+def test_parse_counts():
+    counts, num_open_melds = hp.parse_counts('50p 55z 444m-666z-777z')
+    assert counts == hf.create_hand('50p 55z').counts
+    assert num_open_melds == 3
+
+def test_parse_hands_from_file():
+    stream = io.StringIO('123m 456p 789s 11z 222z\n\n1z 123m-456p-789s-777z\n')
+    assert list(hp.parse_hands(stream)) == [hf.create_hand('123m 456p 789s 11z 222z'), hf.create_hand('1z 123m-456p-789s-777z')]
+
+# MARK: Errors
+@pytest.mark.parametrize('raw, column', [
+    ('123m 8z', 6),
+    ('123m 45', 6),
+    ('123x', 4),
+    ('m', 1),
+    ('-123m', 1),
+    ('123m--456p', 6),
+    ('123m 456p-', 11),
+    ('123m-456p 1z', 11),
+])
+def test_parse_error_column(raw: str, column: int):
+    with pytest.raises(HandParseError) as e:
+        _ = hp.parse_hand(raw)
+    assert e.value.line_number == 1
+    assert e.value.column == column
+
+def test_parse_error_line_number():
+    with pytest.raises(HandParseError) as e:
+        _ = list(hp.parse_all_counts(['123m 456p 789s 11z 222z', '', '123m 0z']))
+    assert (e.value.line_number, e.value.column) == (3, 6)
+    assert isinstance(e.value, ValueError)
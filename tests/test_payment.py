@@ -0,0 +1,95 @@
+import pytest
+
+from mahjong import *
+from fu import base_points
+from payment import DEFAULT_PAYMENT_TABLE, MAX_FU, MAX_HAN, MAX_YAKUMAN, Payment, PaymentTable, round_up
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+# MARK: Payments
+@pytest.mark.parametrize('yakuman, han, fu, ron, dealer_ron, tsumo, dealer_tsumo', [
+    (0, 1, 30, 1000, 1500, (500, 300), 500),
+    (0, 2, 20, 1300, 2000, (700, 400), 700),
+    (0, 2, 25, 1600, 2400, (800, 400), 800),
+    (0, 3, 40, 5200, 7700, (2600, 1300), 2600),
+    (0, 4, 30, 7700, 11600, (3900, 2000), 3900),
+    (0, 3, 70, 8000, 12000, (4000, 2000), 4000),
+    (0, 6, 30, 12000, 18000, (6000, 3000), 6000),
+    (0, 13, 30, 32000, 48000, (16000, 8000), 16000),
+    (2, 0, 0, 64000, 96000, (32000, 16000), 32000),
+])
+def test_payment(yakuman: int, han: int, fu: int, ron: int, dealer_ron: int, tsumo: tuple[int, int], dealer_tsumo: int):
+    p = DEFAULT_PAYMENT_TABLE.lookup(yakuman, han, fu)
+    assert (p.ron, p.dealer_ron, (p.tsumo_dealer, p.tsumo_non_dealer), p.dealer_tsumo) == (ron, dealer_ron, tsumo, dealer_tsumo)
+
+def test_table_matches_direct():
+    table = PaymentTable()
+    for yakuman in range(MAX_YAKUMAN+1):
+        for han in range(MAX_HAN+3):
+            for fu in [0, 20, 25, 30, 110, MAX_FU]:
+                assert table.lookup(yakuman, han, fu) == Payment.of(yakuman, han, fu)
+    assert table.is_built
+
+def test_outside_table():
+    table = PaymentTable()
+    assert table.lookup(MAX_YAKUMAN+1, 0, 0).base_points == 8000 * (MAX_YAKUMAN+1)
+    assert table.lookup(0, 1, 33) == Payment.of(0, 1, 33)
+    assert not table.is_built
+    with pytest.raises(ValueError):
+        table.lookup(0, -1, 30)
+
+def test_round_up():
+    assert [round_up(p) for p in [0, 1, 100, 101, 960]] == [0, 100, 100, 200, 1000]
+
+# ---
+
+# MARK: Settlement
+def test_settle_ron():
+    p = Payment.of(0, 3, 30)
+    assert p.settle(Wind.SOUTH, Wind.WEST) == {Wind.EAST: 0, Wind.SOUTH: 3900, Wind.WEST: -3900, Wind.NORTH: 0}
+    assert p.settle(Wind.EAST, Wind.NORTH) == {Wind.EAST: 5800, Wind.SOUTH: 0, Wind.WEST: 0, Wind.NORTH: -5800}
+
+def test_settle_tsumo():
+    p = Payment.of(0, 3, 30)
+    assert p.settle(Wind.SOUTH) == {Wind.EAST: -2000, Wind.SOUTH: 4000, Wind.WEST: -1000, Wind.NORTH: -1000}
+    assert p.settle(Wind.EAST) == {Wind.EAST: 6000, Wind.SOUTH: -2000, Wind.WEST: -2000, Wind.NORTH: -2000}
+
+def test_settle_three_players():
+    p = Payment.of(0, 3, 30)
+    # the North seat's share of a tsumo is not paid
+    assert p.settle(Wind.SOUTH, num_players=3) == {Wind.EAST: -2000, Wind.SOUTH: 3000, Wind.WEST: -1000}
+    assert p.settle(Wind.EAST, num_players=3) == {Wind.EAST: 4000, Wind.SOUTH: -2000, Wind.WEST: -2000}
+    assert p.settle(Wind.WEST, Wind.EAST, num_players=3) == {Wind.EAST: -3900, Wind.SOUTH: 0, Wind.WEST: 3900}
+
+def test_settle_honba_and_riichi_sticks():
+    p = Payment.of(0, 1, 30)
+    assert p.settle(Wind.SOUTH, Wind.WEST, honba=2, riichi_sticks=1) == {Wind.EAST: 0, Wind.SOUTH: 2600, Wind.WEST: -1600, Wind.NORTH: 0}
+    assert p.settle(Wind.SOUTH, honba=1, riichi_sticks=2) == {Wind.EAST: -600, Wind.SOUTH: 3400, Wind.WEST: -400, Wind.NORTH: -400}
+
+@pytest.mark.parametrize('winner, discarder, num_players', [
+    (Wind.SOUTH, Wind.SOUTH, 4),
+    (Wind.NORTH, None, 3),
+    (Wind.EAST, Wind.NORTH, 3),
+    (Wind.EAST, None, 2),
+])
+def test_settle_invalid(winner: Wind, discarder: Wind | None, num_players: int):
+    with pytest.raises(ValueError):
+        Payment.of(0, 1, 30).settle(winner, discarder, num_players=num_players)
+
+# ---
+
+# MARK: Scorer
+def test_scorer_payment():
+    scorer = RiichiMahjongScorer(MeldGenerator())
+    kwargs = dict(
+        round_wind=Wind.EAST, seat_wind=Wind.SOUTH, win_type=WinType.RON,
+        riichi=RiichiState.RIICHI, under=UnderState.NONE, dora=[], ura_dora=[]
+    )
+    hand, tile = hf.create_hand('234m 567p 234s 2299s'), tf.create_tile('9s')
+    payment = scorer.get_payment(hand, tile, **kwargs)
+    # Riichi at 40 fu
+    assert payment == Payment.of(0, 1, 40)
+    assert scorer.get_points(hand, tile, **kwargs) == payment.base_points == base_points(0, 1, 40)
+    assert scorer.get_payment(hand, tf.create_tile('1m'), **kwargs).base_points == 0
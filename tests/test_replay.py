@@ -0,0 +1,109 @@
+import io
+import json
+
+import pytest
+
+from mahjong import *
+from batch import ScoringRequest
+from replay import Replay, read_chunks
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+scorer = RiichiMahjongScorer(MeldGenerator())
+
+RECORDS: list[str] = [
+    json.dumps({'hand': '19m 19p 19s 1234567z', 'winning_tile': '1m', 'round_wind': 'EAST', 'seat_wind': 'EAST', 'win_type': 'RON'}),
+    json.dumps({'hand': '222444m 444s 2233z', 'winning_tile': '2z', 'round_wind': 'EAST', 'seat_wind': 'SOUTH', 'win_type': 'TSUMO'}),
+    '',
+    json.dumps({'hand': '234m 567p 2345s 111z', 'winning_tile': '5s', 'round_wind': 'EAST', 'seat_wind': 'NORTH', 'win_type': 'TSUMO',
+                'riichi': 'RIICHI', 'under': 'UNDER_THE_SEA', 'dora': ['1z'], 'ura_dora': ['2m'], 'kita': 1}),
+    '{"hand": "19m 19p", "winning_tile": "1x"}',
+    'not json',
+    json.dumps({'hand': '222444m 444s 2233z', 'winning_tile': '3z', 'round_wind': 'EAST', 'seat_wind': 'SOUTH', 'win_type': 'RON'}),
+]
+
+def expected_points() -> list[int]:
+    return [
+        scorer.get_points(hf.create_hand('19m 19p 19s 1234567z'), tf.create_tile('1m'), round_wind=Wind.EAST, seat_wind=Wind.EAST,
+                          win_type=WinType.RON, riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[]),
+        scorer.get_points(hf.create_hand('222444m 444s 2233z'), tf.create_tile('2z'), round_wind=Wind.EAST, seat_wind=Wind.SOUTH,
+                          win_type=WinType.TSUMO, riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[]),
+        scorer.get_points(hf.create_hand('234m 567p 2345s 111z', 1), tf.create_tile('5s'), round_wind=Wind.EAST, seat_wind=Wind.NORTH,
+                          win_type=WinType.TSUMO, riichi=RiichiState.RIICHI, under=UnderState.UNDER_THE_SEA,
+                          dora=[tf.create_tile('1z')], ura_dora=[tf.create_tile('2m')]),
+        scorer.get_points(hf.create_hand('222444m 444s 2233z'), tf.create_tile('3z'), round_wind=Wind.EAST, seat_wind=Wind.SOUTH,
+                          win_type=WinType.RON, riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[]),
+    ]
+
+# MARK: Reader
+def test_read_chunks():
+    chunks = [*read_chunks(io.StringIO('\n'.join(RECORDS)), 2)]
+    assert [[n for n, _ in c] for c in chunks] == [[1, 2], [4, 5], [6, 7]]
+
+# ---
+
+# MARK: Replay
+def test_replay_inline():
+    replay = Replay(io.StringIO('\n'.join(RECORDS)), chunk_size=2)
+    results = [*replay]
+
+    assert [r.line_number for r in results] == [1, 2, 4, 5, 6, 7]
+    assert [r.points for r in results if r.error is None] == expected_points()
+    assert [r.line_number for r in results if r.error is not None] == [5, 6]
+
+    assert replay.summary.num_records == 6
+    assert replay.summary.num_scored == 4
+    assert replay.summary.num_errors == 2
+    assert replay.summary.total_points == sum(expected_points())
+    assert replay.summary.max_points == max(expected_points())
+
+def test_replay_parallel():
+    replay = Replay(io.StringIO('\n'.join(RECORDS * 10)), workers=2, chunk_size=3)
+    results = [*replay]
+
+    assert [r.line_number for r in results] == [n for n in range(1, 10*len(RECORDS) + 1) if n % len(RECORDS) != 3]
+    assert replay.summary.total_points == 10 * sum(expected_points())
+
+def test_replay_unordered():
+    replay = Replay(io.StringIO('\n'.join(RECORDS * 10)), workers=2, chunk_size=3, ordered=False)
+    assert sorted(r.line_number for r in replay) == [n for n in range(1, 10*len(RECORDS) + 1) if n % len(RECORDS) != 3]
+    assert replay.summary.num_errors == 20
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_replay_bounded_errors(workers: int):
+    # a long run of unparsable records is reported as it is read, not held until the next valid record
+    num_read = 0
+    def stream():
+        nonlocal num_read
+        for line in ['not json'] * 10000 + RECORDS[:1]:
+            num_read += 1
+            yield line
+    replay = iter(Replay(stream(), workers=workers, chunk_size=10))
+    assert next(replay).line_number == 1
+    assert num_read <= 2 * workers * 10 + 1
+    results = [*replay]
+    assert [r.line_number for r in results] == [*range(2, 10002)]
+    assert results[-1].error is None
+
+@pytest.mark.parametrize('kita', ['"x"', '-3', 'true'])
+def test_replay_invalid_kita(kita: str):
+    line = f'{{"hand": "234m 567p 2345s 111z", "winning_tile": "5s", "round_wind": "EAST", "seat_wind": "SOUTH", "win_type": "TSUMO", "kita": {kita}}}'
+    results = [*Replay(io.StringIO('\n'.join([line, RECORDS[0]])))]
+    assert results[0].points is None and results[0].error is not None and 'kita' in results[0].error
+    assert results[1].points == expected_points()[0]
+
+def test_replay_scoring_error(monkeypatch: pytest.MonkeyPatch):
+    # a record that parses but fails to score is reported on its own line, and the replay goes on
+    score = ScoringRequest.score
+    def fail_on_kita(request: ScoringRequest, scorer: RiichiMahjongScorer) -> int:
+        if request.hand.num_kita > 0:
+            raise RuntimeError('no kita')
+        return score(request, scorer)
+    monkeypatch.setattr(ScoringRequest, 'score', fail_on_kita)
+    replay = Replay(io.StringIO('\n'.join(RECORDS)))
+    results = [*replay]
+    assert [r.line_number for r in results] == [1, 2, 4, 5, 6, 7]
+    assert results[2].points is None and results[2].error == "Scoring failed: RuntimeError('no kita')"
+    assert results[-1].points == expected_points()[-1]
+    assert replay.summary.num_errors == 3
@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+
+from batch import ScoringRequest
+from mahjong import *
+from replay import RecordParser
+from server import ScoringServer
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+scorer = RiichiMahjongScorer(MeldGenerator())
+parser = RecordParser(tf, hf)
+
+RECORDS: list[dict] = [
+    {'hand': '19m 19p 19s 1234567z', 'winning_tile': '1m', 'round_wind': 'EAST', 'seat_wind': 'EAST', 'win_type': 'RON'},
+    {'hand': '222444m 444s 2233z', 'winning_tile': '2z', 'round_wind': 'EAST', 'seat_wind': 'SOUTH', 'win_type': 'TSUMO'},
+    {'hand': '234m 567p 2345s 111z', 'winning_tile': '5s', 'round_wind': 'EAST', 'seat_wind': 'NORTH', 'win_type': 'TSUMO',
+     'riichi': 'RIICHI', 'under': 'UNDER_THE_SEA', 'dora': ['1z'], 'ura_dora': ['2m'], 'kita': 1},
+    {'hand': '222444m 444s 2233z', 'winning_tile': '3z', 'round_wind': 'EAST', 'seat_wind': 'SOUTH', 'win_type': 'RON'},
+]
+
+def request_lines(num_requests: int, first_id: int = 0) -> list[str]:
+    return [json.dumps({'id': i, **RECORDS[i % len(RECORDS)]}) for i in range(first_id, first_id + num_requests)]
+
+def expected_points(i: int) -> int:
+    return parser.parse_record(RECORDS[i % len(RECORDS)]).score(scorer)
+
+async def exchange(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, lines: list[str]) -> list[dict]:
+    writer.write(''.join(f'{line}\n' for line in lines).encode())
+    writer.write_eof()
+    ret = [json.loads(line) async for line in reader]
+    writer.close()
+    await writer.wait_closed()
+    return ret
+
+async def exchange_tcp(server: ScoringServer, lines: list[str]) -> list[dict]:
+    host, port = server.sockets[0].getsockname()[:2]
+    return await exchange(*await asyncio.open_connection(host, port), lines)
+
+# MARK: Scoring
+def test_scores_in_order():
+    async def run() -> list[dict]:
+        async with ScoringServer(workers=2, use_threads=True, batch_size=3) as server:
+            await server.listen_tcp(port=0)
+            return await exchange_tcp(server, request_lines(20))
+
+    responses = asyncio.run(run())
+    assert [r['id'] for r in responses] == [*range(20)]
+    assert [r['points'] for r in responses] == [expected_points(i) for i in range(20)]
+    assert all(r['error'] is None for r in responses)
+
+def test_concurrent_clients():
+    async def run() -> list[list[dict]]:
+        # the queues are far smaller than the load, so clients are held back until there is room
+        async with ScoringServer(workers=2, use_threads=True, batch_size=4, max_queued=2, max_pipelined=3) as server:
+            await server.listen_tcp(port=0)
+            return await asyncio.gather(*(exchange_tcp(server, request_lines(25, 100 * c)) for c in range(8)))
+
+    for c, responses in enumerate(asyncio.run(run())):
+        assert [r['id'] for r in responses] == [*range(100 * c, 100 * c + 25)]
+        assert [r['points'] for r in responses] == [expected_points(i) for i in range(100 * c, 100 * c + 25)]
+
+def test_process_pool_unix_socket(tmp_path):
+    path = str(tmp_path / 'scoring.sock')
+
+    async def run() -> list[dict]:
+        async with ScoringServer(workers=2, batch_size=2) as server:
+            await server.listen_unix(path)
+            return await exchange(*await asyncio.open_unix_connection(path), request_lines(8))
+
+    responses = asyncio.run(run())
+    assert [r['points'] for r in responses] == [expected_points(i) for i in range(8)]
+
+# ---
+
+# MARK: Errors
+def test_invalid_requests():
+    lines = [
+        request_lines(1)[0],
+        'not json',
+        '',
+        json.dumps({'id': 'x', 'hand': '19m 19p', 'winning_tile': '1x'}),
+        '[1, 2]',
+        json.dumps({**RECORDS[0], 'id': 'kita', 'kita': 'x'}),
+        json.dumps({**RECORDS[0], 'id': 'negative kita', 'kita': -3}),
+        request_lines(1, 1)[0],
+    ]
+
+    async def run() -> list[dict]:
+        async with ScoringServer(workers=1, use_threads=True) as server:
+            await server.listen_tcp(port=0)
+            return await exchange_tcp(server, lines)
+
+    responses = asyncio.run(run())
+    # the blank line is skipped
+    assert [r['id'] for r in responses] == [0, None, 'x', None, 'kita', 'negative kita', 1]
+    assert [r['points'] for r in responses] == [expected_points(0), None, None, None, None, None, expected_points(1)]
+    assert all(r['error'].startswith('Invalid game record') for r in responses[1:6])
+
+def test_scoring_error(monkeypatch: pytest.MonkeyPatch):
+    # a request that fails to score gets its own error; the rest of its batch is still scored
+    score = ScoringRequest.score
+    def fail_on_kita(request: ScoringRequest, scorer: RiichiMahjongScorer) -> int:
+        if request.hand.num_kita > 0:
+            raise RuntimeError('no kita')
+        return score(request, scorer)
+    monkeypatch.setattr(ScoringRequest, 'score', fail_on_kita)
+
+    async def run() -> list[dict]:
+        async with ScoringServer(workers=1, use_threads=True, batch_size=8, batch_delay=0.05) as server:
+            await server.listen_tcp(port=0)
+            return await exchange_tcp(server, request_lines(8))
+
+    responses = asyncio.run(run())
+    assert [r['id'] for r in responses] == [*range(8)]
+    assert [r['error'] for r in responses if r['id'] % len(RECORDS) == 2] == ["Scoring failed: RuntimeError('no kita')"] * 2
+    assert all(r['points'] == expected_points(r['id']) for r in responses if r['id'] % len(RECORDS) != 2)
+
+def test_timeout():
+    async def run() -> list[dict]:
+        # batches are held back far longer than requests may wait
+        async with ScoringServer(workers=1, use_threads=True, batch_size=100, batch_delay=60, timeout=0.05) as server:
+            await server.listen_tcp(port=0)
+            return await exchange_tcp(server, request_lines(3))
+
+    responses = asyncio.run(run())
+    assert [r['id'] for r in responses] == [0, 1, 2]
+    assert all(r['points'] is None and r['error'] == 'timed out' for r in responses)
+
+@pytest.mark.parametrize('kwargs', [
+    dict(workers=0),
+    dict(batch_size=0),
+    dict(max_queued=0),
+    dict(timeout=0),
+])
+def test_invalid_settings(kwargs: dict):
+    with pytest.raises(ValueError):
+        ScoringServer(**kwargs)
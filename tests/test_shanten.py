@@ -0,0 +1,69 @@
+import pytest
+
+from mahjong import *
+from shanten import ShantenTable, chiitoitsu_shanten, kokushi_shanten, regular_shanten, shanten
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+# MARK: Regular
+@pytest.mark.parametrize('h, val', [
+    ('123m 456p 789s 111z 22z', -1),    # complete
+    ('22223333444455m', -1),            # complete
+    ('123m 456p 789s 111z 2z', 0),      # tanki wait
+    ('123m 456p 789s 11z 22z', 0),      # shanpon wait
+    ('123m 456p 78s 111z 22z', 0),      # ryanmen wait
+    ('13m 456p 789s 111z 22z', 0),      # kanchan wait
+    ('123m 456p 789s 1z 2z 3z 4z', 2),
+    ('159m 159p 159s 1234z', 8),
+    ('123m 456p 789s 2222z', 1),        # cannot wait on a fifth copy of 2z
+])
+def test_regular_shanten(h: str, val: int):
+    assert regular_shanten(hf.create_hand(h).closed_counts.counts) == val
+
+def test_regular_shanten_open_melds():
+    assert shanten(hf.create_hand('456p 111z 22z 123m-789s')) == -1
+    assert shanten(hf.create_hand('11z 22z 123m-456p-789s')) == 0
+    assert shanten(hf.create_hand('1z 123m-456p-789s-777z')) == 0
+
+# ---
+
+# MARK: Special forms
+@pytest.mark.parametrize('h, val', [
+    ('1133m 5577p 99s 1122z', -1),
+    ('1133m 5577p 99s 112z', 0),
+    ('1133m 5577p 99s 1123z', 0),
+    ('1111m 5577p 99s 112z', 2),        # four of a kind is only one pair
+])
+def test_chiitoitsu_shanten(h: str, val: int):
+    assert chiitoitsu_shanten(hf.create_hand(h).closed_counts.counts) == val
+
+@pytest.mark.parametrize('h, val', [
+    ('19m 19p 19s 12345677z', -1),
+    ('19m 19p 19s 1234567z', 0),
+    ('19m 19p 19s 1234566z', 0),
+    ('119m 19p 19s 123456z', 0),
+    ('123m 456p 789s 1122z', 8),
+])
+def test_kokushi_shanten(h: str, val: int):
+    assert kokushi_shanten(hf.create_hand(h).closed_counts.counts) == val
+
+def test_shanten_minimum_of_forms():
+    assert shanten(hf.create_hand('1133m 5577p 99s 112z')) == 0
+    assert shanten(hf.create_hand('19m 19p 19s 1234567z')) == 0
+    # special forms are not available with open melds
+    hand = hf.create_hand('1133m 557p 9s 123m-456p')
+    assert shanten(hand) == regular_shanten(hand.closed_counts.counts, 2) == 1
+
+def test_shanten_invalid_size():
+    with pytest.raises(ValueError):
+        _ = shanten(hf.create_hand('123m 456p'))
+
+def test_shanten_table_reuse():
+    table = ShantenTable()
+    hand = hf.create_hand('13m 456p 789s 111z 22z')
+    assert shanten(hand, table=table) == 0
+    num_entries = len(table)
+    assert shanten(hand, table=table) == 0
+    assert len(table) == num_entries
@@ -0,0 +1,81 @@
+import pytest
+
+from mahjong import *
+from simulator import Simulation, SimulationResult, create_simulation, dora_index, simulate
+from tile_counts import code_tile
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+def create(h: str, draws_left: int = 12, **kwargs) -> Simulation:
+    return create_simulation(hf.create_hand(h), draws_left=draws_left, round_wind=Wind.EAST, seat_wind=Wind.SOUTH, **kwargs)
+
+# MARK: Wall
+def test_wall_excludes_visible_tiles():
+    simulation = create('234m 456p 67s 22s 678s', discards=[tf.create_tile('5s'), tf.create_tile('0s')], melds=[mf.create_meld('888s', True)])
+    wall = [code_tile(c) for c in simulation.wall]
+
+    assert len(wall) == 136 - 13 - 2 - 3
+    assert wall.count(tf.create_tile('5s')) == 2
+    assert wall.count(tf.create_tile('0s')) == 0
+    assert wall.count(tf.create_tile('8s')) == 0
+    assert wall.count(tf.create_tile('0m')) == 1
+
+def test_wall_too_short():
+    with pytest.raises(ValueError):
+        create('234m 456p 67s 22s 678s', draws_left=200)
+    with pytest.raises(ValueError):
+        create('234m 456p 67s 22s 6789s')
+
+@pytest.mark.parametrize('indicator, dora', [
+    ('1m', '2m'),
+    ('9p', '1p'),
+    ('4z', '1z'),
+    ('7z', '5z'),
+])
+def test_dora_index(indicator: str, dora: str):
+    assert dora_index(tile_index(tf.create_tile(indicator))) == tile_index(tf.create_tile(dora))
+
+# MARK: Simulation
+def test_simulate_seeded():
+    simulation = create('234m 456p 69s 22s 678s')
+    first = simulate(simulation, samples=300, seed=17, batch_size=64)
+    assert first == simulate(simulation, samples=300, seed=17, batch_size=64)
+    assert first.num_samples == 300
+
+def test_simulate_workers_match():
+    simulation = create('19m 258p 3679s 1234z')
+    assert simulate(simulation, samples=200, seed=3, batch_size=50, workers=2) == simulate(simulation, samples=200, seed=3, batch_size=50)
+
+def test_simulate_riichi_tenpai():
+    # a riichi hand never changes its waits, and every win scores at least Riichi and Tsumo
+    result = simulate(create('234m 456p 67s 22s 678s', riichi=RiichiState.RIICHI), samples=500, seed=5)
+    assert result.tenpai_probability == 1.0
+    assert 0.3 < result.win_probability < 0.8
+    assert result.expected_points >= 0.3 * 1000
+
+def test_simulate_ura_dora():
+    # the hand holds no East, so only ura dora can raise the points of a win
+    plain = simulate(create('234m 456p 67s 22s 678s', riichi=RiichiState.RIICHI), samples=500, seed=5)
+    with_ura = simulate(create('234m 456p 67s 22s 678s', riichi=RiichiState.RIICHI, dora_indicators=[tf.create_tile('1z')]), samples=500, seed=5)
+    assert with_ura.total_points / with_ura.num_wins > 1.1 * plain.total_points / plain.num_wins
+
+def test_simulate_dead_wait():
+    # every 5m/8m is visible, and a riichi hand cannot change its wait
+    discards = [tf.create_tile(t) for t in ('5m', '5m', '5m', '0m', '8m')]
+    dora_indicators = [tf.create_tile('8m')] * 3
+    result = simulate(create('67m 456p 22s 678s 345s', riichi=RiichiState.RIICHI, discards=discards, dora_indicators=dora_indicators), samples=200, seed=1)
+    assert result.tenpai_probability == 1.0
+    assert result.win_probability == 0.0
+    assert result.expected_points == 0.0
+
+def test_simulate_no_draws():
+    assert simulate(create('234m 456p 67s 22s 678s', 0), samples=10) == SimulationResult(10, 10, 0, 0)
+    assert simulate(create('19m 258p 3679s 1234z', 0), samples=10) == SimulationResult(10, 0, 0, 0)
+
+def test_simulate_improves_hand():
+    # one away from tenpai with many draws left, the hand almost always reaches tenpai
+    result = simulate(create('234m 456p 19s 22s 678s', 18), samples=300, seed=2)
+    assert result.tenpai_probability > 0.9
+    assert result.num_wins > 0
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from mahjong import *
+from shanten import ShantenTable, shanten
+from symmetry import IDENTITY, TRANSFORMS, Transform, canonical_counts, canonical_hand
+from tile_counts import NUM_TILE_CODES, code_tile
+from waits import WaitTable, waits
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+scorer = RiichiMahjongScorer(MeldGenerator())
+
+def random_hands(seed: int, num_hands: int) -> list[Hand]:
+    rng = random.Random(seed)
+    wall = [tf.create_tile(f'{r}{s}') for s in 'mps' for r in range(1, 10) for _ in range(4)]
+    wall += [tf.create_tile(f'{r}z') for r in range(1, 8) for _ in range(4)]
+    return [Hand(rng.sample(wall, 13), []) for _ in range(num_hands)]
+
+# MARK: Transforms
+def test_transform_tiles():
+    t = Transform((2, 0, 1), True)
+    # man becomes sou, and ranks are mirrored
+    assert t.tile(tf.create_tile('1m')) == tf.create_tile('9s')
+    assert t.tile(tf.create_tile('0p')) == tf.create_tile('0m')
+    assert t.tile(tf.create_tile('3z')) == tf.create_tile('3z')
+    assert t.meld(mf.create_meld('123p', True)) == mf.create_meld('789m', True)
+
+@pytest.mark.parametrize('t', TRANSFORMS)
+def test_transform_inverse(t: Transform):
+    inverse = t.inverse()
+    for code in range(NUM_TILE_CODES):
+        assert inverse.code(t.code(code)) == code
+        assert inverse.tile(t.tile(code_tile(code))) == code_tile(code)
+
+def test_transforms():
+    assert len(set(TRANSFORMS)) == 12
+    assert IDENTITY.is_identity and not Transform((1, 0, 2)).is_identity
+    with pytest.raises(ValueError):
+        Transform((0, 0, 1))
+
+# ---
+
+# MARK: Canonical forms
+def test_canonical_counts():
+    for hand in random_hands(25, 50):
+        counts = hand.closed_counts.counts
+        image, transform = canonical_counts(counts)
+        assert image == min(t.counts(counts) for t in TRANSFORMS)
+        assert transform.counts(counts) == image
+
+@pytest.mark.parametrize('a, b', [
+    ('123m 456p 789s 1122z', '789m 123p 456s 1122z'),
+    ('13m 406p 789s 111z 22z', '79s 604m 123p 111z 22z'),
+    ('234m 0p 55p 123m-789s', '678s 055m 789s-123p'),
+])
+def test_canonical_hand(a: str, b: str):
+    ha, hb = hf.create_hand(a), hf.create_hand(b)
+    (ca, ta), (cb, tb) = canonical_hand(ha), canonical_hand(hb)
+    assert ca == cb
+    assert ta.hand(ha).freeze() == ca and tb.hand(hb).freeze() == cb
+    assert ta.inverse().hand(ca.to_hand()).freeze() == ha.freeze()
+    assert canonical_hand(ca) == (ca, IDENTITY)
+
+def test_canonical_hand_distinct():
+    # mirroring maps 1 to 9, never to 2 or 8
+    assert canonical_hand(hf.create_hand('1199m 1199p 1199s 1z'))[0] != canonical_hand(hf.create_hand('2288m 2288p 2288s 1z'))[0]
+    # honors are not permuted
+    assert canonical_hand(hf.create_hand('123m 1z'))[0] != canonical_hand(hf.create_hand('123m 2z'))[0]
+
+# ---
+
+# MARK: Invariants
+@pytest.mark.parametrize('t', TRANSFORMS)
+def test_shanten_waits_invariant(t: Transform):
+    for hand in random_hands(7, 20) + [hf.create_hand('1112345678999m'), hf.create_hand('12m 456p 789s 111z 22z')]:
+        image = t.hand(hand)
+        assert shanten(image) == shanten(hand)
+        assert waits(image) == sorted(map(t.tile, waits(hand)))
+
+def test_tables_share_mirrored_patterns():
+    shanten_table, wait_table = ShantenTable(), WaitTable(ShantenTable())
+    hand = hf.create_hand('12m 456p 789s 111z 22z')
+    assert waits(hand, table=wait_table) == [tf.create_tile('3m')]
+    assert shanten(hand, table=shanten_table) == 0
+    num_entries = len(shanten_table), len(wait_table)
+    # the mirror image only holds patterns whose mirror images are already stored
+    mirrored = Transform((0, 1, 2), True).hand(hand)
+    assert waits(mirrored, table=wait_table) == [tf.create_tile('7m')]
+    assert shanten(mirrored, table=shanten_table) == 0
+    assert (len(shanten_table), len(wait_table)) == num_entries
+
+def test_points_invariant():
+    kwargs = dict(
+        round_wind=Wind.EAST, seat_wind=Wind.SOUTH, win_type=WinType.RON,
+        riichi=RiichiState.RIICHI, under=UnderState.NONE, dora=[], ura_dora=[]
+    )
+    hand, tile = hf.create_hand('123m 123p 12s 789s 55z'), tf.create_tile('3s')
+    points = scorer.get_points(hand, tile, **kwargs)
+    for t in TRANSFORMS:
+        assert scorer.get_points(t.hand(hand), t.tile(tile), **kwargs) == points
+
+def test_all_green_not_invariant():
+    kwargs = dict(
+        round_wind=Wind.EAST, seat_wind=Wind.SOUTH, win_type=WinType.RON,
+        riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[]
+    )
+    hand, tile = hf.create_hand('223344s 666s 88s 66z'), tf.create_tile('6z')
+    assert SingleYakuman.ALL_GREEN in scorer.get_yakuman(hand, tile, win_type=WinType.RON)
+    t = Transform((0, 1, 2), True)
+    assert SingleYakuman.ALL_GREEN not in scorer.get_yakuman(t.hand(hand), t.tile(tile), win_type=WinType.RON)
+    assert scorer.get_points(t.hand(hand), t.tile(tile), **kwargs) < scorer.get_points(hand, tile, **kwargs)
@@ -0,0 +1,44 @@
+import pytest
+
+from mahjong import *
+from tile_counts import code_tile, index_tile
+
+tf = TileFactory()
+
+# MARK: Interning
+@pytest.mark.parametrize('raw', ['1m', '5m', '0m', '9p', '0s', '1z', '7z'])
+def test_tile_interned(raw: str):
+    assert tf.create_tile(raw) is tf.create_tile(raw)
+    assert tf.create_tile(raw) is TileFactory().create_tile(raw)
+
+def test_index_tile_interned():
+    assert index_tile(4) is tf.create_tile('5m')
+    assert index_tile(4, True) is tf.create_tile('0m')
+    assert code_tile(33) is tf.create_tile('7z')
+
+@pytest.mark.parametrize('raw', ['0z', '8z', '5x', 'm', '10m'])
+def test_tile_invalid(raw: str):
+    with pytest.raises(ValueError):
+        _ = tf.create_tile(raw)
+
+# MARK: Equality
+def test_tile_equality():
+    # constructed tiles are equal to, and hash like, the interned ones
+    assert SuitedTile(5, TileSuit.PIN) == tf.create_tile('5p')
+    assert hash(SuitedTile(5, TileSuit.PIN)) == hash(tf.create_tile('5p'))
+    assert HonorTile(Dragon.RED) == tf.create_tile('7z')
+    assert tf.create_tile('0p') != tf.create_tile('5p')
+    assert tf.create_tile('1z') != tf.create_tile('1m')
+    assert len({tf.create_tile(r) for r in ['5p', '5p', '0p', '7z']}) == 3
+
+def test_tile_immutable():
+    tile = tf.create_tile('5m')
+    with pytest.raises(AttributeError):
+        tile._rank = 6  # type: ignore
+
+# MARK: Ordering
+def test_tile_ordering():
+    tiles = [tf.create_tile(r) for r in ['7z', '1z', '9s', '1p', '5m', '0m', '1m']]
+    assert [str(t) for t in sorted(tiles)] == [str(tf.create_tile(r)) for r in ['1m', '5m', '0m', '1p', '9s', '1z', '7z']]
+    assert tf.create_tile('1m').sort_key == 0
+    assert tf.create_tile('7z').sort_key == 33
@@ -0,0 +1,87 @@
+import pytest
+
+from mahjong import *
+from tile_counts import NUM_TILE_KINDS, TileCounts, index_tile, tile_index
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+mg = MeldGenerator()
+
+# MARK: Index
+@pytest.mark.parametrize('t, index', [
+    ('1m', 0),
+    ('9m', 8),
+    ('1p', 9),
+    ('0p', 13),
+    ('9s', 26),
+    ('1z', 27),
+    ('4z', 30),
+    ('5z', 31),
+    ('7z', 33),
+])
+def test_tile_index(t: str, index: int):
+    assert tile_index(tf.create_tile(t)) == index
+
+def test_index_tile_roundtrip():
+    for i in range(NUM_TILE_KINDS):
+        assert tile_index(index_tile(i)) == i
+    assert index_tile(4, True) == tf.create_tile('0m')
+
+    with pytest.raises(ValueError):
+        _ = index_tile(NUM_TILE_KINDS)
+
+# ---
+
+# MARK: Counts
+def test_tile_counts_from_hand():
+    hand = hf.create_hand('50p 55z 444m-666z-777z')
+    counts = hand.counts
+
+    assert len(counts) == 13
+    assert counts[tile_index(tf.create_tile('5p'))] == 2
+    assert counts[tile_index(tf.create_tile('4m'))] == 3
+    assert counts[tile_index(tf.create_tile('5z'))] == 2
+    assert counts.red_fives.tolist() == [0, 1, 0]
+    assert len(hand.closed_counts) == 4
+
+def test_tile_counts_roundtrip():
+    hand = hf.create_hand('123m 406p 789s 1122z')
+    counts = TileCounts.from_tiles(hand.tiles)
+
+    assert sorted(counts.to_tiles(), key=str) == sorted(hand.tiles, key=str)
+    assert counts.to_dict() == hand.all_tiles_dict
+    assert TileCounts.from_tiles(counts.to_tiles()) == counts
+
+def test_tile_counts_add_remove():
+    counts = TileCounts()
+    counts.add(tf.create_tile('0s'))
+    counts.add(tf.create_tile('5s'))
+    counts.remove(tf.create_tile('0s'))
+
+    assert counts == TileCounts.from_tiles([tf.create_tile('5s')])
+    with pytest.raises(ValueError):
+        counts.remove(tf.create_tile('0s'))
+    with pytest.raises(ValueError):
+        counts.remove(tf.create_tile('1z'))
+
+# ---
+
+# MARK: MeldGenerator
+def test_yield_melds_from_counts():
+    hand = hf.create_hand('22223333444455m')
+    from_dict = [*mg.yield_melds_with_pair(hand.all_tiles_dict, [])]
+    from_counts = [*mg.yield_melds_with_pair_from_counts(hand.counts, [])]
+
+    assert from_dict == from_counts
+    assert len(from_counts) == 3
+
+def test_yield_melds_red_five():
+    # red fives stay on the first meld, then the pair, holding a five of their suit
+    hand = hf.create_hand('340m 05p')
+    assert [*mg.yield_melds_with_pair_from_counts(hand.counts, [])] == [
+        ([mf.create_meld('340m')], (tf.create_tile('0p'), tf.create_tile('5p'))),
+    ]
+    assert [*mg.yield_melds_with_pair(hand.all_tiles_dict, [])] == [*mg.yield_melds_with_pair_from_counts(hand.counts, [])]
+    assert [*mg.yield_melds(hf.create_hand('406m 555p').all_tiles_dict, [])] == [[mf.create_meld('406m'), mf.create_meld('555p')]]
+    assert [*mg.yield_melds(hf.create_hand('055m 456m').all_tiles_dict, [])] == [[mf.create_meld('406m'), mf.create_meld('555m')]]
@@ -0,0 +1,46 @@
+import pytest
+
+from mahjong import *
+from ukeire import ukeire
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+# MARK: Ukeire
+def test_ukeire_discards():
+    # discarding 9s leaves a 2m/5m wait; every other discard breaks a block
+    results = {str(r.discard): r for r in ukeire(hf.create_hand('34m 456p 789s 111z 22z 9s'))}
+
+    assert len(results) == 10
+    assert results[str(tf.create_tile('9s'))].shanten == 0
+    assert results[str(tf.create_tile('9s'))].accepted == {tf.create_tile('2m'): 4, tf.create_tile('5m'): 4}
+    assert results[str(tf.create_tile('1z'))].shanten == 1
+
+def test_ukeire_live_copies():
+    hand = hf.create_hand('34m 456p 789s 111z 22z 9s')
+    discards = [tf.create_tile('2m'), tf.create_tile('2m'), tf.create_tile('5m')]
+    dora_indicators = [tf.create_tile('5m')]
+    melds = [mf.create_meld('222m', True)]
+
+    results = {str(r.discard): r for r in ukeire(hand, discards=discards, dora_indicators=dora_indicators, melds=melds)}
+    best = results[str(tf.create_tile('9s'))]
+
+    # 2m: 4 - 2 discarded - 3 in another player's pon, clamped at 0; 5m: 4 - 1 discarded - 1 indicator
+    assert best.accepted == {tf.create_tile('2m'): 0, tf.create_tile('5m'): 2}
+    assert best.num_accepted == 2
+
+def test_ukeire_own_tiles_not_live():
+    # the hand holds three 2m, so only one copy of 2m can still be drawn
+    results = {str(r.discard): r for r in ukeire(hf.create_hand('222m 456p 789s 11z 22z 9s'))}
+    assert results[str(tf.create_tile('9s'))].accepted == {tf.create_tile('1z'): 2, tf.create_tile('2z'): 2}
+    assert results[str(tf.create_tile('2m'))].accepted[tf.create_tile('2m')] == 1
+
+def test_ukeire_special_forms():
+    results = {str(r.discard): r for r in ukeire(hf.create_hand('19m 19p 19s 1234567z 5m'))}
+    assert results[str(tf.create_tile('5m'))].shanten == 0
+    assert len(results[str(tf.create_tile('5m'))].accepted) == 13
+
+def test_ukeire_invalid_size():
+    with pytest.raises(ValueError):
+        _ = ukeire(hf.create_hand('34m 456p 789s 111z 22z'))
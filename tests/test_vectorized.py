@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from agari import DEFAULT_AGARI_INDEX
+from mahjong import *
+from shanten import counts_shanten
+from vectorized import agari, group_keys, shanten, tenpai
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+def counts_of(*hands: str) -> list[list[int]]:
+    return [[*hf.create_hand(h).closed_counts.counts] for h in hands]
+
+def random_counts(rng: random.Random, num_tiles: int) -> list[int]:
+    ret = [0] * NUM_TILE_KINDS
+    for i in rng.sample([i for i in range(NUM_TILE_KINDS) for _ in range(4)], num_tiles):
+        ret[i] += 1
+    return ret
+
+# MARK: Agari
+def test_agari():
+    counts = counts_of('123m 456p 789s 11z 222z', '11m 22p 33s 44z 55z 66z 77z', '19m 19p 19s 12345677z', '123m 456p 789s 11z 223z')
+    assert agari(counts).tolist() == [True, True, True, False]
+
+def test_agari_open_melds():
+    counts = counts_of('123m 456p 11z', '11m 22p 33s 44z 55z 66z 77z')
+    assert agari(counts, 2).tolist() == [True, False]
+    assert agari(counts, [2, 0]).tolist() == [True, True]
+    assert agari(counts, [0, 0]).tolist() == [False, True]
+
+def test_agari_matches_index():
+    rng = random.Random(18)
+    rows = [random_counts(rng, 14) for _ in range(2000)]
+    # random hands are rarely complete, so add some that are
+    for _ in range(200):
+        row = [0] * NUM_TILE_KINDS
+        for _ in range(4):
+            if rng.random() < 0.6:
+                start = rng.randrange(3) * 9 + rng.randrange(7)
+                indices = [start, start + 1, start + 2]
+            else:
+                indices = [rng.randrange(NUM_TILE_KINDS)] * 3
+            for i in indices:
+                row[i] += 1
+        row[rng.randrange(NUM_TILE_KINDS)] += 2
+        if max(row) <= 4:
+            rows.append(row)
+    expected = [bool(DEFAULT_AGARI_INDEX.forms(row)) for row in rows]
+    assert agari(np.array(rows, dtype=np.uint8)).tolist() == expected
+    assert any(expected)
+
+# MARK: Shanten
+@pytest.mark.parametrize('num_tiles, num_open_melds', [
+    (13, 0),
+    (14, 0),
+    (10, 1),
+    (7, 2),
+])
+def test_shanten_matches_scalar(num_tiles: int, num_open_melds: int):
+    rng = random.Random(num_tiles)
+    rows = [random_counts(rng, num_tiles) for _ in range(500)]
+    assert shanten(rows, num_open_melds).tolist() == [counts_shanten(row, num_open_melds) for row in rows]
+
+def test_tenpai():
+    counts = counts_of(
+        '123m 456p 789s 11z 22z', '123m 456p 789s 11z 23z', '19m 19p 19s 1234567z', '11m 22p 33s 44z 55z 66z 7z',
+        '123m 456p 789s 11z 222z',
+    )
+    assert tenpai(counts).tolist() == [True, False, True, True, True]
+    assert shanten(counts).tolist() == [0, 1, 0, 0, -1]
+
+# MARK: Input
+def test_group_keys():
+    counts = counts_of('123m 456p 789s 11z 222z')
+    assert group_keys(counts).tolist() == [[1 + 5 + 25, 5**3 + 5**4 + 5**5, 5**6 + 5**7 + 5**8, 2 + 3*5]]
+
+@pytest.mark.parametrize('counts', [
+    [[0] * 33],
+    [0] * 34,
+    [[5] + [0] * 33],
+])
+def test_invalid_counts(counts):
+    with pytest.raises(ValueError):
+        shanten(counts)
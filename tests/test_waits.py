@@ -0,0 +1,58 @@
+import pytest
+
+from mahjong import *
+from waits import WaitTable, waits
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+
+def tiles(raw: str) -> list[Tile]:
+    return [tf.create_tile(f'{r}{s[-1]}') for s in raw.split(' ') if s for r in s[:-1]]
+
+# MARK: Regular
+@pytest.mark.parametrize('h, w', [
+    ('123m 456p 789s 111z 2z', '2z'),               # tanki
+    ('123m 456p 789s 11z 22z', '1z 2z'),            # shanpon
+    ('123m 456p 78s 111z 22z', '6s 9s'),            # ryanmen
+    ('13m 456p 789s 111z 22z', '2m'),               # kanchan
+    ('12m 456p 789s 111z 22z', '3m'),               # penchan
+    ('1112345678999m', '123456789m'),               # 9 Gates
+    ('2223m 456p 789s 111z', '1m 3m 4m'),
+    ('123m 456p 789s 1z 2z 3z 4z', ''),             # not tenpai
+])
+def test_regular_waits(h: str, w: str):
+    assert waits(hf.create_hand(h)) == tiles(w)
+
+def test_waits_open_melds():
+    assert waits(hf.create_hand('45m 11z 123m-456p-789s')) == tiles('36m')
+    assert waits(hf.create_hand('1z 123m-456p-789s-777z')) == tiles('1z')
+    # the hand already holds every copy of 5m
+    assert waits(hf.create_hand('5m 123p-555m-456s-789s')) == []
+
+# ---
+
+# MARK: Special forms
+@pytest.mark.parametrize('h, w', [
+    ('1133m 5577p 99s 112z', '2z'),
+    ('19m 19p 19s 1234566z', '7z'),
+    ('19m 19p 19s 1234567z', '19m 19p 19s 1234567z'),   # 13-wait
+])
+def test_special_waits(h: str, w: str):
+    assert waits(hf.create_hand(h)) == tiles(w)
+
+def test_chiitoitsu_and_regular_waits():
+    # 7 Pairs tanki on 7p overlaps the regular 4p/7p wait
+    assert waits(hf.create_hand('22334455m 5566p 7p')) == tiles('47p')
+
+def test_waits_invalid_size():
+    with pytest.raises(ValueError):
+        _ = waits(hf.create_hand('123m 456p 789s 111z 22z'))
+
+def test_wait_table_reuse():
+    table = WaitTable()
+    hand = hf.create_hand('13m 456p 789s 111z 22z')
+    assert waits(hand, table=table) == tiles('2m')
+    num_entries = len(table)
+    assert waits(hand, table=table) == tiles('2m')
+    assert len(table) == num_entries
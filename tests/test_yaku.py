@@ -0,0 +1,108 @@
+import pytest
+
+from mahjong import *
+
+tf = TileFactory()
+mf = MeldFactory(tf)
+hf = HandFactory(tf, mf)
+mg = MeldGenerator()
+scorer = RiichiMahjongScorer(mg)
+
+def get_yaku(h: str, t: str, win_type: WinType = WinType.RON, *, seat_wind: Wind = Wind.SOUTH, round_wind: Wind = Wind.EAST, under: UnderState = UnderState.NONE) -> dict[str, tuple[int, int]]:
+    return scorer.get_yaku(
+        hf.create_hand(h), tf.create_tile(t),
+        round_wind=round_wind, seat_wind=seat_wind,
+        win_type=win_type, riichi=RiichiState.NONE, under=under,
+        dora=[], ura_dora=[]
+    )
+
+# MARK: Yaku
+@pytest.mark.parametrize('h, t, win_type, yaku', [
+    ('234m 456p 67s 22s 678s', '8s', WinType.RON, {
+        Yaku.ALL_SIMPLES: (1, 0), Yaku.PINFU: (1, 0), Yaku.PURE_DOUBLE_SEQUENCE: (1, 0), '30 Fu': (0, 30),
+    }),
+    ('234m 456p 68s 22s 678s', '7s', WinType.RON, {
+        Yaku.ALL_SIMPLES: (1, 0), Yaku.PURE_DOUBLE_SEQUENCE: (1, 0), '40 Fu': (0, 40),
+    }),
+    ('123456789m 123p 1z', '1z', WinType.RON, {
+        Yaku.PURE_STRAIGHT: (2, 0), '40 Fu': (0, 40),
+    }),
+    ('112233m 445566p 7s', '7s', WinType.RON, {
+        Yaku.TWICE_PURE_DOUBLE_SEQUENCE: (3, 0), '40 Fu': (0, 40),
+    }),
+    ('11m 22p 33s 44z 55z 66z 7z', '7z', WinType.RON, {
+        Yaku.SEVEN_PAIRS: (2, 0), '25 Fu': (0, 25),
+    }),
+    ('123m 123p 123s 999m 1z', '1z', WinType.RON, {
+        Yaku.MIXED_TRIPLE_SEQUENCE: (2, 0), Yaku.HALF_OUTSIDE_HAND: (2, 0), '50 Fu': (0, 50),
+    }),
+    ('123m 123p 123s 999m 1s', '1s', WinType.RON, {
+        Yaku.MIXED_TRIPLE_SEQUENCE: (2, 0), Yaku.FULLY_OUTSIDE_HAND: (3, 0), '40 Fu': (0, 40),
+    }),
+    ('11123456789m 11z', '1z', WinType.RON, {
+        Yaku.ROUND_WIND: (1, 0), Yaku.PURE_STRAIGHT: (2, 0), Yaku.HALF_FLUSH: (3, 0), '40 Fu': (0, 40),
+    }),
+    ('123456789p 789p 5p', '5p', WinType.TSUMO, {
+        WinType.TSUMO: (1, 0), Yaku.PURE_DOUBLE_SEQUENCE: (1, 0), Yaku.PURE_STRAIGHT: (2, 0), Yaku.FULL_FLUSH: (6, 0), '30 Fu': (0, 30),
+    }),
+])
+def test_yaku(h: str, t: str, win_type: WinType, yaku: dict[str, tuple[int, int]]):
+    assert get_yaku(h, t, win_type) == yaku
+
+def test_yaku_ron_triplet_not_concealed():
+    # the triplet completed by ron counts as open, leaving three concealed triplets
+    assert get_yaku('111m 999p 11s 555z 66z', '6z') == {
+        Yaku.WHITE_DRAGON: (1, 0), Yaku.GREEN_DRAGON: (1, 0), Yaku.ALL_TRIPLETS: (2, 0),
+        Yaku.THREE_CONCEALED_TRIPLETS: (2, 0), Yaku.ALL_TERMINALS_AND_HONORS: (2, 0), '60 Fu': (0, 60),
+    }
+
+def test_yaku_little_three_dragons():
+    assert get_yaku('234m 456p 555z 666z 7z', '7z') == {
+        Yaku.WHITE_DRAGON: (1, 0), Yaku.GREEN_DRAGON: (1, 0), Yaku.LITTLE_THREE_DRAGONS: (2, 0), '50 Fu': (0, 50),
+    }
+
+def test_yaku_highest_interpretation():
+    # 222333444m can be three triplets or three identical sequences
+    assert get_yaku('222333444m 678p 5s', '5s', WinType.TSUMO) == {
+        WinType.TSUMO: (1, 0), Yaku.ALL_SIMPLES: (1, 0), Yaku.THREE_CONCEALED_TRIPLETS: (2, 0), '40 Fu': (0, 40),
+    }
+
+# MARK: Open
+def test_yaku_open_hand():
+    # closed-only yaku are dropped and some yaku lose a han; closed, this would also be Pinfu and Pure Double Sequence
+    hand = Hand(hf.create_hand('223344m 67s 88s').tiles, [mf.create_meld('456p', True)])
+    yaku = scorer.get_yaku(
+        hand, tf.create_tile('5s'), round_wind=Wind.EAST, seat_wind=Wind.SOUTH,
+        win_type=WinType.RON, riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[]
+    )
+    assert Yaku.PINFU not in yaku and Yaku.PURE_DOUBLE_SEQUENCE not in yaku
+    assert yaku == {Yaku.ALL_SIMPLES: (1, 0), '30 Fu': (0, 30)}
+    assert get_yaku('223344m 67s 88s 456p', '5s') == {
+        Yaku.ALL_SIMPLES: (1, 0), Yaku.PINFU: (1, 0), Yaku.PURE_DOUBLE_SEQUENCE: (1, 0), '30 Fu': (0, 30),
+    }
+    assert get_yaku('456m 11z 55z 123m-789m', '5z') == {
+        Yaku.WHITE_DRAGON: (1, 0), Yaku.PURE_STRAIGHT: (1, 0), Yaku.HALF_FLUSH: (2, 0), '30 Fu': (0, 30),
+    }
+    assert get_yaku('234m 66s 22s 456p-567s', '2s', WinType.TSUMO) == {Yaku.ALL_SIMPLES: (1, 0), '30 Fu': (0, 30)}
+
+# MARK: Situational
+def test_yaku_under_the_sea():
+    assert get_yaku('123456789m 123p 1z', '1z', WinType.TSUMO, under=UnderState.UNDER_THE_SEA) == {
+        WinType.TSUMO: (1, 0), UnderState.UNDER_THE_SEA: (1, 0), Yaku.PURE_STRAIGHT: (2, 0), '30 Fu': (0, 30),
+    }
+    assert get_yaku('123456789m 123p 1z', '1z', WinType.RON, under=UnderState.UNDER_THE_SEA) == {Yaku.PURE_STRAIGHT: (2, 0), '40 Fu': (0, 40)}
+
+# MARK: No yaku
+@pytest.mark.parametrize('h, t, num_kita, dora', [
+    ('234m 567p 5s 123m-789s', '5s', 0, ['1m']),      # dora only
+    ('234m 567p 5s 123m-789s', '0s', 0, []),          # red dora only
+    ('234m 567p 5s 123m-789s', '5s', 2, []),          # kita only
+])
+def test_dora_without_yaku(h: str, t: str, num_kita: int, dora: list[str]):
+    kwargs = dict(
+        round_wind=Wind.EAST, seat_wind=Wind.SOUTH, win_type=WinType.RON,
+        riichi=RiichiState.NONE, under=UnderState.NONE, dora=[tf.create_tile(d) for d in dora], ura_dora=[]
+    )
+    hand, tile = hf.create_hand(h, num_kita), tf.create_tile(t)
+    assert scorer.get_yaku(hand, tile, **kwargs) == {}
+    assert scorer.get_points(hand, tile, **kwargs) == 0
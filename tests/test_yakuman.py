@@ -8,6 +8,14 @@ hf = HandFactory(tf, mf)
 mg = MeldGenerator()
 scorer = RiichiMahjongScorer(mg)
 
+def with_kans(h: str, *kans: str, is_open: bool = False) -> Hand:
+    hand = hf.create_hand(h)
+    return Hand(hand.tiles, [*hand.open_melds, *(mf.create_meld(k, is_open) for k in kans)])
+
+def with_pon(h: str, pon: str) -> Hand:
+    hand = hf.create_hand(h)
+    return Hand(hand.tiles, [*hand.open_melds, mf.create_meld(pon, True)])
+
 # MARK: 13o
 # 13 Orphans (+ 13-wait)
 @pytest.mark.parametrize('h, t, win_type, yakuman', [
@@ -65,7 +73,6 @@ def test_13o_wrong(h: str, t: str, win_type: WinType, yakuman: dict[Yakuman, int
     ('11122m 444666p 99s', '9s', WinType.TSUMO, {
         SingleYakuman.FOUR_CONCEALED_TRIPLETS: 1
     }),
-    # TODO: add tests with closed kan
 ])
 def test_4ct(h: str, t: str, win_type: WinType, yakuman: dict[Yakuman, int]):
     assert scorer.get_yakuman(hf.create_hand(h), tf.create_tile(t), win_type=win_type) == yakuman
@@ -77,7 +84,6 @@ def test_4ct(h: str, t: str, win_type: WinType, yakuman: dict[Yakuman, int]):
     ('333444666p 444s 1z', '1z', WinType.RON, {
         DoubleYakuman.FOUR_CONCEALED_TRIPLETS_TANKI: 2
     }),
-    # TODO: add tests with closed kan
 ])
 def test_4ct_tanki(h: str, t: str, win_type: WinType, yakuman: dict[Yakuman, int]):
     assert scorer.get_yakuman(hf.create_hand(h), tf.create_tile(t), win_type=win_type) == yakuman
@@ -92,10 +98,117 @@ def test_4ct_wrong(h: str, t: str, win_type: WinType, yakuman: dict[Yakuman, int
 
 # ---
 
-# TODO combine yakuman
-"""
+# closed kans count as concealed triplets, open kans and pons do not
+@pytest.mark.parametrize('hand, t, win_type, yakuman', [
+    (with_kans('222m 444s 2233z', '1111p'), '2z', WinType.TSUMO, {
+        SingleYakuman.FOUR_CONCEALED_TRIPLETS: 1
+    }),
+    (with_kans('222m 444s 2233z', '1111p'), '2z', WinType.RON, {}),
+    (with_kans('222m 444s 3332z', '1111p'), '2z', WinType.RON, {
+        DoubleYakuman.FOUR_CONCEALED_TRIPLETS_TANKI: 2
+    }),
+    (with_kans('222m 444s 3332z', '1111p', is_open=True), '2z', WinType.TSUMO, {}),
+    (with_pon('222m 444s 3332z', '111p'), '2z', WinType.TSUMO, {}),
+])
+def test_4ct_kans(hand: Hand, t: str, win_type: WinType, yakuman: dict[Yakuman, int]):
+    assert scorer.get_yakuman(hand, tf.create_tile(t), win_type=win_type) == yakuman
+
+# ---
+
+# MARK: Honors
+@pytest.mark.parametrize('hand, t, yakuman', [
+    # Big Three Dragons
+    (hf.create_hand('555666777z 123m 4m'), '4m', {SingleYakuman.BIG_THREE_DRAGONS: 1}),
+    (with_pon('666777z 123m 4m', '555z'), '4m', {SingleYakuman.BIG_THREE_DRAGONS: 1}),
+    (with_kans('666777z 123m 4m', '5555z'), '4m', {SingleYakuman.BIG_THREE_DRAGONS: 1}),
+    # Little Three Dragons is not a yakuman
+    (hf.create_hand('555666z 7z 123m 456p'), '7z', {}),
+    (hf.create_hand('555666z 77z 123m 45p'), '6p', {}),
+    # Four Big Winds / Four Little Winds
+    (with_pon('111222333z 5m', '444z'), '5m', {DoubleYakuman.FOUR_BIG_WINDS: 2}),
+    (with_pon('222333z 444z 5m', '111z'), '5m', {DoubleYakuman.FOUR_BIG_WINDS: 2}),
+    (hf.create_hand('111222333z 4z 123m'), '4z', {SingleYakuman.FOUR_LITTLE_WINDS: 1}),
+    (hf.create_hand('111222z 4z 123m 567p'), '4z', {}),
+    # All Honors, including 7 Pairs
+    (with_pon('111222555z 7z', '666z'), '7z', {SingleYakuman.ALL_HONORS: 1}),
+    (hf.create_hand('1122334455667z'), '7z', {SingleYakuman.ALL_HONORS: 1}),
+])
+def test_honors(hand: Hand, t: str, yakuman: dict[Yakuman, int]):
+    assert scorer.get_yakuman(hand, tf.create_tile(t), win_type=WinType.RON) == yakuman
+
+# ---
+
+# MARK: Tiles
+@pytest.mark.parametrize('hand, t, yakuman', [
+    # All Terminals
+    (with_pon('111999m 111p 1s', '999s'), '1s', {SingleYakuman.ALL_TERMINALS: 1}),
+    (with_pon('111999m 111p 1z', '999s'), '1z', {}),
+    # All Green, with or without the green dragon
+    (hf.create_hand('22334466688s 66z'), '8s', {SingleYakuman.ALL_GREEN: 1}),
+    (hf.create_hand('2233444466688s'), '8s', {SingleYakuman.ALL_GREEN: 1}),
+    (hf.create_hand('22334466688s 55z'), '8s', {}),
+    (hf.create_hand('22334466678s 66z'), '8s', {}),
+])
+def test_tiles(hand: Hand, t: str, yakuman: dict[Yakuman, int]):
+    assert scorer.get_yakuman(hand, tf.create_tile(t), win_type=WinType.RON) == yakuman
+
+# ---
+
+# MARK: Nine Gates
+@pytest.mark.parametrize('h, t, yakuman', [
+    ('1112345678999m', '5m', {DoubleYakuman.TRUE_NINE_GATES: 2}),
+    ('1112345678999p', '1p', {DoubleYakuman.TRUE_NINE_GATES: 2}),
+    ('1112345678999s', '9s', {DoubleYakuman.TRUE_NINE_GATES: 2}),
+    ('1112345678899m', '9m', {SingleYakuman.NINE_GATES: 1}),
+    ('1122345678999p', '1p', {SingleYakuman.NINE_GATES: 1}),
+    ('1112345678999m', '1p', {}),
+    ('1112345678889m', '9m', {}),
+])
+def test_nine_gates(h: str, t: str, yakuman: dict[Yakuman, int]):
+    assert scorer.get_yakuman(hf.create_hand(h), tf.create_tile(t), win_type=WinType.TSUMO) == yakuman
+
+def test_nine_gates_open():
+    assert scorer.get_yakuman(with_pon('1112345678m 99m', '999m'), tf.create_tile('9m'), win_type=WinType.TSUMO) == {}
+
+# ---
+
+# MARK: Four Kans
+@pytest.mark.parametrize('hand, yakuman', [
+    (Hand([tf.create_tile('1z')], [mf.create_meld('1111m', False), mf.create_meld('2222p', True), mf.create_meld('3333s', False), mf.create_meld('5555z', False)]), {
+        SingleYakuman.FOUR_KANS: 1
+    }),
+    (Hand([tf.create_tile('1z')], [mf.create_meld('1111m', False), mf.create_meld('2222p', False), mf.create_meld('3333s', False), mf.create_meld('5555z', False)]), {
+        SingleYakuman.FOUR_KANS: 1, DoubleYakuman.FOUR_CONCEALED_TRIPLETS_TANKI: 2
+    }),
+    (Hand([*hf.create_hand('1z 22s').tiles, tf.create_tile('2s')], [mf.create_meld('1111m', False), mf.create_meld('2222p', True), mf.create_meld('3333s', False)]), {}),
+])
+def test_four_kans(hand: Hand, yakuman: dict[Yakuman, int]):
+    assert scorer.get_yakuman(hand, tf.create_tile('1z'), win_type=WinType.RON) == yakuman
+
+# ---
+
+# MARK: Combined
 @pytest.mark.parametrize('h, t, win_type, yakuman', [
+    ('111555666777z 2z', '2z', WinType.RON, {
+        SingleYakuman.ALL_HONORS: 1, SingleYakuman.BIG_THREE_DRAGONS: 1, DoubleYakuman.FOUR_CONCEALED_TRIPLETS_TANKI: 2
+    }),
+    ('111222333444z 5z', '5z', WinType.TSUMO, {
+        SingleYakuman.ALL_HONORS: 1, DoubleYakuman.FOUR_BIG_WINDS: 2, DoubleYakuman.FOUR_CONCEALED_TRIPLETS_TANKI: 2
+    }),
+    ('222444666s 888s 6z', '6z', WinType.TSUMO, {
+        SingleYakuman.ALL_GREEN: 1, DoubleYakuman.FOUR_CONCEALED_TRIPLETS_TANKI: 2
+    }),
+    ('111999m 111p 99s 11z', '9s', WinType.TSUMO, {
+        SingleYakuman.FOUR_CONCEALED_TRIPLETS: 1
+    }),
+    ('111999m 111p 99s 11s', '9s', WinType.TSUMO, {
+        SingleYakuman.ALL_TERMINALS: 1, SingleYakuman.FOUR_CONCEALED_TRIPLETS: 1
+    }),
 ])
-def test_combo_yakuman(h: str, t: str, win_type: WinType, yakuman: dict[Yakuman, int]):
-    pass
-"""
\ No newline at end of file
+def test_combined(h: str, t: str, win_type: WinType, yakuman: dict[Yakuman, int]):
+    assert scorer.get_yakuman(hf.create_hand(h), tf.create_tile(t), win_type=win_type) == yakuman
+
+def test_points():
+    kwargs = dict(round_wind=Wind.EAST, seat_wind=Wind.SOUTH, riichi=RiichiState.NONE, under=UnderState.NONE, dora=[], ura_dora=[])
+    assert scorer.get_points(hf.create_hand('111555666777z 2z'), tf.create_tile('2z'), win_type=WinType.RON, **kwargs) == 4 * 8000
+    assert scorer.get_points(with_pon('666777z 123m 4m', '555z'), tf.create_tile('4m'), win_type=WinType.RON, **kwargs) == 8000
@@ -1,31 +1,43 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import total_ordering
 
 from tile_enums import TileSuit, Wind, Dragon
 
 # ---
 
-@dataclass
+# tiles are immutable, so TileFactory hands out one shared instance per distinct tile; the sort key is
+# the tile's 0-33 index (man, pin, sou, winds, dragons), so ordering never needs to inspect suits/symbols
+
+@dataclass(frozen=True, slots=True, eq=False)
 @total_ordering
 class SuitedTile:
     _rank: int
     _suit: TileSuit
     _red_dora: bool = False
+    _sort_key: int = field(init=False, repr=False)
+    _hash: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_sort_key', self._suit.value + self._rank - 1)
+        object.__setattr__(self, '_hash', hash(('SuitedTile', self._rank, self._suit, self._red_dora)))
 
     def __hash__(self) -> int:
-        return hash((__class__.__name__, self._rank, self._suit, self._red_dora))
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if type(other) is SuitedTile:
+            return self._sort_key == other._sort_key and self._red_dora == other._red_dora
+        return NotImplemented
 
     def __str__(self) -> str:
         return f'({self._rank}{'R' if self._red_dora else ''},{self._suit})'
 
     def __lt__(self, other: object) -> bool:
-        match other:
-            case SuitedTile(_rank=rank, _suit=suit):
-                return (self._suit, self._rank) < (suit, rank)
-            case HonorTile():
-                return True
-            case _:
-                raise TypeError
+        if type(other) is SuitedTile or type(other) is HonorTile:
+            return self._sort_key < other._sort_key
+        raise TypeError
 
     @property
     def rank(self) -> int:
@@ -39,70 +51,86 @@ class SuitedTile:
     def red_dora(self) -> bool:
         return self._red_dora
 
+    @property
+    def sort_key(self) -> int:
+        return self._sort_key
+
     @property
     def is_terminal(self) -> bool:
         return self._rank == 1 or self._rank == 9
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 @total_ordering
 class HonorTile:
     _symbol: Wind | Dragon
+    _sort_key: int = field(init=False, repr=False)
+    _hash: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # winds (1-4) come before dragons (5-7), after the 27 suited tiles
+        object.__setattr__(self, '_sort_key', 26 + self._symbol.value)
+        object.__setattr__(self, '_hash', hash(('HonorTile', self._symbol)))
 
     def __hash__(self) -> int:
-        return hash((__class__.__name__, self._symbol))
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if type(other) is HonorTile:
+            return self._sort_key == other._sort_key
+        return NotImplemented
 
     def __str__(self) -> str:
         return f'({self._symbol})'
 
     def __lt__(self, other: object) -> bool:
-        match other:
-            case SuitedTile():
-                return False
-            case HonorTile(_symbol=symbol):
-                return self._symbol < symbol
-            case _:
-                raise TypeError
+        if type(other) is SuitedTile or type(other) is HonorTile:
+            return self._sort_key < other._sort_key
+        raise TypeError
+
+    @property
+    def symbol(self) -> Wind | Dragon:
+        return self._symbol
+
+    @property
+    def sort_key(self) -> int:
+        return self._sort_key
 
 Tile = SuitedTile | HonorTile
 
 # ---
 
+def _create_interned_tiles() -> dict[str, Tile]:
+    ret: dict[str, Tile] = {}
+    for suit, suit_char in ((TileSuit.MAN, 'm'), (TileSuit.PIN, 'p'), (TileSuit.SOU, 's')):
+        for rank in range(1, 10):
+            ret[f'{rank}{suit_char}'] = SuitedTile(rank, suit)
+        ret[f'0{suit_char}'] = SuitedTile(5, suit, True)
+    for symbol in (*Wind, *Dragon):
+        ret[f'{symbol.value}z'] = HonorTile(symbol)
+    return ret
+
+# all 37 distinct tiles (34 kinds + 3 red fives), keyed by their raw string
+INTERNED_TILES: dict[str, Tile] = _create_interned_tiles()
+
 class TileFactory:
     def create_tile(self, raw: str) -> Tile:
+        # every valid tile string is interned, so anything else is an error
+        tile = INTERNED_TILES.get(raw)
+        if tile is None:
+            raise ValueError(self._parse_error(raw))
+        return tile
+
+    def _parse_error(self, raw: str) -> str:
         if len(raw) != 2:
-            raise ValueError(f'Raw string "{raw}" passed to TileFactory is not of length 2.')
-        else:
-            if not raw[0].isdigit():
-                raise ValueError(f'Raw string "{raw}" passed to TileFactory does not have a numerical rank.')
-            match raw[0], raw[1]:
-                case n, 'm':
-                    rank = int(n)
-                    red_dora = False
-                    if rank == 0:
-                        rank = 5
-                        red_dora = True
-                    return SuitedTile(rank, TileSuit.MAN, red_dora)
-                case n, 'p':
-                    rank = int(n)
-                    red_dora = False
-                    if rank == 0:
-                        rank = 5
-                        red_dora = True
-                    return SuitedTile(rank, TileSuit.PIN, red_dora)
-                case n, 's':
-                    rank = int(n)
-                    red_dora = False
-                    if rank == 0:
-                        rank = 5
-                        red_dora = True
-                    return SuitedTile(rank, TileSuit.SOU, red_dora)
-                case n, 'z':
-                    for w in Wind:
-                        if w.value == int(n):
-                            return HonorTile(w)
-                    for d in Dragon:
-                        if d.value == int(n):
-                            return HonorTile(d)
-                    raise ValueError('Invalid honor tile passed to TileFactory')
-                case _:
-                    raise ValueError('Invalid tile kind passed to TileFactory')
\ No newline at end of file
+            return f'Raw string "{raw}" passed to TileFactory is not of length 2.'
+        if not raw[0].isdigit():
+            return f'Raw string "{raw}" passed to TileFactory does not have a numerical rank.'
+        match raw[1]:
+            case 'm' | 'p' | 's':
+                return 'Invalid suited tile passed to TileFactory'
+            case 'z':
+                return 'Invalid honor tile passed to TileFactory'
+            case _:
+                return 'Invalid tile kind passed to TileFactory'
\ No newline at end of file
@@ -0,0 +1,172 @@
+from array import array
+from collections.abc import Iterable, Iterator
+
+from tile import INTERNED_TILES, SuitedTile, Tile
+from tile_enums import Dragon, TileSuit, Wind
+
+# ---
+
+NUM_TILE_KINDS = 34
+NUM_SUITED_KINDS = 27
+RANKS_PER_SUIT = 9
+RED_FIVE_RANK = 5
+
+SUITS: tuple[TileSuit, ...] = tuple(TileSuit)
+HONOR_SYMBOLS: tuple[Wind | Dragon, ...] = (*Wind, *Dragon)
+
+# indices of all terminal and honor tiles (1m 9m 1p 9p 1s 9s 1z-7z)
+TERMINAL_HONOR_INDICES: tuple[int, ...] = (
+    *(s.value + r - 1 for s in SUITS for r in (1, 9)),
+    *range(NUM_SUITED_KINDS, NUM_TILE_KINDS),
+)
+
+# (first tile index, number of tile kinds) of man, pin, sou and the honors
+SUIT_GROUPS: tuple[tuple[int, int], ...] = ((0, 9), (9, 9), (18, 9), (NUM_SUITED_KINDS, NUM_TILE_KINDS - NUM_SUITED_KINDS))
+
+def group_index(index: int) -> int:
+    # position in SUIT_GROUPS of the group holding the tile index
+    return index // RANKS_PER_SUIT if index < NUM_SUITED_KINDS else len(SUIT_GROUPS) - 1
+
+def tile_index(tile: Tile) -> int:
+    try:
+        return tile.sort_key
+    except AttributeError:
+        raise TypeError(f'Cannot compute tile index of {tile!r}.') from None
+
+# interned plain tiles by index, and red fives by suit
+_INDEX_TILES: tuple[Tile, ...] = tuple(INTERNED_TILES[f'{i % RANKS_PER_SUIT + 1}{'mps'[i // RANKS_PER_SUIT]}'] for i in range(NUM_SUITED_KINDS)) + \
+    tuple(INTERNED_TILES[f'{s.value}z'] for s in HONOR_SYMBOLS)
+_RED_FIVE_TILES: tuple[Tile, ...] = tuple(INTERNED_TILES[f'0{c}'] for c in 'mps')
+
+def index_tile(index: int, red_dora: bool = False) -> Tile:
+    if not 0 <= index < NUM_TILE_KINDS:
+        raise ValueError(f'Tile index {index} is out of range.')
+    if red_dora:
+        if index >= NUM_SUITED_KINDS or index % RANKS_PER_SUIT != RED_FIVE_RANK - 1:
+            raise ValueError(f'Tile index {index} cannot be a red five.')
+        return _RED_FIVE_TILES[index // RANKS_PER_SUIT]
+    return _INDEX_TILES[index]
+
+# compact tile codes: 0-33 are the tile indices, 34-36 the red fives of man/pin/sou
+NUM_TILE_CODES = NUM_TILE_KINDS + len(SUITS)
+
+def tile_code(tile: Tile) -> int:
+    if type(tile) is SuitedTile and tile.red_dora:
+        return NUM_TILE_KINDS + tile.suit.value // RANKS_PER_SUIT
+    return tile_index(tile)
+
+def code_tile(code: int) -> Tile:
+    if NUM_TILE_KINDS <= code < NUM_TILE_CODES:
+        return index_tile((code - NUM_TILE_KINDS) * RANKS_PER_SUIT + RED_FIVE_RANK - 1, True)
+    return index_tile(code)
+
+# ---
+
+class TileCounts:
+    # 34 per-kind counts (red fives are counted under their plain rank) plus the number of red fives per suit
+    __slots__ = ('_counts', '_red_fives')
+
+    _counts: array
+    _red_fives: array
+
+    def __init__(self, counts: Iterable[int] | None = None, red_fives: Iterable[int] | None = None):
+        self._counts = array('B', bytes(NUM_TILE_KINDS) if counts is None else counts)
+        self._red_fives = array('B', bytes(len(SUITS)) if red_fives is None else red_fives)
+
+        if len(self._counts) != NUM_TILE_KINDS:
+            raise ValueError(f'TileCounts requires exactly {NUM_TILE_KINDS} counts.')
+        if len(self._red_fives) != len(SUITS):
+            raise ValueError(f'TileCounts requires exactly {len(SUITS)} red five counts.')
+
+    @classmethod
+    def from_tiles(cls, tiles: Iterable[Tile]) -> 'TileCounts':
+        ret = cls()
+        for t in tiles:
+            ret.add(t)
+        return ret
+
+    @classmethod
+    def from_codes(cls, codes: Iterable[int]) -> 'TileCounts':
+        counts = bytearray(NUM_TILE_KINDS)
+        red_fives = bytearray(len(SUITS))
+        for c in codes:
+            if c >= NUM_TILE_KINDS:
+                red_fives[c - NUM_TILE_KINDS] += 1
+                c = (c - NUM_TILE_KINDS) * RANKS_PER_SUIT + RED_FIVE_RANK - 1
+            counts[c] += 1
+        return cls(counts, red_fives)
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def __getitem__(self, index: int) -> int:
+        return self._counts[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._counts)
+
+    def __eq__(self, other: object) -> bool:
+        match other:
+            case TileCounts():
+                return self._counts == other._counts and self._red_fives == other._red_fives
+            case _:
+                return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f'TileCounts({self._counts.tolist()}, red_fives={self._red_fives.tolist()})'
+
+    @property
+    def counts(self) -> array:
+        return self._counts
+
+    @property
+    def red_fives(self) -> array:
+        return self._red_fives
+
+    @property
+    def num_red_fives(self) -> int:
+        return sum(self._red_fives)
+
+    def copy(self) -> 'TileCounts':
+        return TileCounts(self._counts, self._red_fives)
+
+    def suit_counts(self, suit: TileSuit) -> array:
+        return self._counts[suit.value:suit.value + RANKS_PER_SUIT]
+
+    def honor_counts(self) -> array:
+        return self._counts[NUM_SUITED_KINDS:]
+
+    def add(self, tile: Tile) -> None:
+        self._counts[tile_index(tile)] += 1
+        if type(tile) is SuitedTile and tile.red_dora:
+            self._red_fives[tile.suit.value // RANKS_PER_SUIT] += 1
+
+    def remove(self, tile: Tile) -> None:
+        index = tile_index(tile)
+        if self._counts[index] == 0:
+            raise ValueError(f'Cannot remove {tile} from TileCounts; no copies left.')
+        if type(tile) is SuitedTile and tile.red_dora:
+            if self._red_fives[tile.suit.value // RANKS_PER_SUIT] == 0:
+                raise ValueError(f'Cannot remove {tile} from TileCounts; no red fives left.')
+            self._red_fives[tile.suit.value // RANKS_PER_SUIT] -= 1
+        self._counts[index] -= 1
+
+    def to_tiles(self) -> list[Tile]:
+        ret: list[Tile] = []
+        for i, c in enumerate(self._counts):
+            if c == 0:
+                continue
+            num_red = 0
+            if i < NUM_SUITED_KINDS and i % RANKS_PER_SUIT == RED_FIVE_RANK - 1:
+                num_red = self._red_fives[i // RANKS_PER_SUIT]
+            for j in range(c):
+                ret.append(index_tile(i, j < num_red))
+        return ret
+
+    def to_dict(self) -> dict[Tile, int]:
+        ret: dict[Tile, int] = {}
+        for t in self.to_tiles():
+            ret[t] = ret.get(t, 0) + 1
+        return ret
@@ -0,0 +1,144 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import chain
+
+from hand import Hand
+from meld import Meld
+from shanten import DEFAULT_SHANTEN_TABLE, MAX_COPIES, MAX_MELDS, Distances, ShantenTable, SpecialForms, combine_distances, combine_distances_entry
+from tile import Tile
+from tile_counts import NUM_TILE_KINDS, SUIT_GROUPS, group_index, index_tile, tile_index
+
+# ---
+
+@dataclass
+class DiscardAcceptance:
+    _discard: Tile
+    _shanten: int
+    _accepted: dict[Tile, int]
+
+    def __str__(self) -> str:
+        return f'Discard {self._discard}: {self._shanten} shanten, {self.num_accepted} tiles [{' '.join(f'{t}x{n}' for t, n in self._accepted.items())}]'
+
+    @property
+    def discard(self) -> Tile:
+        return self._discard
+
+    @property
+    def shanten(self) -> int:
+        return self._shanten
+
+    @property
+    def accepted(self) -> dict[Tile, int]:
+        # every tile that lowers shanten after the discard, and how many copies of it are still live
+        return self._accepted
+
+    @property
+    def num_accepted(self) -> int:
+        return sum(self._accepted.values())
+
+# ---
+
+def ukeire(
+        hand: Hand, *,
+        discards: Iterable[Tile] = (), dora_indicators: Iterable[Tile] = (), melds: Iterable[Meld] = (),
+        table: ShantenTable = DEFAULT_SHANTEN_TABLE) -> list[DiscardAcceptance]:
+    num_open_melds = len(hand.open_melds)
+    if len(hand.tiles) + 3*num_open_melds != 3*MAX_MELDS + 2:
+        raise ValueError(f'Hand with {len(hand.tiles)} closed tiles and {num_open_melds} open melds is not a 14-tile hand.')
+    num_melds = MAX_MELDS - num_open_melds
+    is_closed = num_open_melds == 0
+
+    # live copies: everything not in this hand (open melds included), the discards, dora indicators or other called melds
+    live = [MAX_COPIES - c for c in hand.counts]
+    for t in chain(discards, dora_indicators, *(m.tiles for m in melds)):
+        live[tile_index(t)] = max(0, live[tile_index(t)] - 1)
+
+    counts: list[int] = [*hand.closed_counts.counts]
+    patterns = [[*counts[start:start+size]] for start, size in SUIT_GROUPS]
+
+    def distances(g: int, pattern: list[int]) -> Distances:
+        return table.honor_distances(tuple(pattern)) if g == len(SUIT_GROUPS) - 1 else table.suit_distances(tuple(pattern))
+
+    # distance tables of each group, of each group with one extra tile, and of every combination of
+    # the other groups; a discard/draw only ever changes one or two groups, so the rest is reused
+    group_distances = [distances(g, p) for g, p in enumerate(patterns)]
+    drawn_distances: list[Distances | None] = []
+    for g, p in enumerate(patterns):
+        for offset in range(len(p)):
+            if p[offset] >= MAX_COPIES:
+                drawn_distances.append(None)
+                continue
+            p[offset] += 1
+            drawn_distances.append(distances(g, p))
+            p[offset] -= 1
+
+    def combine_all(indices: list[int]) -> Distances:
+        ret = group_distances[indices[0]]
+        for g in indices[1:]:
+            ret = combine_distances(ret, group_distances[g])
+        return ret
+
+    others = [combine_all([h for h in range(len(SUIT_GROUPS)) if h != g]) for g in range(len(SUIT_GROUPS))]
+    other_pairs = {
+        (g, u): combine_all([h for h in range(len(SUIT_GROUPS)) if h != g and h != u])
+        for g in range(len(SUIT_GROUPS)) for u in range(len(SUIT_GROUPS)) if g != u
+    }
+
+    special = SpecialForms(counts)
+
+    results: dict[int, tuple[int, dict[Tile, int]]] = {}
+    ret: list[DiscardAcceptance] = []
+    seen: set[Tile] = set()
+    for discard in hand.closed_counts.to_tiles():
+        if discard in seen:
+            continue
+        seen.add(discard)
+
+        d = tile_index(discard)
+        if d not in results:
+            g = group_index(d)
+            start = SUIT_GROUPS[g][0]
+
+            # shanten after the discard
+            counts[d] -= 1
+            patterns[g][d - start] -= 1
+            special.update(d, counts[d] + 1, counts[d])
+            discarded = distances(g, patterns[g])
+            base = combine_distances_entry(others[g], discarded, num_melds) - 1
+            if is_closed:
+                base = min(base, special.shanten())
+
+            # shanten after every possible draw
+            with_discarded = {u: combine_distances(other_pairs[(g, u)], discarded) for u in range(len(SUIT_GROUPS)) if u != g}
+            accepted: dict[Tile, int] = {}
+            for t in range(NUM_TILE_KINDS):
+                if counts[t] >= MAX_COPIES:
+                    continue
+                u = group_index(t)
+                if u == g:
+                    patterns[g][t - start] += 1
+                    after = combine_distances_entry(others[g], distances(g, patterns[g]), num_melds) - 1
+                    patterns[g][t - start] -= 1
+                else:
+                    drawn = drawn_distances[t]
+                    if drawn is None:
+                        continue
+                    after = combine_distances_entry(with_discarded[u], drawn, num_melds) - 1
+                if is_closed:
+                    special.update(t, counts[t], counts[t] + 1)
+                    after = min(after, special.shanten())
+                    special.update(t, counts[t] + 1, counts[t])
+                if after < base:
+                    accepted[index_tile(t)] = live[t]
+
+            # undo updates
+            special.update(d, counts[d], counts[d] + 1)
+            counts[d] += 1
+            patterns[g][d - start] += 1
+
+            results[d] = (base, accepted)
+
+        base, accepted = results[d]
+        ret.append(DiscardAcceptance(discard, base, dict(accepted)))
+
+    return ret
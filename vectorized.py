@@ -0,0 +1,98 @@
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from agari import DEFAULT_AGARI_INDEX, KEY_BASE, MELDS_AND_PAIR, AgariIndex
+from shanten import DEFAULT_SHANTEN_TABLE, INFINITY, MAX_COPIES, MAX_MELDS, ShantenTable
+from tile_counts import NUM_TILE_KINDS, RANKS_PER_SUIT, SUIT_GROUPS, TERMINAL_HONOR_INDICES
+
+# ---
+
+# Every function here takes an (N, 34) array of per-kind closed tile counts, one hand per row, and the
+# number of open melds of every hand (a scalar, or an array of N). Each suit and the honors are looked
+# up as a whole in the same tables the scalar functions use, so no hand is ever decomposed.
+
+_KEY_WEIGHTS: NDArray[np.int64] = KEY_BASE ** np.arange(RANKS_PER_SUIT, dtype=np.int64)
+_TERMINAL_HONOR_INDICES: NDArray[np.intp] = np.array(TERMINAL_HONOR_INDICES)
+
+# a distance table entry is j*(MAX_MELDS+1) + i for j pairs and i melds
+_NUM_ENTRIES = 2*(MAX_MELDS+1)
+
+def _as_counts(counts: ArrayLike) -> NDArray[np.int64]:
+    ret = np.asarray(counts, dtype=np.int64)
+    if ret.ndim != 2 or ret.shape[1] != NUM_TILE_KINDS:
+        raise ValueError(f'Expected an (N, {NUM_TILE_KINDS}) array of tile counts, got shape {ret.shape}.')
+    if ret.size and (ret.min() < 0 or ret.max() > MAX_COPIES):
+        raise ValueError(f'Tile counts must be between 0 and {MAX_COPIES}.')
+    return ret
+
+def group_keys(counts: ArrayLike) -> NDArray[np.int64]:
+    # (N, 4) pattern keys of the man/pin/sou/honor groups, as agari.pattern_key computes them
+    counts = _as_counts(counts)
+    return np.stack([counts[:, start:start+size] @ _KEY_WEIGHTS[:size] for start, size in SUIT_GROUPS], axis=1)
+
+# ---
+
+def agari(counts: ArrayLike, num_open_melds: ArrayLike = 0, *, index: AgariIndex = DEFAULT_AGARI_INDEX) -> NDArray[np.bool_]:
+    counts = _as_counts(counts)
+    num_open_melds = np.asarray(num_open_melds)
+    keys = group_keys(counts)
+
+    suit_flags = np.frombuffer(index.suit_flags, dtype=np.uint8)
+    honor_flags = np.frombuffer(index.honor_flags, dtype=np.uint8)
+    flags = np.concatenate([suit_flags[keys[:, :-1]], honor_flags[keys[:, -1:]]], axis=1)
+
+    # every group is complete and exactly one of them holds the pair
+    ret = (flags != 0).all(axis=1) & (((flags & MELDS_AND_PAIR) != 0).sum(axis=1) == 1)
+
+    # 7 Pairs and 13 Orphans can only be formed with a closed hand
+    seven_pairs = (counts == 2).sum(axis=1) == 7
+    orphans = counts[:, _TERMINAL_HONOR_INDICES]
+    thirteen_orphans = (orphans >= 1).all(axis=1) & (orphans.sum(axis=1) == 3*MAX_MELDS + 2)
+    ret |= (num_open_melds == 0) & (seven_pairs | thirteen_orphans)
+
+    return ret & (counts.sum(axis=1) == 3*(MAX_MELDS - num_open_melds) + 2)
+
+# ---
+
+def _group_distances(counts: NDArray[np.int64], keys: NDArray[np.int64], g: int, table: ShantenTable) -> NDArray[np.int16]:
+    # (10, N) distance tables of one group, one entry per row so every entry is contiguous;
+    # only the distinct patterns in the batch are looked up
+    start, size = SUIT_GROUPS[g]
+    _, first, inverse = np.unique(keys[:, g], return_index=True, return_inverse=True)
+    lookup = table.suit_distances if size == RANKS_PER_SUIT else table.honor_distances
+    distances = np.array([lookup(tuple(counts[i, start:start+size].tolist())) for i in first], dtype=np.int16)
+    return distances.T[:, inverse.reshape(-1)]
+
+def _combine(a: NDArray[np.int16], b: NDArray[np.int16], entries: range = range(_NUM_ENTRIES)) -> NDArray[np.int16]:
+    # shanten.combine_distances over every hand at once, for the given entries only
+    ret = np.full((_NUM_ENTRIES, a.shape[1]), INFINITY, dtype=np.int16)
+    for j1 in range(2):
+        for j2 in range(2 - j1):
+            for i1 in range(MAX_MELDS+1):
+                for i2 in range(MAX_MELDS+1 - i1):
+                    k = (j1+j2)*(MAX_MELDS+1) + i1 + i2
+                    if k in entries:
+                        np.minimum(ret[k], a[j1*(MAX_MELDS+1) + i1] + b[j2*(MAX_MELDS+1) + i2], out=ret[k])
+    return ret
+
+def shanten(counts: ArrayLike, num_open_melds: ArrayLike = 0, *, table: ShantenTable = DEFAULT_SHANTEN_TABLE) -> NDArray[np.int8]:
+    counts = _as_counts(counts)
+    num_open_melds = np.broadcast_to(np.asarray(num_open_melds), (len(counts),))
+    keys = group_keys(counts)
+
+    man, pin, sou, honors = (_group_distances(counts, keys, g, table) for g in range(len(SUIT_GROUPS)))
+    # only the entries with one pair are needed from the last combination
+    combined = _combine(_combine(_combine(man, pin), sou), honors, range(MAX_MELDS+1, _NUM_ENTRIES))
+    # the entry for every hand's own number of closed melds
+    regular = np.take_along_axis(combined, (MAX_MELDS+1 + MAX_MELDS - num_open_melds)[np.newaxis, :], axis=0)[0] - 1
+
+    num_kinds = (counts >= 1).sum(axis=1)
+    chiitoitsu = 6 - (counts >= 2).sum(axis=1) + np.maximum(0, 7 - num_kinds)
+    orphans = counts[:, _TERMINAL_HONOR_INDICES]
+    kokushi = 13 - (orphans >= 1).sum(axis=1) - (orphans >= 2).any(axis=1)
+    ret = np.where(num_open_melds == 0, np.minimum(regular, np.minimum(chiitoitsu, kokushi)), regular)
+    return ret.astype(np.int8)
+
+def tenpai(counts: ArrayLike, num_open_melds: ArrayLike = 0, *, table: ShantenTable = DEFAULT_SHANTEN_TABLE) -> NDArray[np.bool_]:
+    # for 14-tile hands, whether some discard leaves the hand tenpai; complete hands (shanten -1) always qualify
+    return shanten(counts, num_open_melds, table=table) <= 0
@@ -0,0 +1,117 @@
+from collections.abc import Sequence
+
+from hand import Hand
+from shanten import DEFAULT_SHANTEN_TABLE, MAX_COPIES, MAX_MELDS, ShantenTable, chiitoitsu_shanten, kokushi_shanten
+from symmetry import mirror_offsets, suit_pattern_key
+from tile import Tile
+from tile_counts import SUIT_GROUPS, TERMINAL_HONOR_INDICES, index_tile
+
+# ---
+
+class WaitTable:
+    # per-group completion flags and winning ranks, filled lazily from a ShantenTable
+    _shanten_table: ShantenTable
+    _suit_waits: dict[tuple[int, ...], tuple[int, ...]]
+    _honor_waits: dict[tuple[int, ...], tuple[int, ...]]
+
+    def __init__(self, shanten_table: ShantenTable = DEFAULT_SHANTEN_TABLE):
+        self._shanten_table = shanten_table
+        self._suit_waits = {}
+        self._honor_waits = {}
+
+    def __len__(self) -> int:
+        return len(self._suit_waits) + len(self._honor_waits)
+
+    def _is_complete(self, pattern: tuple[int, ...], is_honor: bool) -> bool:
+        # complete if the group can be split into melds plus a pair (when it holds 3n+2 tiles)
+        num_tiles = sum(pattern)
+        if num_tiles % 3 == 1 or num_tiles > 3*MAX_MELDS + 2:
+            return False
+        distances = self._shanten_table.honor_distances(pattern) if is_honor else self._shanten_table.suit_distances(pattern)
+        return distances[(1 if num_tiles % 3 == 2 else 0)*(MAX_MELDS+1) + num_tiles // 3] == 0
+
+    def is_complete(self, pattern: tuple[int, ...]) -> bool:
+        return self._is_complete(pattern, len(pattern) != 9)
+
+    def group_waits(self, pattern: tuple[int, ...]) -> tuple[int, ...]:
+        # offsets of every tile that completes the group
+        is_honor = len(pattern) != 9
+        cache = self._honor_waits if is_honor else self._suit_waits
+        # suit patterns share an entry with their mirror image, whose waits are mirrored back
+        key, is_mirrored = (pattern, False) if is_honor else suit_pattern_key(pattern)
+        ret = cache.get(key)
+        if ret is None:
+            waits: list[int] = []
+            counts = [*key]
+            for offset, c in enumerate(key):
+                if c >= MAX_COPIES:
+                    continue
+                counts[offset] += 1
+                if self._is_complete(tuple(counts), is_honor):
+                    waits.append(offset)
+                counts[offset] -= 1
+            ret = cache[key] = tuple(waits)
+        return mirror_offsets(ret) if is_mirrored else ret
+
+    def clear(self) -> None:
+        self._suit_waits.clear()
+        self._honor_waits.clear()
+
+# shared by every wait computation that is not given its own table
+DEFAULT_WAIT_TABLE = WaitTable()
+
+# ---
+
+def regular_waits(counts: Sequence[int], *, table: WaitTable = DEFAULT_WAIT_TABLE) -> list[int]:
+    patterns = [tuple(counts[start:start+size]) for start, size in SUIT_GROUPS]
+    residues = [sum(p) % 3 for p in patterns]
+
+    ret: list[int] = []
+    for g, (start, _) in enumerate(SUIT_GROUPS):
+        # the winning tile goes into group g, so every other group must already be complete
+        # and, together with group g, hold exactly one pair
+        if (residues[g] + 1) % 3 == 1:
+            continue
+        num_pairs = 1 if (residues[g] + 1) % 3 == 2 else 0
+        is_possible = True
+        for h, p in enumerate(patterns):
+            if h == g:
+                continue
+            if residues[h] == 1 or not table.is_complete(p):
+                is_possible = False
+                break
+            num_pairs += 1 if residues[h] == 2 else 0
+        if is_possible and num_pairs == 1:
+            ret.extend(start + offset for offset in table.group_waits(patterns[g]))
+    return sorted(ret)
+
+def chiitoitsu_waits(counts: Sequence[int]) -> list[int]:
+    if chiitoitsu_shanten(counts) != 0 or sum(counts) != 13:
+        return []
+    return [i for i, c in enumerate(counts) if c == 1]
+
+def kokushi_waits(counts: Sequence[int]) -> list[int]:
+    if kokushi_shanten(counts) != 0 or sum(counts) != 13:
+        return []
+    if any(counts[i] >= 2 for i in TERMINAL_HONOR_INDICES):
+        # single wait on the missing terminal/honor
+        return [i for i in TERMINAL_HONOR_INDICES if counts[i] == 0]
+    # 13-wait
+    return sorted(TERMINAL_HONOR_INDICES)
+
+def counts_waits(counts: Sequence[int], num_open_melds: int = 0, *, table: WaitTable = DEFAULT_WAIT_TABLE) -> list[int]:
+    ret = set(regular_waits(counts, table=table))
+    if num_open_melds == 0:
+        # 7 Pairs and 13 Orphans can only be formed with a closed hand
+        ret.update(chiitoitsu_waits(counts))
+        ret.update(kokushi_waits(counts))
+    return sorted(ret)
+
+def waits(hand: Hand, *, table: WaitTable = DEFAULT_WAIT_TABLE) -> list[Tile]:
+    num_open_melds = len(hand.open_melds)
+    if len(hand.tiles) + 3*num_open_melds != 3*MAX_MELDS + 1:
+        raise ValueError(f'Hand with {len(hand.tiles)} closed tiles and {num_open_melds} open melds is not a 13-tile hand.')
+
+    # tiles that the hand (including its open melds) already holds every copy of cannot be won on
+    all_counts = hand.counts
+    return [index_tile(i) for i in counts_waits(hand.closed_counts.counts, num_open_melds, table=table) if all_counts[i] < MAX_COPIES]
@@ -0,0 +1,281 @@
+from collections.abc import Callable, Iterable
+from enum import StrEnum
+
+from decomposition import IndexedDecomposition
+from fu import base_points, compute_fu, meld_fu
+from meld import Meld
+from meld_enums import ClosedMeldKind
+from shape import DRAGON_INDICES, HONOR_MASK, SUIT_MASKS, TERMINAL_HONOR_MASK, HandShape, WaitShape, YakuContext, is_terminal_honor, sequence_mask
+from tile_counts import RANKS_PER_SUIT, tile_index
+
+# ---
+
+class Yaku(StrEnum):
+    ALL_SIMPLES = 'All Simples'
+    PINFU = 'Pinfu'
+    PURE_DOUBLE_SEQUENCE = 'Pure Double Sequence'
+    WHITE_DRAGON = 'White Dragon'
+    GREEN_DRAGON = 'Green Dragon'
+    RED_DRAGON = 'Red Dragon'
+    SEAT_WIND = 'Seat Wind'
+    ROUND_WIND = 'Round Wind'
+    MIXED_TRIPLE_SEQUENCE = 'Mixed Triple Sequence'
+    PURE_STRAIGHT = 'Pure Straight'
+    HALF_OUTSIDE_HAND = 'Half Outside Hand'
+    ALL_TRIPLETS = 'All Triplets'
+    THREE_CONCEALED_TRIPLETS = 'Three Concealed Triplets'
+    TRIPLE_TRIPLETS = 'Triple Triplets'
+    THREE_KANS = 'Three Kans'
+    LITTLE_THREE_DRAGONS = 'Little Three Dragons'
+    ALL_TERMINALS_AND_HONORS = 'All Terminals and Honors'
+    SEVEN_PAIRS = 'Seven Pairs'
+    TWICE_PURE_DOUBLE_SEQUENCE = 'Twice Pure Double Sequence'
+    FULLY_OUTSIDE_HAND = 'Fully Outside Hand'
+    HALF_FLUSH = 'Half Flush'
+    FULL_FLUSH = 'Full Flush'
+
+# (closed han, open han); 0 open han means the yaku requires a closed hand
+YAKU_HAN: dict[Yaku, tuple[int, int]] = {
+    Yaku.ALL_SIMPLES: (1, 1),
+    Yaku.PINFU: (1, 0),
+    Yaku.PURE_DOUBLE_SEQUENCE: (1, 0),
+    Yaku.WHITE_DRAGON: (1, 1),
+    Yaku.GREEN_DRAGON: (1, 1),
+    Yaku.RED_DRAGON: (1, 1),
+    Yaku.SEAT_WIND: (1, 1),
+    Yaku.ROUND_WIND: (1, 1),
+    Yaku.MIXED_TRIPLE_SEQUENCE: (2, 1),
+    Yaku.PURE_STRAIGHT: (2, 1),
+    Yaku.HALF_OUTSIDE_HAND: (2, 1),
+    Yaku.ALL_TRIPLETS: (2, 2),
+    Yaku.THREE_CONCEALED_TRIPLETS: (2, 2),
+    Yaku.TRIPLE_TRIPLETS: (2, 2),
+    Yaku.THREE_KANS: (2, 2),
+    Yaku.LITTLE_THREE_DRAGONS: (2, 2),
+    Yaku.ALL_TERMINALS_AND_HONORS: (2, 2),
+    Yaku.SEVEN_PAIRS: (2, 0),
+    Yaku.TWICE_PURE_DOUBLE_SEQUENCE: (3, 0),
+    Yaku.FULLY_OUTSIDE_HAND: (3, 2),
+    Yaku.HALF_FLUSH: (3, 2),
+    Yaku.FULL_FLUSH: (6, 5),
+}
+
+# ---
+
+def _num_suits(s: HandShape) -> int:
+    return sum(1 for m in SUIT_MASKS if s.tile_mask & m)
+
+def _is_yakuhai(index: int, c: YakuContext) -> bool:
+    return index in DRAGON_INDICES or index == c.seat_wind or index == c.round_wind
+
+def _has_repeated_sequence(s: HandShape) -> bool:
+    return any(a == b for a, b in zip(s.sequences, s.sequences[1:]))
+
+def _is_twice_repeated(s: HandShape) -> bool:
+    # two pairs of identical sequences, e.g. 123m 123m 456p 456p
+    q = s.sequences
+    return len(q) == 4 and q[0] == q[1] and q[2] == q[3]
+
+def _has_sequences(s: HandShape, *starts: int) -> bool:
+    return all(i in s.sequences for i in starts)
+
+# every yaku as a predicate over a hand shape; han, and whether the yaku is allowed open, come from YAKU_HAN
+_PREDICATES: tuple[tuple[Yaku, Callable[[HandShape, YakuContext], bool]], ...] = (
+    (Yaku.ALL_SIMPLES, lambda s, c: s.tile_mask & TERMINAL_HONOR_MASK == 0),
+    (Yaku.PINFU, lambda s, c: len(s.sequences) == 4 and s.wait == WaitShape.RYANMEN and not _is_yakuhai(s.pair, c)),
+    (Yaku.PURE_DOUBLE_SEQUENCE, lambda s, c: _has_repeated_sequence(s) and not _is_twice_repeated(s)),
+    (Yaku.WHITE_DRAGON, lambda s, c: DRAGON_INDICES[0] in s.triplets),
+    (Yaku.GREEN_DRAGON, lambda s, c: DRAGON_INDICES[1] in s.triplets),
+    (Yaku.RED_DRAGON, lambda s, c: DRAGON_INDICES[2] in s.triplets),
+    (Yaku.SEAT_WIND, lambda s, c: c.seat_wind in s.triplets),
+    (Yaku.ROUND_WIND, lambda s, c: c.round_wind in s.triplets),
+    (Yaku.MIXED_TRIPLE_SEQUENCE, lambda s, c: any(_has_sequences(s, i, i + RANKS_PER_SUIT, i + 2*RANKS_PER_SUIT) for i in s.sequences if i < RANKS_PER_SUIT)),
+    (Yaku.PURE_STRAIGHT, lambda s, c: any(_has_sequences(s, i, i+3, i+6) for i in s.sequences if i % RANKS_PER_SUIT == 0)),
+    (Yaku.HALF_OUTSIDE_HAND, lambda s, c: s.is_outside and len(s.sequences) > 0 and s.tile_mask & HONOR_MASK != 0),
+    (Yaku.ALL_TRIPLETS, lambda s, c: len(s.triplets) == 4),
+    (Yaku.THREE_CONCEALED_TRIPLETS, lambda s, c: s.num_concealed_triplets == 3),
+    (Yaku.TRIPLE_TRIPLETS, lambda s, c: any(i + RANKS_PER_SUIT in s.triplets and i + 2*RANKS_PER_SUIT in s.triplets for i in s.triplets if i < RANKS_PER_SUIT)),
+    (Yaku.THREE_KANS, lambda s, c: s.num_quads == 3),
+    (Yaku.LITTLE_THREE_DRAGONS, lambda s, c: s.pair in DRAGON_INDICES and sum(1 for d in DRAGON_INDICES if d in s.triplets) == 2),
+    (Yaku.ALL_TERMINALS_AND_HONORS, lambda s, c: s.tile_mask & ~TERMINAL_HONOR_MASK == 0 and s.tile_mask & HONOR_MASK != 0 and s.tile_mask & ~HONOR_MASK != 0),
+    (Yaku.SEVEN_PAIRS, lambda s, c: s.is_seven_pairs),
+    (Yaku.TWICE_PURE_DOUBLE_SEQUENCE, lambda s, c: _is_twice_repeated(s)),
+    (Yaku.FULLY_OUTSIDE_HAND, lambda s, c: s.is_outside and len(s.sequences) > 0 and s.tile_mask & HONOR_MASK == 0),
+    (Yaku.HALF_FLUSH, lambda s, c: _num_suits(s) == 1 and s.tile_mask & HONOR_MASK != 0),
+    (Yaku.FULL_FLUSH, lambda s, c: _num_suits(s) == 1 and s.tile_mask & HONOR_MASK == 0),
+)
+
+# ---
+
+def _wait_shape(start: int, winning_index: int) -> WaitShape:
+    # wait completed by the winning tile in the sequence starting at start
+    match winning_index - start, start % RANKS_PER_SUIT:
+        case 1, _:
+            return WaitShape.KANCHAN
+        case 0, 6:
+            # 7 of 789
+            return WaitShape.PENCHAN
+        case 2, 0:
+            # 3 of 123
+            return WaitShape.PENCHAN
+        case _:
+            return WaitShape.RYANMEN
+
+# yaku that only depend on which tiles the hand holds, and so are the same for every decomposition
+_MASK_YAKU: frozenset[Yaku] = frozenset({Yaku.ALL_SIMPLES, Yaku.ALL_TERMINALS_AND_HONORS, Yaku.HALF_FLUSH, Yaku.FULL_FLUSH})
+
+# the best interpretation of a hand: its shape, structural yaku and fu
+Interpretation = tuple[HandShape | None, dict[Yaku, int], int]
+
+class YakuEngine:
+    # evaluates every interpretation of a winning hand in one pass over the precompiled predicates
+    _predicates: tuple[tuple[Yaku, Callable[[HandShape, YakuContext], bool]], ...]
+    _mask_predicates: tuple[tuple[Yaku, Callable[[HandShape, YakuContext], bool]], ...]
+
+    def __init__(self, predicates: tuple[tuple[Yaku, Callable[[HandShape, YakuContext], bool]], ...] = _PREDICATES):
+        self._predicates = predicates
+        self._mask_predicates = tuple((y, p) for y, p in predicates if y in _MASK_YAKU)
+
+    def shapes(self, decompositions: Iterable[IndexedDecomposition], open_melds: list[Meld], winning_index: int, is_tsumo: bool) -> list[HandShape]:
+        # open melds, and closed kans declared from the hand
+        is_closed = all(not m.is_open for m in open_melds)
+        fixed_sequences: list[int] = []
+        fixed_triplets: list[int] = []
+        fixed_fu = 0
+        num_closed_kans = 0
+        num_quads = 0
+        for m in open_melds:
+            indices = sorted(tile_index(t) for t in m.tiles)
+            if indices[0] == indices[-1]:
+                fixed_triplets.append(indices[0])
+                fixed_fu += meld_fu(indices[0], not m.is_open, len(indices) == 4)
+                num_quads += 1 if len(indices) == 4 else 0
+                num_closed_kans += 0 if m.is_open else 1
+            else:
+                fixed_sequences.append(indices[0])
+
+        ret: list[HandShape] = []
+        for pair, closed_melds in decompositions:
+            sequences = [*fixed_sequences]
+            triplets = [*fixed_triplets]
+            triplets_fu = fixed_fu
+            for index, kind in closed_melds:
+                if kind == ClosedMeldKind.SEQUENCE:
+                    sequences.append(index)
+                else:
+                    triplets.append(index)
+                    triplets_fu += meld_fu(index, True, False)
+            sequences.sort()
+
+            tile_mask = 1 << pair
+            is_outside = is_terminal_honor(pair)
+            for i in sequences:
+                tile_mask |= sequence_mask(i)
+                is_outside = is_outside and (i % RANKS_PER_SUIT == 0 or i % RANKS_PER_SUIT == RANKS_PER_SUIT - 3)
+            for i in triplets:
+                tile_mask |= 1 << i
+                is_outside = is_outside and is_terminal_honor(i)
+
+            # every closed group the winning tile could have completed is a separate interpretation
+            num_closed_triplets = sum(1 for _, kind in closed_melds if kind == ClosedMeldKind.TRIPLET) + num_closed_kans
+            waits: set[tuple[WaitShape, int, int]] = set()
+            if pair == winning_index:
+                waits.add((WaitShape.TANKI, num_closed_triplets, triplets_fu))
+            for index, kind in closed_melds:
+                if kind == ClosedMeldKind.TRIPLET and index == winning_index:
+                    # a triplet completed by ron counts as open
+                    if is_tsumo:
+                        waits.add((WaitShape.SHANPON, num_closed_triplets, triplets_fu))
+                    else:
+                        waits.add((WaitShape.SHANPON, num_closed_triplets - 1, triplets_fu - meld_fu(index, False, False)))
+                elif kind == ClosedMeldKind.SEQUENCE and index <= winning_index <= index + 2:
+                    waits.add((_wait_shape(index, winning_index), num_closed_triplets, triplets_fu))
+
+            for wait, num_concealed_triplets, shape_fu in waits:
+                ret.append(HandShape(is_closed, wait, tile_mask, tuple(sequences), frozenset(triplets), num_concealed_triplets, num_quads, pair, is_outside, _meld_fu=shape_fu))
+        return ret
+
+    def seven_pairs_shape(self, counts: Iterable[int]) -> HandShape | None:
+        tile_mask = 0
+        for i, c in enumerate(counts):
+            if c == 2:
+                tile_mask |= 1 << i
+            elif c != 0:
+                return None
+        return HandShape(True, WaitShape.TANKI, tile_mask, _is_seven_pairs=True) if tile_mask.bit_count() == 7 else None
+
+    def evaluate(self, shape: HandShape, context: YakuContext) -> dict[Yaku, int]:
+        ret: dict[Yaku, int] = {}
+        for y, predicate in self._predicates:
+            closed_han, open_han = YAKU_HAN[y]
+            han = closed_han if shape.is_closed else open_han
+            if han and predicate(shape, context):
+                ret[y] = han
+        return ret
+
+    def han_bound(self, shape: HandShape, context: YakuContext) -> int:
+        # never less than the han evaluate() gives the shape, but only looks at counts and flags
+        ret = 0
+        for y, predicate in self._mask_predicates:
+            if predicate(shape, context):
+                ret += YAKU_HAN[y][0]
+        if shape.is_seven_pairs:
+            return ret + YAKU_HAN[Yaku.SEVEN_PAIRS][0]
+
+        # honor triplets are worth at most 2 han each (a double wind), plus Little Three Dragons
+        ret += 2 * (shape.tile_mask & HONOR_MASK & ~(1 << shape.pair)).bit_count()
+        if shape.pair in DRAGON_INDICES:
+            ret += YAKU_HAN[Yaku.LITTLE_THREE_DRAGONS][0]
+
+        num_sequences = len(shape.sequences)
+        if shape.is_closed and num_sequences == 4 and shape.wait == WaitShape.RYANMEN:
+            ret += YAKU_HAN[Yaku.PINFU][0]
+        if shape.is_closed and num_sequences >= 2:
+            ret += YAKU_HAN[Yaku.TWICE_PURE_DOUBLE_SEQUENCE][0]
+        if num_sequences >= 3:
+            # Mixed Triple Sequence and Pure Straight cannot both fit in 4 sequences
+            ret += YAKU_HAN[Yaku.PURE_STRAIGHT][0]
+        if shape.is_outside:
+            ret += YAKU_HAN[Yaku.FULLY_OUTSIDE_HAND][0]
+        if len(shape.triplets) == 4:
+            ret += YAKU_HAN[Yaku.ALL_TRIPLETS][0]
+        if len(shape.triplets) >= 3:
+            ret += YAKU_HAN[Yaku.TRIPLE_TRIPLETS][0]
+        if shape.num_concealed_triplets >= 3:
+            ret += YAKU_HAN[Yaku.THREE_CONCEALED_TRIPLETS][0]
+        if shape.num_quads >= 3:
+            ret += YAKU_HAN[Yaku.THREE_KANS][0]
+        return ret
+
+    def best(self, shapes: Iterable[HandShape], context: YakuContext, extra_han: int = 0, *, has_yaku: bool = False) -> Interpretation:
+        # the interpretation worth the most base points (then han, then fu), with extra_han added to every one;
+        # unless extra_han already holds a yaku (has_yaku), shapes without a yaku of their own cannot win and are
+        # skipped, so dora never ranks them. Shapes are tried from the highest upper bound down, and the search
+        # stops once no bound can beat the best
+        candidates: list[tuple[int, HandShape, int]] = []
+        for shape in shapes:
+            bound = self.han_bound(shape, context)
+            if bound == 0 and not has_yaku:
+                continue
+            fu = compute_fu(shape, context)
+            candidates.append((base_points(0, extra_han + bound, fu), shape, fu))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+
+        best_shape: HandShape | None = None
+        best_yaku: dict[Yaku, int] = {}
+        best_fu = 0
+        best_key = (-1, -1, -1)
+        for bound, shape, fu in candidates:
+            if bound < best_key[0]:
+                break
+            yaku = self.evaluate(shape, context)
+            if not yaku and not has_yaku:
+                continue
+            han = extra_han + sum(yaku.values())
+            key = (base_points(0, han, fu), han, fu)
+            if key > best_key:
+                best_shape, best_yaku, best_fu, best_key = shape, yaku, fu, key
+        return best_shape, best_yaku, best_fu
+
+# shared by every scorer that is not given its own engine
+DEFAULT_YAKU_ENGINE = YakuEngine()